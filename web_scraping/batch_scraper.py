@@ -0,0 +1,334 @@
+"""Modo por lotes: ejecuta sin intervención una lista de búsquedas de Google Maps.
+
+El archivo de entrada es un CSV con columnas url, nombre y max_resultados (también
+se aceptan name y max_results) o un YAML (requiere pyyaml) con una lista de
+búsquedas, directamente o bajo la clave 'busquedas':
+
+    busquedas:
+      - url: https://www.google.com/maps/search/dentistas+cdmx/@19.43,-99.13,13z
+        nombre: dentistas_cdmx
+        max_resultados: 40
+
+Las búsquedas se reparten entre --concurrency navegadores; cada negocio se escribe
+en cuanto se extrae en el archivo de su búsqueda y en el consolidado (sin repetir
+negocios entre búsquedas; CSV por defecto, o --format jsonl / parquet). Cada
+búsqueda tiene su diario en checkpoints/, así que un lote interrumpido se reanuda
+volviendo a ejecutar el mismo comando. Los negocios también se guardan en la base
+de prospectos (--db, prospectos.sqlite por defecto):
+
+    python batch_scraper.py busquedas.csv --concurrency 3 --workers 2 --output-dir salida/
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from browser_session import ManagedScraperSession
+from checkpoint import RunJournal
+from output_writers import WRITERS, open_writer
+from prospect_store import ProspectStore
+from business_record import FIELDS
+from place_urls import DedupIndex
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+log = logging.getLogger(__name__)
+
+# Columnas de los archivos de salida (las del registro, sin el índice global del CLI)
+OUTPUT_COLUMNS = [field for field in FIELDS if field != 'indice_global']
+
+_URL_KEYS = ('url', 'URL')
+_NAME_KEYS = ('nombre', 'name', 'busqueda')
+_MAX_KEYS = ('max_resultados', 'max_results', 'resultados')
+
+
+def _first(row, keys, default=None):
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ''):
+            return value
+    return default
+
+
+def _safe_name(name):
+    return re.sub(r'[^\w\-]+', '_', name).strip('_') or 'busqueda'
+
+
+def load_searches(path, default_max_results=20):
+    """Lee las búsquedas del CSV o YAML; devuelve dicts con url, nombre y max_resultados"""
+    if path.lower().endswith(('.yaml', '.yml')):
+        if yaml is None:
+            raise ImportError("Para leer YAML se necesita pyyaml: pip install pyyaml")
+        with open(path, encoding='utf-8') as f:
+            data = yaml.safe_load(f) or []
+        rows = data.get('busquedas', data.get('searches', [])) if isinstance(data, dict) else data
+    else:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    searches = []
+    used_names = set()
+    for n, row in enumerate(rows, start=1):
+        url = _first(row, _URL_KEYS)
+        if not url:
+            log.warning(f"⚠️ Fila {n} sin URL, se omite")
+            continue
+        name = _safe_name(str(_first(row, _NAME_KEYS, f"busqueda_{n}")))
+        # Nombres repetidos sobrescribirían los archivos de otra búsqueda
+        base, suffix = name, 2
+        while name in used_names:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        used_names.add(name)
+        searches.append({
+            'url': str(url).strip(),
+            'nombre': name,
+            'max_resultados': int(_first(row, _MAX_KEYS, default_max_results)),
+        })
+    return searches
+
+
+class BatchRunner:
+    """Reparte las búsquedas de un lote entre un número acotado de navegadores"""
+
+    def __init__(self, output_dir='.', concurrency=2, workers=1, checkpoint_dir='checkpoints',
+                 cache_path='place_cache.sqlite', retries=1, fresh=False, headless=True,
+                 use_observer=False, lean=False, output_format='csv', store_path='prospectos.sqlite'):
+        self.output_dir = output_dir
+        self.extension = f".{output_format.lstrip('.')}"
+        if self.extension not in WRITERS:
+            raise ValueError(f"Formato de salida no soportado: {output_format}")
+        self.concurrency = max(1, int(concurrency))
+        self.workers = workers
+        self.checkpoint_dir = checkpoint_dir
+        self.retries = retries
+        self.fresh = fresh
+        self.use_observer = use_observer
+        self.cancel_event = threading.Event()
+        profile_root = os.path.join(os.getcwd(), "batch_profiles")
+        self.sessions = [
+            ManagedScraperSession(
+                idle_timeout=None,
+                check_interval=0,
+                cache_path=cache_path,
+                profile_dir=os.path.join(profile_root, f"slot_{slot}"),
+                headless=headless,
+                lean=lean
+            )
+            for slot in range(self.concurrency)
+        ]
+        self._free_sessions = queue.Queue()
+        for session in self.sessions:
+            self._free_sessions.put(session)
+        self._dedup = DedupIndex()
+        self.consolidated = None
+        self.store = ProspectStore(store_path) if store_path else None
+
+    def _writer(self, name):
+        return open_writer(os.path.join(self.output_dir, name + self.extension), columns=OUTPUT_COLUMNS)
+
+    def _journal(self, name):
+        path = os.path.join(self.checkpoint_dir, f"{name}.jsonl")
+        journal = RunJournal(path)
+        # Un diario terminado es de una ejecución anterior completa: se empieza de cero
+        if journal.finished or (self.fresh and journal.has_progress):
+            journal.discard()
+            journal = RunJournal(path)
+        return journal
+
+    def _emit(self, business, sink):
+        sink.write(business)
+        if self.store:
+            self.store.upsert(business)
+        # Un negocio que aparece en varias búsquedas va una sola vez al consolidado
+        key = business.get('place_key')
+        if not key or self._dedup.add(key, 'exportacion', key=key):
+            self.consolidated.write(business)
+
+    def run_search(self, search):
+        """Ejecuta una búsqueda completa (con reintentos) y devuelve su resumen"""
+        name = search['nombre']
+        sink = self._writer(f"negocios_{name}")
+        journal = self._journal(name)
+        session = self._free_sessions.get()
+        started = time.perf_counter()
+        attempts = 0
+        error = None
+        try:
+            while attempts <= self.retries and not self.cancel_event.is_set():
+                attempts += 1
+                # En los reintentos el diario evita repetir lo ya extraído; se reescribe el archivo
+                if attempts > 1:
+                    log.warning(f"⚠️ [{name}] reintento {attempts - 1}/{self.retries}")
+                    sink.close()
+                    sink = self._writer(f"negocios_{name}")
+                try:
+                    with session.use(workers=self.workers, use_observer=self.use_observer) as scraper:
+                        for business in scraper.iter_businesses(search['url'], max_results=search['max_resultados'],
+                                                                journal=journal, cancel=self.cancel_event):
+                            business.busqueda = name
+                            business.fecha_extraccion = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            self._emit(business, sink)
+                    error = None
+                except Exception as e:
+                    error = str(e)
+                    log.error(f"❌ [{name}] {e}")
+                if journal.finished:
+                    break
+        finally:
+            self._free_sessions.put(session)
+            elapsed = time.perf_counter() - started
+            finished = journal.finished
+            journal.close()
+            sink.close()
+            if self.store and sink.rows:
+                self.store.record_search(name, search['url'], sink.rows)
+
+        return {
+            'busqueda': name,
+            'url': search['url'],
+            'negocios': sink.rows,
+            'solicitados': search['max_resultados'],
+            'completa': finished,
+            'intentos': attempts,
+            'segundos': round(elapsed, 1),
+            'negocios_por_minuto': round(sink.rows / elapsed * 60, 1) if elapsed else None,
+            'archivo': sink.path,
+            'error': error,
+        }
+
+    def run(self, searches):
+        """Ejecuta el lote; devuelve el informe con un resumen por búsqueda"""
+        self.consolidated = self._writer("todos_los_negocios_consolidado")
+        started = time.perf_counter()
+        results = []
+        log.info(f"🚀 Lote de {len(searches)} búsquedas con {self.concurrency} navegadores "
+                 f"({self.workers} por búsqueda para las fichas)")
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='lote')
+        futures = {}
+        try:
+            futures = {executor.submit(self.run_search, search): search for search in searches}
+            for future in as_completed(futures):
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    search = futures[future]
+                    summary = {'busqueda': search['nombre'], 'url': search['url'], 'negocios': 0,
+                               'completa': False, 'error': str(e)}
+                results.append(summary)
+                log.info(f"📦 [{len(results)}/{len(searches)}] {summary['busqueda']}: "
+                         f"{summary['negocios']} negocios"
+                         + (f" · {summary['negocios_por_minuto']}/min" if summary.get('negocios_por_minuto') else "")
+                         + ("" if summary['completa'] else " · incompleta"))
+        except KeyboardInterrupt:
+            log.info("\nℹ️ Lote interrumpido: las búsquedas en curso se detienen tras su negocio actual")
+            self.cancel_event.set()
+            for future in futures:
+                future.cancel()
+        finally:
+            executor.shutdown(wait=True)
+            self.consolidated.close()
+
+        elapsed = time.perf_counter() - started
+        total = sum(summary['negocios'] for summary in results)
+        order = {search['nombre']: n for n, search in enumerate(searches)}
+        return {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'busquedas': len(searches),
+            'completas': sum(1 for summary in results if summary['completa']),
+            'negocios': total,
+            'negocios_unicos': self.consolidated.rows,
+            'segundos': round(elapsed, 1),
+            'negocios_por_minuto': round(total / elapsed * 60, 1) if elapsed else None,
+            'consolidado': self.consolidated.path,
+            'completitud': self.consolidated.summary.as_dict(),
+            'por_busqueda': sorted(results, key=lambda summary: order.get(summary['busqueda'], 0)),
+        }
+
+    def close(self):
+        for session in self.sessions:
+            session.close()
+        if self.store:
+            self.store.close()
+
+
+def print_report(report):
+    print("\n📊 RESUMEN DEL LOTE:")
+    print(f"   • Búsquedas completas: {report['completas']}/{report['busquedas']}")
+    print(f"   • Negocios: {report['negocios']} ({report['negocios_unicos']} únicos en el consolidado)")
+    print(f"   • Tiempo: {report['segundos']}s · {report['negocios_por_minuto']} negocios/min")
+    print("\n📋 POR BÚSQUEDA:")
+    for summary in report['por_busqueda']:
+        mark = '✅' if summary['completa'] else '⚠️'
+        rate = summary.get('negocios_por_minuto')
+        print(f"   {mark} {summary['busqueda']}: {summary['negocios']} negocios"
+              + (f" en {summary['segundos']}s ({rate}/min)" if rate else "")
+              + (f" · error: {summary['error']}" if summary.get('error') else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta un lote de búsquedas de Google Maps sin intervención")
+    parser.add_argument('searches', help="CSV o YAML con url, nombre y max_resultados")
+    parser.add_argument('--output-dir', default='.', help="Carpeta de los archivos por búsqueda y el consolidado")
+    parser.add_argument('--concurrency', type=int, default=2, help="Búsquedas simultáneas (un navegador cada una)")
+    parser.add_argument('--workers', type=int, default=1, help="Navegadores por búsqueda para las fichas")
+    parser.add_argument('--max-results', type=int, default=20, help="Máximo por búsqueda si el archivo no lo indica")
+    parser.add_argument('--retries', type=int, default=1, help="Reintentos de una búsqueda incompleta")
+    parser.add_argument('--checkpoint-dir', default='checkpoints')
+    parser.add_argument('--cache', default='place_cache.sqlite', help="Caché de negocios ('' para desactivarla)")
+    parser.add_argument('--fresh', action='store_true', help="Ignorar los diarios de ejecuciones interrumpidas")
+    parser.add_argument('--headed', action='store_true', help="Mostrar las ventanas de Chrome")
+    parser.add_argument('--observer', action='store_true', help="Usar el modo MutationObserver en el scroll")
+    parser.add_argument('--lean', action='store_true', help="Modo ligero (bloquea imágenes, fuentes, teselas...)")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'parquet'], default='csv',
+                        help="Formato de los archivos de salida")
+    parser.add_argument('--db', default='prospectos.sqlite', help="Base de prospectos ('' para no usarla)")
+    parser.add_argument('--report', help="Archivo JSON donde guardar el informe del lote")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(threadName)s %(message)s')
+
+    searches = load_searches(args.searches, args.max_results)
+    if not searches:
+        print("❌ El archivo no contiene búsquedas.")
+        sys.exit(1)
+
+    runner = BatchRunner(
+        output_dir=args.output_dir,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        checkpoint_dir=args.checkpoint_dir,
+        cache_path=args.cache or None,
+        retries=args.retries,
+        fresh=args.fresh,
+        headless=not args.headed,
+        use_observer=args.observer,
+        lean=args.lean,
+        output_format=args.format,
+        store_path=args.db or None
+    )
+    try:
+        report = runner.run(searches)
+    finally:
+        runner.close()
+
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Informe guardado en {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Benchmark del pipeline de scraping contra el servidor local de Google Maps.
+
+Mide el arranque del navegador, el tiempo hasta el primer resultado, la duración
+del scroll, la latencia de extracción por negocio (p50/p95/p99), los negocios por
+minuto y la memoria máxima (RSS) de Python más Chrome, y lo emite en JSON:
+
+    python benchmarks/bench_scraper.py --max-results 40 --latency 0.1 --output base.json
+    python benchmarks/bench_scraper.py --max-results 40 --workers 3 --output pool.json --compare base.json
+    python benchmarks/bench_scraper.py --max-results 20 --asset-kb 60 --compare-lean
+
+Se ejecuta desde la carpeta web_scraping/ o desde cualquier otra (añade su carpeta padre al path).
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instrumentation import Metrics  # noqa: E402
+from mock_maps_server import MockMapsServer, generate_places  # noqa: E402
+from undetected_method3 import GoogleMapsScraper  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Métricas que --compare muestra, con True si un valor mayor es mejor
+COMPARED_METRICS = {
+    'driver_startup_s': False,
+    'time_to_first_result_s': False,
+    'scroll_phase_s': False,
+    'extraction_p50_s': False,
+    'extraction_p95_s': False,
+    'businesses_per_minute': True,
+    'page_load_avg_s': False,
+    'kb_per_business': False,
+    'peak_rss_mb': False,
+}
+
+
+def percentile(values, pct):
+    """Percentil por interpolación lineal (None si no hay valores)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class RssSampler:
+    """Muestrea en segundo plano la memoria de este proceso y de sus hijos (chromedriver, Chrome)"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _total_rss(self):
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.peak_bytes = max(self.peak_bytes, self._total_rss())
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if psutil is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self.peak_bytes:
+            return self.peak_bytes / (1024 * 1024)
+        # Sin psutil solo hay máximo de Python (ru_maxrss está en KB en Linux y en bytes en macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_benchmark(args):
+    places = generate_places(args.places, args.seed)
+    sampler = RssSampler().start()
+    metrics = Metrics()
+
+    with MockMapsServer(places, latency=args.latency, jitter=args.jitter, asset_kb=args.asset_kb) as server:
+        started = time.perf_counter()
+        scraper = GoogleMapsScraper(
+            profile_dir=os.path.join(os.getcwd(), "bench_chrome_profile"),
+            workers=args.workers,
+            use_observer=args.observer,
+            offline_parsing=args.offline,
+            extra_hosts=[server.host],
+            headless=not args.headed,
+            metrics=metrics,
+            lean=args.lean
+        )
+        driver_startup = time.perf_counter() - started
+
+        businesses = []
+        first_result = None
+        try:
+            run_started = time.perf_counter()
+            for business in scraper.iter_businesses(server.search_url(args.query), max_results=args.max_results):
+                if first_result is None:
+                    first_result = time.perf_counter() - run_started
+                businesses.append(business)
+            run_elapsed = time.perf_counter() - run_started
+
+            phases = scraper.timer.report()
+            extraction = scraper.timer.durations('extraccion')
+            requests_served = server.requests
+        finally:
+            scraper.close()
+
+    peak_rss = sampler.stop()
+    scroll = phases.get('scroll', {})
+    
+    # Carga de las fichas: span 'navigate' de las páginas de negocio y bytes medidos en ellas
+    snapshot = metrics.snapshot()
+    counters = {entry['nombre']: entry['valor'] for entry in snapshot['contadores'] if not entry['etiquetas']}
+    place_loads = [entry for entry in snapshot['spans']
+                   if entry['nombre'] == 'navigate' and entry['etiquetas'].get('pagina') == 'negocio']
+    load_count = sum(entry['count'] for entry in place_loads)
+    load_sum = sum(entry['sum'] for entry in place_loads)
+    pages_measured = counters.get('pages_measured', 0)
+
+    def rounded(value):
+        return round(value, 4) if value is not None else None
+
+    return {
+        'label': args.label,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'config': {
+            'places': args.places,
+            'max_results': args.max_results,
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'workers': args.workers,
+            'observer': args.observer,
+            'offline': args.offline,
+            'lean': args.lean,
+            'asset_kb': args.asset_kb,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'psutil': psutil is not None,
+        },
+        'businesses': len(businesses),
+        'requests_served': requests_served,
+        'driver_startup_s': rounded(driver_startup),
+        'time_to_first_result_s': rounded(first_result),
+        'scroll_phase_s': rounded(scroll.get('espera', 0) + scroll.get('trabajo', 0)) if scroll else None,
+        'extraction_p50_s': rounded(percentile(extraction, 50)),
+        'extraction_p95_s': rounded(percentile(extraction, 95)),
+        'extraction_p99_s': rounded(percentile(extraction, 99)),
+        'total_s': rounded(run_elapsed),
+        'businesses_per_minute': rounded(len(businesses) / run_elapsed * 60) if run_elapsed else None,
+        'peak_rss_mb': rounded(peak_rss),
+        'page_load_avg_s': rounded(load_sum / load_count) if load_count else None,
+        'kb_per_business': rounded(counters.get('bytes_transferred', 0) / 1024 / pages_measured) if pages_measured else None,
+        'phases': phases,
+        'metrics': snapshot['contadores'],
+    }
+
+
+def print_comparison(current, baseline, file=sys.stderr):
+    print(f"\n📊 {current.get('label') or 'actual'} vs {baseline.get('label') or 'base'}:", file=file)
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        new, old = current.get(metric), baseline.get(metric)
+        if new is None or old is None:
+            continue
+        change = ((new - old) / old * 100) if old else 0
+        better = (change > 0) == higher_is_better if change else None
+        mark = '✅' if better else ('⚠️' if better is False else '•')
+        print(f"  {mark} {metric}: {old} → {new} ({change:+.1f}%)", file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de GoogleMapsScraper contra el servidor local")
+    parser.add_argument('--label', default='', help="Nombre de esta ejecución en el JSON")
+    parser.add_argument('--query', default='dentistas cdmx')
+    parser.add_argument('--places', type=int, default=120, help="Negocios disponibles en el servidor")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-results', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.05, help="Retardo por respuesta del servidor (s)")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=1, help="Navegadores en paralelo para la extracción")
+    parser.add_argument('--observer', action='store_true', help="Usar el modo MutationObserver en el scroll")
+    parser.add_argument('--offline', action='store_true', help="Análisis offline del HTML")
+    parser.add_argument('--headed', action='store_true', help="Mostrar la ventana de Chrome")
+    parser.add_argument('--lean', action='store_true', help="Modo ligero (bloquea imágenes, fuentes, teselas...)")
+    parser.add_argument('--asset-kb', type=int, default=0, help="KB de cada foto, fuente y tesela de las fichas simuladas")
+    parser.add_argument('--compare-lean', action='store_true',
+                        help="Ejecutar en modo normal y en modo ligero y comparar ambos")
+    parser.add_argument('--output', help="Archivo JSON de salida (por defecto, solo stdout)")
+    parser.add_argument('--compare', help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    # Los mensajes de progreso, avisos y comparaciones van a stderr; stdout queda solo para el JSON
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    if args.compare_lean:
+        # Misma configuración dos veces; solo cambia el modo ligero
+        prefix = f"{args.label} " if args.label else ""
+        baseline = run_benchmark(argparse.Namespace(**dict(vars(args), lean=False, label=f"{prefix}normal")))
+        result = run_benchmark(argparse.Namespace(**dict(vars(args), lean=True, label=f"{prefix}ligero")))
+        print(json.dumps([baseline, result], ensure_ascii=False, indent=2))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump([baseline, result], f, ensure_ascii=False, indent=2)
+            print(f"💾 Resultados guardados en {args.output}", file=sys.stderr)
+        print_comparison(result, baseline)
+        return
+
+    result = run_benchmark(args)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resultado guardado en {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print_comparison(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
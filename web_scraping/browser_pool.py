@@ -0,0 +1,171 @@
+import contextvars
+import logging
+import os
+import queue
+import shutil
+import threading
+
+from instrumentation import get_metrics
+
+log = logging.getLogger(__name__)
+
+# Marca que cada worker deja en la cola de resultados al terminar
+_WORKER_DONE = object()
+
+
+class BrowserPool:
+    """Pool de navegadores Chrome para extraer páginas de negocios en paralelo"""
+
+    def __init__(self, size=3, profile_root=None, max_retries=1, scraper_class=None, timer=None,
+                 scraper_kwargs=None):
+        """Configura el pool
+
+        size: número de navegadores (cada uno en su propio hilo).
+        profile_root: carpeta donde se crea un perfil de Chrome por navegador.
+        max_retries: reintentos de una URL cuando su navegador falla.
+        scraper_class: clase usada para crear cada navegador (GoogleMapsScraper por defecto).
+        timer: PhaseTimer compartido por todos los navegadores del pool.
+        scraper_kwargs: opciones adicionales para cada navegador (p. ej. headless, metrics).
+        """
+        self.size = max(1, int(size))
+        self.profile_root = profile_root or os.path.join(os.getcwd(), "chrome_profiles")
+        self.max_retries = max_retries
+        self.scraper_class = scraper_class
+        self.timer = timer
+        self.scraper_kwargs = scraper_kwargs or {}
+        self.metrics = self.scraper_kwargs.get('metrics') or get_metrics()
+        self.scrapers = [None] * self.size
+        # undetected_chromedriver parchea el binario al arrancar: no es seguro en paralelo
+        self._launch_lock = threading.Lock()
+
+    def _new_scraper(self, slot):
+        """Arranca el navegador del worker `slot` con su propio perfil"""
+        scraper_class = self.scraper_class
+        if scraper_class is None:
+            from undetected_method3 import GoogleMapsScraper
+            scraper_class = GoogleMapsScraper
+
+        profile_dir = os.path.join(self.profile_root, f"worker_{slot}")
+        with self._launch_lock:
+            log.info(f"   🧭 Worker {slot}: iniciando navegador...")
+            return scraper_class(profile_dir=profile_dir, timer=self.timer, **self.scraper_kwargs)
+
+    def _get_scraper(self, slot):
+        scraper = self.scrapers[slot]
+        if scraper is None or not scraper.is_alive():
+            self._discard_scraper(slot)
+            scraper = self._new_scraper(slot)
+            self.scrapers[slot] = scraper
+        return scraper
+
+    def _discard_scraper(self, slot):
+        """Cierra el navegador de un worker sin afectar a los demás"""
+        scraper = self.scrapers[slot]
+        self.scrapers[slot] = None
+        if scraper:
+            try:
+                scraper.close()
+            except Exception:
+                pass
+
+    def _worker(self, slot, tasks, results, method, stop):
+        """Procesa URLs de la cola hasta vaciarla o hasta `stop`; un fallo solo reinicia este navegador"""
+        try:
+            while not stop.is_set():
+                try:
+                    index, url, attempts = tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+                try:
+                    scraper = self._get_scraper(slot)
+                except Exception as e:
+                    # Sin navegador este worker no puede seguir: la URL queda para los demás
+                    log.error(f"   ❌ Worker {slot}: no se pudo iniciar el navegador: {e}")
+                    tasks.put((index, url, attempts))
+                    break
+
+                try:
+                    with scraper.timer.phase('extraccion'):
+                        data = getattr(scraper, method)(url, index)
+                    if data is None and not scraper.is_alive():
+                        raise RuntimeError("el navegador dejó de responder")
+                    results.put((index, data))
+                except Exception as e:
+                    log.warning(f"   ⚠️ Worker {slot}: fallo en el negocio {index + 1}: {e}")
+                    self._discard_scraper(slot)
+                    self.metrics.incr('browser_restarts')
+                    if attempts < self.max_retries and not stop.is_set():
+                        self.metrics.incr('retries')
+                        tasks.put((index, url, attempts + 1))
+                    else:
+                        results.put((index, None))
+        finally:
+            results.put(_WORKER_DONE)
+
+    def imap_unordered(self, urls, indices=None, method='extract_business_data'):
+        """Genera (índice, datos) a medida que cada navegador termina un negocio
+
+        indices: índice de cada URL (por defecto su posición en `urls`).
+        method: método del scraper que procesa cada URL, con firma (url, índice).
+        """
+        indices = list(range(len(urls))) if indices is None else list(indices)
+        tasks = queue.Queue()
+        results = queue.Queue()
+        for index, url in zip(indices, urls):
+            tasks.put((index, url, 0))
+
+        if not urls:
+            return
+
+        n_workers = min(self.size, len(urls))
+        stop = threading.Event()
+        threads = []
+        for slot in range(n_workers):
+            # Cada hilo hereda el contexto de quien llama (p. ej. el trabajo al que va su log)
+            context = contextvars.copy_context()
+            thread = threading.Thread(target=context.run, args=(self._worker, slot, tasks, results, method, stop),
+                                      daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        pending = set(indices)
+        finished_workers = 0
+        try:
+            while finished_workers < n_workers:
+                item = results.get()
+                if item is _WORKER_DONE:
+                    finished_workers += 1
+                    continue
+                index, data = item
+                pending.discard(index)
+                yield index, data
+        finally:
+            # Si el consumidor deja de iterar, los workers terminan tras su negocio actual;
+            # se espera a que acaben para que otra ejecución no use sus navegadores a la vez
+            stop.set()
+            while True:
+                try:
+                    tasks.get_nowait()
+                except queue.Empty:
+                    break
+            for thread in threads:
+                thread.join()
+
+        # URLs que quedaron sin procesar porque ningún navegador pudo arrancar
+        for index in sorted(pending):
+            log.error(f"   ❌ Negocio {index + 1} sin procesar: no hay navegadores disponibles")
+            yield index, None
+
+    def extract_all(self, urls):
+        """Extrae todos los negocios en paralelo y devuelve los resultados en el orden original"""
+        log.info(f"🧭 Extrayendo {len(urls)} negocios con {min(self.size, len(urls))} navegadores en paralelo...")
+        ordered = [None] * len(urls)
+        for index, data in self.imap_unordered(urls):
+            ordered[index] = data
+        return [data for data in ordered if data]
+
+    def close(self):
+        for slot in range(self.size):
+            self._discard_scraper(slot)
+        shutil.rmtree(self.profile_root, ignore_errors=True)
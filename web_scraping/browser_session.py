@@ -0,0 +1,185 @@
+"""Sesión de navegador de larga vida compartida por todas las búsquedas de un proceso.
+
+Arrancar Chrome cuesta varios segundos; la app de Streamlit guarda una única
+ManagedScraperSession con st.cache_resource y cada búsqueda toma prestado el
+mismo GoogleMapsScraper:
+
+    session = ManagedScraperSession(cache_path='place_cache.sqlite')
+    with session.use(workers=2, use_cache=True) as scraper:
+        businesses = list(scraper.iter_businesses(url, max_results=20))
+
+El préstamo es exclusivo (un lock serializa búsquedas de varias pestañas), el
+navegador se reinicia si dejó de responder y se cierra tras `idle_timeout`
+segundos sin uso; la siguiente búsqueda lo vuelve a arrancar.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from place_cache import PlaceCache
+
+log = logging.getLogger(__name__)
+
+
+class ManagedScraperSession:
+    """Presta en exclusiva un GoogleMapsScraper y mantiene su navegador sano"""
+
+    def __init__(self, idle_timeout=600, check_interval=30, cache_path=None, scraper_factory=None,
+                 **scraper_kwargs):
+        """Configura la sesión (el navegador no arranca hasta el primer préstamo)
+
+        idle_timeout: segundos sin uso tras los que se cierra el navegador (None = nunca).
+        check_interval: cada cuántos segundos se revisan inactividad y salud.
+        cache_path: archivo de la PlaceCache compartida por todas las búsquedas.
+        scraper_factory: callable que crea el scraper (GoogleMapsScraper por defecto).
+        scraper_kwargs: opciones fijas del navegador (p. ej. headless, profile_dir).
+        """
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self.scraper_factory = scraper_factory
+        self.scraper_kwargs = scraper_kwargs
+        self.cache = PlaceCache(cache_path) if cache_path else None
+        self.starts = 0
+        self.last_error = None
+        self.closed = False
+        self._scraper = None
+        self._in_use = False
+        self._last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._monitor = None
+
+    def _create_scraper(self):
+        factory = self.scraper_factory
+        if factory is None:
+            from undetected_method3 import GoogleMapsScraper
+            factory = GoogleMapsScraper
+        self.starts += 1
+        log.info(f"🧭 Iniciando navegador de la sesión (arranque #{self.starts})...")
+        return factory(**self.scraper_kwargs)
+
+    def _close_scraper(self):
+        scraper, self._scraper = self._scraper, None
+        if scraper:
+            # La caché pertenece a la sesión: el scraper no debe cerrarla
+            scraper.cache = None
+            try:
+                scraper.close()
+            except Exception as e:
+                log.warning(f"⚠️ Error cerrando el navegador de la sesión: {e}")
+
+    def _ensure_scraper(self):
+        """Devuelve un scraper con el navegador respondiendo, reiniciándolo si hace falta"""
+        if self._scraper is not None and not self._scraper.is_alive():
+            log.warning("⚠️ El navegador de la sesión dejó de responder, reiniciando...")
+            self._close_scraper()
+        if self._scraper is None:
+            try:
+                self._scraper = self._create_scraper()
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+        return self._scraper
+
+    def _start_monitor(self):
+        if self._monitor is None and self.check_interval:
+            self._monitor = threading.Thread(target=self._watch, name='browser-session-monitor', daemon=True)
+            self._monitor.start()
+
+    def _watch(self):
+        """Cierra el navegador inactivo y reinicia en segundo plano el que murió sin estar en uso"""
+        while not self._stop.wait(self.check_interval):
+            if not self._lock.acquire(blocking=False):
+                continue  # Hay una búsqueda en curso
+            try:
+                if self._scraper is None:
+                    continue
+                idle = time.monotonic() - self._last_used
+                if self.idle_timeout is not None and idle >= self.idle_timeout:
+                    log.info(f"💤 Navegador inactivo {idle:.0f}s, cerrándolo")
+                    self._close_scraper()
+                elif not self._scraper.is_alive():
+                    self._close_scraper()
+                    self._ensure_scraper()
+            except Exception as e:
+                self.last_error = str(e)
+            finally:
+                self._lock.release()
+
+    def acquire(self, timeout=None, workers=1, use_observer=False, use_cache=True, offline_parsing=False,
+                snapshot_dir=None):
+        """Toma el scraper en exclusiva con las opciones de esta búsqueda; hay que llamar a release()
+
+        timeout: segundos máximos esperando a que otra búsqueda lo libere (None = sin límite).
+        """
+        if self.closed:
+            raise RuntimeError("La sesión de navegador está cerrada")
+        if not self._lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError("El navegador está ocupado con otra búsqueda")
+        try:
+            scraper = self._ensure_scraper()
+            scraper.configure(
+                workers=workers,
+                use_observer=use_observer,
+                offline_parsing=offline_parsing,
+                snapshot_dir=snapshot_dir or ''
+            )
+            scraper.cache = self.cache if use_cache else None
+        except Exception:
+            self._lock.release()
+            raise
+        with self._state_lock:
+            self._in_use = True
+        self._start_monitor()
+        return scraper
+
+    def release(self):
+        with self._state_lock:
+            self._in_use = False
+            self._last_used = time.monotonic()
+        self._lock.release()
+
+    @contextmanager
+    def use(self, timeout=None, **options):
+        """Context manager equivalente a acquire()/release()"""
+        scraper = self.acquire(timeout=timeout, **options)
+        try:
+            yield scraper
+        finally:
+            self.release()
+
+    def status(self):
+        """Estado de la sesión para mostrarlo en la interfaz"""
+        with self._state_lock:
+            in_use = self._in_use
+            idle = time.monotonic() - self._last_used
+        scraper = self._scraper
+        return {
+            'activo': scraper is not None,
+            'en_uso': in_use,
+            'inactivo_s': None if in_use else round(idle),
+            'arranques': self.starts,
+            'navegadores_pool': scraper.workers if scraper else 0,
+            'ultimo_error': self.last_error,
+        }
+
+    def restart(self):
+        """Cierra el navegador actual (si no está en uso); el próximo préstamo arranca otro"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._close_scraper()
+            return True
+        finally:
+            self._lock.release()
+
+    def close(self):
+        self.closed = True
+        self._stop.set()
+        with self._lock:
+            self._close_scraper()
+            if self.cache:
+                self.cache.close()
+                self.cache = None
@@ -0,0 +1,237 @@
+"""Registro tipado de un negocio, normalizado una sola vez al extraerlo.
+
+Sustituye a los dicts con 'No disponible' en los campos faltantes y números como
+texto ("4,5", "1.234"): los datos que faltan son None, la calificación es float,
+las reseñas int y el teléfono se guarda en formato E.164 (+525512345678). Los
+esquemas de Arrow y pandas usan categorías para tipo y busqueda, que se repiten
+mucho, y tipos numéricos con nulos para que los tableros calculen vectorizado:
+
+    record = BusinessRecord.from_fields({'nombre': 'Café', 'calificacion': '4,5'}, index=0)
+    record.calificacion        # 4.5
+    df = to_frame(records)     # calificacion Float64, tipo category...
+
+El registro también se comporta como un dict de solo esas claves (record['nombre'],
+record.get('tipo'), dict(record)), así que escritores, caché y base de prospectos
+lo reciben igual que antes.
+"""
+import re
+from dataclasses import dataclass, fields
+from typing import Optional
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# Marcador de dato faltante de versiones anteriores (diarios, caché y CSV antiguos)
+LEGACY_MISSING = 'No disponible'
+
+# Prefijo internacional que se asume para teléfonos escritos sin él (México)
+DEFAULT_COUNTRY_CODE = '52'
+
+
+@dataclass(slots=True)
+class BusinessRecord:
+    indice: int = 0
+    nombre: Optional[str] = None
+    calificacion: Optional[float] = None
+    num_reviews: Optional[int] = None
+    tipo: Optional[str] = None
+    direccion: Optional[str] = None
+    telefono: Optional[str] = None
+    website: Optional[str] = None
+    email: Optional[str] = None
+    place_key: Optional[str] = None
+    busqueda: Optional[str] = None
+    fecha_extraccion: Optional[str] = None
+    indice_global: Optional[int] = None
+
+    @classmethod
+    def from_fields(cls, fields, index, place_key=None):
+        """Campos en bruto de la página (texto o None) -> registro normalizado"""
+        return cls.from_dict(fields or {}, indice=index, place_key=place_key)
+
+    @classmethod
+    def from_dict(cls, data, **overrides):
+        """Dict de cualquier versión (con 'No disponible' o ya tipado) o fila de CSV -> registro"""
+        data = dict(data, **overrides)
+        return cls(
+            indice=parse_int(data.get('indice')) or 0,
+            nombre=clean_text(data.get('nombre')),
+            calificacion=parse_rating(data.get('calificacion')),
+            num_reviews=parse_reviews(data.get('num_reviews')),
+            tipo=clean_text(data.get('tipo')),
+            direccion=clean_text(data.get('direccion')),
+            telefono=normalize_phone(data.get('telefono')),
+            website=clean_text(data.get('website')),
+            email=(clean_text(data.get('email')) or '').lower() or None,
+            place_key=clean_text(data.get('place_key')),
+            busqueda=clean_text(data.get('busqueda')),
+            fecha_extraccion=clean_text(data.get('fecha_extraccion')),
+            indice_global=parse_int(data.get('indice_global')),
+        )
+
+    @classmethod
+    def coerce(cls, business):
+        """Devuelve el propio registro o lo construye a partir de un dict"""
+        return business if isinstance(business, cls) else cls.from_dict(business)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+    # Interfaz de dict de solo lectura/escritura sobre los campos
+    def keys(self):
+        return FIELDS
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in FIELDS]
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in FIELDS else None
+        return default if value is None else value
+
+
+FIELDS = tuple(field.name for field in fields(BusinessRecord))
+
+
+def clean_text(value):
+    """Texto sin espacios sobrantes o None si falta (None, '', NaN o 'No disponible')"""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    value = ' '.join(str(value).split())
+    return None if value in ('', LEGACY_MISSING) else value
+
+
+def parse_int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return None if value != value else int(value)
+    try:
+        return int(float(clean_text(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rating(value):
+    """'4,5' / '4.5 estrellas' / 4.5 -> 4.5; None si falta o está fuera de 0-5"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        rating = float(value)
+    else:
+        text = clean_text(value)
+        match = re.search(r'\d+(?:[.,]\d+)?', text or '')
+        if not match:
+            return None
+        rating = float(match.group().replace(',', '.'))
+    return rating if 0 <= rating <= 5 else None
+
+
+def parse_reviews(value):
+    """'(1.234)' / '1,234' / '1,2 mil' / '3.4K' / 1234 -> número entero de reseñas"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return parse_int(value)
+    text = clean_text(value)
+    match = re.search(r'(\d+(?:[.,\s]\d+)*)\s*(mil|k)?', text or '', re.IGNORECASE)
+    if not match:
+        return None
+    number, multiplier = match.group(1), match.group(2)
+    if multiplier:
+        return int(round(float(re.sub(r'\s', '', number).replace(',', '.')) * 1000))
+    # Sin multiplicador los puntos, comas y espacios son separadores de miles
+    return int(re.sub(r'\D', '', number))
+
+
+def _e164(digits):
+    return f"+{digits}" if 8 <= len(digits) <= 15 else None
+
+
+def normalize_phone(value, country_code=DEFAULT_COUNTRY_CODE):
+    """Teléfono en formato E.164 ('55 1234 5678' -> '+525512345678'); None si no es un número válido"""
+    text = clean_text(value)
+    if not text:
+        return None
+    digits = re.sub(r'\D', '', text)
+    if text.startswith('+'):
+        return _e164(digits)
+    if digits.startswith('00'):
+        return _e164(digits[2:])
+    if country_code == '52':
+        # Prefijos nacionales antiguos de México (01 fijo, 044/045 celular)
+        for prefix in ('044', '045', '01'):
+            if digits.startswith(prefix) and len(digits) == 10 + len(prefix):
+                digits = digits[len(prefix):]
+                break
+    if len(digits) > 10 and digits.startswith(country_code):
+        return _e164(digits)
+    return _e164(country_code + digits.lstrip('0'))
+
+
+# Tipos de pandas: nulos nativos (Float64/Int64) y categorías para columnas repetitivas
+PANDAS_DTYPES = {
+    'indice': 'Int64',
+    'nombre': 'string',
+    'calificacion': 'Float64',
+    'num_reviews': 'Int64',
+    'tipo': 'category',
+    'direccion': 'string',
+    'telefono': 'string',
+    'website': 'string',
+    'email': 'string',
+    'place_key': 'string',
+    'busqueda': 'category',
+    'fecha_extraccion': 'string',
+    'indice_global': 'Int64',
+}
+
+
+def _arrow_type(column):
+    if column in ('indice', 'num_reviews', 'indice_global'):
+        return pa.int64()
+    if column == 'calificacion':
+        return pa.float64()
+    if column in ('tipo', 'busqueda'):
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def arrow_schema(columns=FIELDS):
+    """Esquema de Arrow para estas columnas (las que no son del registro, como texto)"""
+    if pa is None:
+        raise ImportError("El esquema de Arrow necesita pyarrow: pip install pyarrow")
+    return pa.schema([(column, _arrow_type(column)) for column in columns])
+
+
+def apply_dtypes(df):
+    """Aplica PANDAS_DTYPES a las columnas del DataFrame que los tengan"""
+    for column, dtype in PANDAS_DTYPES.items():
+        if column in df.columns and str(df[column].dtype) != dtype:
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def to_frame(businesses, columns=None):
+    """Registros (o dicts) -> DataFrame con los tipos de PANDAS_DTYPES"""
+    if pd is None:
+        raise ImportError("to_frame necesita pandas")
+    rows = [BusinessRecord.coerce(business).to_dict() for business in businesses]
+    return apply_dtypes(pd.DataFrame(rows, columns=list(columns or FIELDS)))
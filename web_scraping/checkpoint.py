@@ -0,0 +1,111 @@
+import json
+import os
+
+
+class RunJournal:
+    """Diario durable de una búsqueda para poder reanudarla tras un fallo
+
+    Se guarda en JSON Lines y se sincroniza con el disco en cada escritura:
+      {"tipo": "busqueda", "url": ..., "max_results": ...}
+      {"tipo": "frontera", "urls": [...]}        URLs de negocios recolectadas (solo las nuevas)
+      {"tipo": "negocio", "url": ..., "datos": {...}}   extracción completada
+      {"tipo": "fin"}                            la búsqueda terminó
+    Una última línea truncada (corte a mitad de escritura) se ignora al cargar.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.search_url = None
+        self.frontier = []
+        self.completed = {}
+        self.finished = False
+        self._frontier_set = set()
+        self._truncated = False
+        self._load()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        if self._truncated:
+            # Separar la línea cortada para que la siguiente escritura no se mezcle con ella
+            self._file.write('\n')
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                self._truncated = not line.endswith('\n')
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                kind = record.get('tipo')
+                if kind == 'busqueda':
+                    self.search_url = record.get('url')
+                elif kind == 'frontera':
+                    self._extend_frontier(record.get('urls', []))
+                elif kind == 'negocio':
+                    self.completed[record['url']] = record['datos']
+                elif kind == 'fin':
+                    self.finished = True
+
+    def _extend_frontier(self, urls):
+        new_urls = [url for url in urls if url not in self._frontier_set]
+        for url in new_urls:
+            self._frontier_set.add(url)
+            self.frontier.append(url)
+        return new_urls
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @property
+    def has_progress(self):
+        """True si el diario contiene trabajo de una ejecución anterior"""
+        return bool(self.frontier or self.completed)
+
+    def record_search(self, url, max_results):
+        if self.search_url != url:
+            if self.search_url is not None:
+                # Es otra búsqueda: lo registrado de la anterior no le sirve
+                self._file.truncate(0)
+                self.frontier = []
+                self.completed = {}
+                self.finished = False
+                self._frontier_set = set()
+            self.search_url = url
+            self._write({'tipo': 'busqueda', 'url': url, 'max_results': max_results})
+
+    def add_frontier(self, urls):
+        """Añade a la frontera las URLs que aún no estaban registradas"""
+        new_urls = self._extend_frontier(urls)
+        if new_urls:
+            self._write({'tipo': 'frontera', 'urls': new_urls})
+
+    def is_completed(self, url):
+        return url in self.completed
+
+    def record_business(self, url, data):
+        self.completed[url] = data
+        self._write({'tipo': 'negocio', 'url': url, 'datos': data})
+
+    def mark_finished(self):
+        if not self.finished:
+            self.finished = True
+            self._write({'tipo': 'fin'})
+
+    def close(self):
+        if self._file and not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        """Cierra y borra el diario (la búsqueda ya quedó guardada en otro sitio)"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,138 @@
+"""Importación por bloques de CSV grandes a la base de prospectos.
+
+Leer un consolidado con pandas y convertirlo a una lista de dicts tenía el archivo
+dos veces en memoria. Aquí el CSV se lee en bloques de `batch_size` filas con el
+lector en streaming de pyarrow (o csv.DictReader si no está instalado) y cada
+bloque se guarda con ProspectStore.upsert_many, que fusiona los duplicados por
+place_key; en memoria nunca hay más de un bloque:
+
+    report = ingest_csv(store, 'consolidado.csv')
+    report['filas_por_segundo']
+
+Los tipos son explícitos: todas las columnas se leen como texto (BusinessRecord
+normaliza calificaciones "4,5", reseñas "1.234" y teléfonos, que inferidos como
+número perderían el +) y tipo/busqueda como diccionario, porque se repiten mucho.
+"""
+import csv
+import io
+import os
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+from business_record import LEGACY_MISSING
+
+# Columnas que se leen como categorías (diccionario de Arrow)
+CATEGORY_COLUMNS = ('tipo', 'busqueda')
+
+# Tamaño de los bloques que lee pyarrow (bytes)
+READ_BLOCK_SIZE = 1 << 20
+
+
+def _read_header(f):
+    """Nombres de columna de la primera línea, dejando el archivo al principio"""
+    line = f.readline()
+    f.seek(0)
+    return next(csv.reader([line.decode('utf-8-sig')]), [])
+
+
+def _arrow_batches(f, batch_size):
+    header = _read_header(f)
+    column_types = {
+        column: pa.dictionary(pa.int32(), pa.string()) if column in CATEGORY_COLUMNS else pa.string()
+        for column in header
+    }
+    reader = pa_csv.open_csv(
+        f,
+        read_options=pa_csv.ReadOptions(block_size=READ_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            null_values=['', LEGACY_MISSING],
+            strings_can_be_null=True
+        )
+    )
+    for batch in reader:
+        # Los bloques de pyarrow dependen de los bytes; se reparten en lotes de batch_size filas
+        for start in range(0, batch.num_rows, batch_size):
+            yield batch.slice(start, batch_size).to_pylist()
+
+
+def _text_batches(f, batch_size):
+    text = io.TextIOWrapper(f, encoding='utf-8-sig', newline='')
+    try:
+        batch = []
+        for row in csv.DictReader(text):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        # Sin cerrar el archivo de quien llama
+        text.detach()
+
+
+def csv_batches(f, batch_size=5000):
+    """Filas de un CSV abierto en binario, en listas de hasta batch_size dicts"""
+    if pa_csv is not None:
+        return _arrow_batches(f, batch_size)
+    return _text_batches(f, batch_size)
+
+
+def _source_size(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    size = getattr(source, 'size', None)
+    if size is None and source.seekable():
+        size = source.seek(0, io.SEEK_END)
+        source.seek(0)
+    return size
+
+
+def ingest_csv(store, source, busqueda=None, batch_size=5000):
+    """Importa un CSV (ruta o archivo binario, p. ej. el de st.file_uploader) a la base
+
+    busqueda: nombre que se asigna a las filas que no traen la columna 'busqueda'.
+    Devuelve el informe: archivo, filas, nuevos, actualizados, bloques, bytes, segundos,
+    filas_por_segundo y mb_por_segundo. Las filas sin nombre ni place_key se descartan
+    (cuentan en 'filas' pero no en nuevos ni actualizados).
+    """
+    started = time.perf_counter()
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', 'archivo')
+    size = _source_size(source)
+    rows = new = updated = batches = 0
+
+    f = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        for batch in csv_batches(f, batch_size):
+            if busqueda:
+                for row in batch:
+                    if not row.get('busqueda'):
+                        row['busqueda'] = busqueda
+            counts = store.upsert_many(batch)
+            rows += len(batch)
+            new += counts[0]
+            updated += counts[1]
+            batches += 1
+    finally:
+        if f is not source:
+            f.close()
+
+    seconds = time.perf_counter() - started
+    return {
+        'archivo': str(name),
+        'filas': rows,
+        'nuevos': new,
+        'actualizados': updated,
+        'bloques': batches,
+        'bytes': size,
+        'segundos': round(seconds, 3),
+        'filas_por_segundo': round(rows / seconds) if seconds else rows,
+        'mb_por_segundo': round(size / seconds / 1e6, 2) if size and seconds else None,
+    }
@@ -0,0 +1,62 @@
+"""Capa de datos memoizada de las apps de Streamlit.
+
+Streamlit vuelve a ejecutar el script completo en cada interacción; sin memoizar,
+cada clic en un filtro recalculaba totales, completitud, tipos e histograma sobre
+todos los prospectos. Estas funciones usan st.cache_data con la versión de los
+datos (ProspectStore.data_version) como clave, así que solo se recalculan cuando se
+añaden o borran negocios:
+
+    version = store.data_version()
+    summary = dashboard_summary(store, version)
+    total, df = filtered_table(store, version, {'has_phone': True}, 'calificacion', True, 5000)
+
+El primer argumento lleva guion bajo para que Streamlit no intente hashear la
+conexión; la versión ya identifica a la base (incluye un id propio de cada instancia).
+
+Las descargas se generan solo al pulsar el botón: lazy_export devuelve un callable
+para st.download_button que vuelca la consulta por páginas a un archivo temporal
+(con los escritores de output_writers, sin pasar por un DataFrame). Los bytes no se
+guardan en caché: solo existen mientras se sirve la descarga.
+"""
+import os
+import tempfile
+
+import streamlit as st
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def dashboard_summary(_store, version, top_tipos=15):
+    """Totales y completitud, tipos más frecuentes, distribución de calificaciones, búsquedas e historial
+
+    'busquedas' es la lista de ProspectStore.searches(): [{busqueda, negocios, ultima_extraccion}].
+    """
+    return {
+        'stats': _store.stats(),
+        'tipos': _store.tipo_counts(limit=top_tipos),
+        'calificaciones': _store.rating_distribution(),
+        'busquedas': _store.searches(),
+        'historial': _store.history(),
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def filtered_table(_store, version, filters, order_by, descending, limit):
+    """(total que cumple los filtros, DataFrame tipado con las primeras `limit` filas)"""
+    return _store.count(**filters), _store.query_df(order_by=order_by, descending=descending, limit=limit, **filters)
+
+
+def export_file(store, extension, filters):
+    """Bytes del archivo de exportación (.csv, .json, .jsonl o .parquet) de los prospectos filtrados"""
+    # Archivo temporal: sin fsync (los escritores de texto lo hacen cada 50 filas por defecto)
+    writer_options = {} if extension == '.parquet' else {'fsync_every': 0}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"exportacion{extension}")
+        store.export(path, writer_options=writer_options, order_by='primera_extraccion', descending=False,
+                     **filters)
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+def lazy_export(store, extension='.csv', **filters):
+    """Callable sin argumentos para st.download_button: el archivo se genera al pulsar el botón"""
+    return lambda: export_file(store, extension, filters)
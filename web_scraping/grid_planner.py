@@ -0,0 +1,161 @@
+"""Reparte una búsqueda sobre una cuadrícula geográfica para cubrir toda una zona.
+
+Una sola búsqueda de Google Maps deja de dar tarjetas tras unos cientos de
+resultados; dividiendo el rectángulo en celdas (una URL @lat,lng,zoom por celda)
+la cobertura crece con el número de navegadores y no con la profundidad del
+scroll. Las celdas se ejecutan con BatchRunner, que fusiona los resultados en un
+consolidado sin duplicados (las celdas se solapan ligeramente a propósito):
+
+    python grid_planner.py "dentistas" --bbox 19.30,-99.25,19.55,-99.05 --zoom 15 --concurrency 3
+    python grid_planner.py "dentistas" --bbox 19.30,-99.25,19.55,-99.05 --plan-only --plan busquedas.csv
+"""
+import argparse
+import csv
+import json
+import logging
+import math
+import re
+import sys
+from urllib.parse import quote_plus
+
+from batch_scraper import BatchRunner, print_report
+
+# Tamaño aproximado del mapa visible en la ventana de Chrome (sin el panel de resultados)
+DEFAULT_VIEWPORT = (1000, 800)
+
+# Límite de celdas para no lanzar por error miles de búsquedas
+MAX_TILES = 2000
+
+
+def search_url(query, lat, lng, zoom):
+    """URL de búsqueda de Google Maps centrada en (lat, lng) con el zoom dado"""
+    return f"https://www.google.com/maps/search/{quote_plus(query)}/@{lat:.6f},{lng:.6f},{zoom}z"
+
+
+def tile_span(zoom, lat, viewport=DEFAULT_VIEWPORT):
+    """Grados (lat, lng) que cubre el mapa visible a ese zoom y latitud (proyección Mercator)"""
+    world_px = 256 * 2 ** zoom
+    lng_span = viewport[0] / world_px * 360
+    lat_span = viewport[1] / world_px * 360 * math.cos(math.radians(lat))
+    return lat_span, lng_span
+
+
+def parse_bbox(text):
+    """'sur,oeste,norte,este' -> tupla de floats validada"""
+    try:
+        south, west, north, east = (float(part) for part in text.split(','))
+    except ValueError:
+        raise ValueError("El rectángulo debe tener el formato sur,oeste,norte,este (grados decimales)")
+    if south >= north or west >= east:
+        raise ValueError("El rectángulo debe cumplir sur < norte y oeste < este")
+    return south, west, north, east
+
+
+def plan_grid(query, bbox, zoom=15, overlap=0.1, max_results=60, viewport=DEFAULT_VIEWPORT, name=None):
+    """Divide bbox (sur, oeste, norte, este) en celdas y devuelve una búsqueda por celda
+
+    overlap: fracción de solapamiento entre celdas vecinas (los negocios en el borde
+    aparecen en ambas y se deduplican al fusionar).
+    Cada búsqueda es un dict compatible con BatchRunner: url, nombre y max_resultados,
+    más lat, lng y zoom del centro de la celda.
+    """
+    south, west, north, east = bbox
+    lat_span, lng_span = tile_span(zoom, (south + north) / 2, viewport)
+    lat_step = lat_span * (1 - overlap)
+    lng_step = lng_span * (1 - overlap)
+    rows = max(1, math.ceil((north - south) / lat_step))
+    cols = max(1, math.ceil((east - west) / lng_step))
+    if rows * cols > MAX_TILES:
+        raise ValueError(f"La cuadrícula tendría {rows * cols} celdas (máximo {MAX_TILES}); reduce el zoom o el área")
+
+    base = re.sub(r'[^\w\-]+', '_', name or query).strip('_') or 'busqueda'
+    searches = []
+    for row in range(rows):
+        # Centrar la cuadrícula: el sobrante se reparte a ambos lados del rectángulo
+        lat = south + (north - south) * (row + 0.5) / rows
+        for col in range(cols):
+            lng = west + (east - west) * (col + 0.5) / cols
+            searches.append({
+                'url': search_url(query, lat, lng, zoom),
+                'nombre': f"{base}_r{row:02d}_c{col:02d}",
+                'max_resultados': max_results,
+                'lat': round(lat, 6),
+                'lng': round(lng, 6),
+                'zoom': zoom,
+            })
+    return searches
+
+
+def save_plan(searches, path):
+    """Guarda el plan en un CSV que batch_scraper.py puede ejecutar más tarde"""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['url', 'nombre', 'max_resultados', 'lat', 'lng', 'zoom'])
+        writer.writeheader()
+        writer.writerows(searches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta una búsqueda de Google Maps sobre una cuadrícula")
+    parser.add_argument('query', help="Texto de búsqueda, p. ej. 'dentistas'")
+    parser.add_argument('--bbox', required=True, help="Rectángulo sur,oeste,norte,este en grados decimales")
+    parser.add_argument('--zoom', type=int, default=15, help="Zoom de cada celda (más zoom = celdas más pequeñas)")
+    parser.add_argument('--overlap', type=float, default=0.1, help="Solapamiento entre celdas (0-0.5)")
+    parser.add_argument('--max-results', type=int, default=60, help="Máximo de negocios por celda")
+    parser.add_argument('--name', help="Prefijo de los nombres de cada celda (por defecto, la consulta)")
+    parser.add_argument('--plan', help="Guardar el plan en este CSV")
+    parser.add_argument('--plan-only', action='store_true', help="Solo generar el plan, sin ejecutarlo")
+    parser.add_argument('--output-dir', default='grid_output')
+    parser.add_argument('--concurrency', type=int, default=2, help="Celdas simultáneas (un navegador cada una)")
+    parser.add_argument('--workers', type=int, default=1, help="Navegadores por celda para las fichas")
+    parser.add_argument('--cache', default='place_cache.sqlite', help="Caché de negocios ('' para desactivarla)")
+    parser.add_argument('--headed', action='store_true', help="Mostrar las ventanas de Chrome")
+    parser.add_argument('--observer', action='store_true', help="Usar el modo MutationObserver en el scroll")
+    parser.add_argument('--lean', action='store_true', help="Modo ligero (bloquea imágenes, fuentes, teselas...)")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'parquet'], default='csv',
+                        help="Formato de los archivos de salida")
+    parser.add_argument('--db', default='prospectos.sqlite', help="Base de prospectos ('' para no usarla)")
+    parser.add_argument('--report', help="Archivo JSON donde guardar el informe")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(threadName)s %(message)s')
+
+    try:
+        bbox = parse_bbox(args.bbox)
+        searches = plan_grid(args.query, bbox, zoom=args.zoom, overlap=min(max(args.overlap, 0.0), 0.5),
+                             max_results=args.max_results, name=args.name)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"🗺️ {len(searches)} celdas a zoom {args.zoom} para '{args.query}'")
+    if args.plan:
+        save_plan(searches, args.plan)
+        print(f"💾 Plan guardado en {args.plan}")
+    if args.plan_only:
+        return
+
+    runner = BatchRunner(
+        output_dir=args.output_dir,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        cache_path=args.cache or None,
+        headless=not args.headed,
+        use_observer=args.observer,
+        lean=args.lean,
+        output_format=args.format,
+        store_path=args.db or None
+    )
+    try:
+        report = runner.run(searches)
+    finally:
+        runner.close()
+
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Informe guardado en {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Métricas y trazas del scraper.
+
+Por defecto todo va a NoopMetrics, cuyo coste es una llamada vacía. Para medir:
+
+    metrics = Metrics(exporters=[JsonLinesExporter('metrics/eventos.jsonl')])
+    set_metrics(metrics)            # o GoogleMapsScraper(metrics=metrics)
+    ...
+    metrics.write_prometheus('metrics/scraper.prom')
+
+Spans: setup_driver, navigate, wait, scroll_iteration, extract, save.
+Contadores: selector_hits / selector_misses (por campo), wait_timeouts, retries,
+cache_hits / cache_misses, businesses_extracted, extraction_failures.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **labels):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class NoopMetrics:
+    """Implementación por defecto: no registra nada"""
+
+    enabled = False
+
+    def span(self, name, **labels):
+        return _NOOP_SPAN
+
+    def incr(self, name, value=1, **labels):
+        pass
+
+
+class _Span:
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def set(self, **labels):
+        """Añade etiquetas conocidas solo al terminar (p. ej. el resultado)"""
+        self.labels.update(labels)
+
+    def __enter__(self):
+        self.start_ts = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._record_span(self, time.perf_counter() - self._start, exc_type is not None)
+        return False
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metrics:
+    """Registro en memoria de spans y contadores, seguro entre hilos"""
+
+    enabled = True
+
+    def __init__(self, exporters=()):
+        self.exporters = list(exporters)
+        self.counters = Counter()
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, **labels):
+        return _Span(self, name, labels)
+
+    def incr(self, name, value=1, **labels):
+        with self._lock:
+            self.counters[(name, _label_key(labels))] += value
+        self._export({'tipo': 'contador', 'nombre': name, 'valor': value, 'etiquetas': labels, 'ts': time.time()})
+
+    def _record_span(self, span, duration, error):
+        key = (span.name, _label_key(span.labels))
+        with self._lock:
+            stats = self.spans.setdefault(key, {'count': 0, 'sum': 0.0, 'max': 0.0, 'errors': 0})
+            stats['count'] += 1
+            stats['sum'] += duration
+            stats['max'] = max(stats['max'], duration)
+            stats['errors'] += int(error)
+        self._export({
+            'tipo': 'span', 'nombre': span.name, 'etiquetas': span.labels, 'ts': span.start_ts,
+            'duracion_s': round(duration, 6), 'error': error, 'hilo': threading.current_thread().name,
+        })
+
+    def _export(self, event):
+        for exporter in self.exporters:
+            exporter.export(event)
+
+    def snapshot(self):
+        """Contadores y resumen de spans como dicts serializables a JSON"""
+        with self._lock:
+            counters = [
+                {'nombre': name, 'etiquetas': dict(labels), 'valor': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            spans = [
+                dict(stats, nombre=name, etiquetas=dict(labels))
+                for (name, labels), stats in sorted(self.spans.items())
+            ]
+        return {'contadores': counters, 'spans': spans}
+
+    def to_prometheus(self, prefix='gmaps'):
+        """Formato de texto de Prometheus (exposition format 0.0.4)"""
+        def labels_text(labels):
+            if not labels:
+                return ''
+            escaped = (
+                '{}="{}"'.format(key, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                for key, value in labels
+            )
+            return '{' + ','.join(escaped) + '}'
+
+        lines = []
+        with self._lock:
+            counter_names = sorted({name for name, _ in self.counters})
+            for name in counter_names:
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (counter_name, labels), value in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{metric}{labels_text(labels)} {value}")
+
+            if self.spans:
+                metric = f"{prefix}_span_duration_seconds"
+                lines.append(f"# TYPE {metric} summary")
+                for (name, labels), stats in sorted(self.spans.items()):
+                    span_labels = (('span', name),) + labels
+                    lines.append(f"{metric}_count{labels_text(span_labels)} {stats['count']}")
+                    lines.append(f"{metric}_sum{labels_text(span_labels)} {stats['sum']:.6f}")
+                lines.append(f"# TYPE {prefix}_span_errors_total counter")
+                for (name, labels), stats in sorted(self.spans.items()):
+                    span_labels = (('span', name),) + labels
+                    lines.append(f"{prefix}_span_errors_total{labels_text(span_labels)} {stats['errors']}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, prefix='gmaps'):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Escritura atómica: un scraper de node_exporter nunca ve el archivo a medias
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, path)
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+
+
+class JsonLinesExporter:
+    """Escribe cada span y cada incremento de contador como una línea JSON"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def export(self, event):
+        line = json.dumps(event, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+_metrics = NoopMetrics()
+
+
+def get_metrics():
+    """Registro de métricas global (NoopMetrics salvo que se configure otro)"""
+    return _metrics
+
+
+def set_metrics(metrics):
+    global _metrics
+    _metrics = metrics or NoopMetrics()
+    return _metrics
@@ -0,0 +1,239 @@
+"""Trabajos de scraping en segundo plano para que la interfaz nunca se bloquee.
+
+Cada búsqueda enviada se convierte en un ScrapeJob que un pool de hilos ejecuta
+con su propio navegador (una ManagedScraperSession por trabajo simultáneo). La
+interfaz consulta periódicamente el estado, los negocios parciales y el log de
+cada trabajo, y puede cancelarlo:
+
+    manager = JobManager(max_concurrent=2, cache_path='place_cache.sqlite')
+    job = manager.submit(url, max_results=20, search_name='dentistas_cdmx', workers=2)
+    ...
+    job.snapshot()['estado']      # 'en_cola', 'ejecutando', 'completado', 'cancelado' o 'error'
+    manager.cancel(job.id)
+"""
+import contextvars
+import logging
+import os
+import queue
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from browser_session import ManagedScraperSession
+
+log = logging.getLogger(__name__)
+
+# Trabajo que se está ejecutando en este contexto (BrowserPool lo hereda en sus hilos)
+_current_job = contextvars.ContextVar('scrape_job', default=None)
+
+# Loggers cuyos mensajes INFO se copian al log de cada trabajo
+JOB_LOGGERS = ('undetected_method3', 'browser_pool', 'browser_session', 'waits', 'output_writers', __name__)
+
+QUEUED = 'en_cola'
+RUNNING = 'ejecutando'
+DONE = 'completado'
+CANCELLED = 'cancelado'
+FAILED = 'error'
+FINAL_STATES = (DONE, CANCELLED, FAILED)
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ScrapeJob:
+    """Una búsqueda encolada: estado, negocios extraídos hasta ahora y log propio"""
+
+    def __init__(self, url, max_results, search_name, options=None, max_log_lines=300):
+        self.id = uuid.uuid4().hex[:12]
+        self.url = url
+        self.max_results = max_results
+        self.search_name = search_name
+        self.options = options or {}
+        self.status = QUEUED
+        self.error = None
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.businesses = []
+        self.logs = deque(maxlen=max_log_lines)
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.status in FINAL_STATES
+
+    def log(self, message):
+        with self._lock:
+            self.logs.append(message)
+
+    def add_business(self, business):
+        with self._lock:
+            self.businesses.append(business)
+
+    def _finish(self, status, error=None):
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.finished_at = _now()
+
+    def cancel(self):
+        """Pide la cancelación; un trabajo en cola se descarta sin llegar a ejecutarse"""
+        self.cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self._finish(CANCELLED)
+
+    def snapshot(self):
+        """Copia coherente del estado para mostrarla en la interfaz"""
+        with self._lock:
+            return {
+                'id': self.id,
+                'busqueda': self.search_name,
+                'url': self.url,
+                'max_resultados': self.max_results,
+                'estado': self.status,
+                'cancelando': self.cancel_event.is_set() and self.status == RUNNING,
+                'error': self.error,
+                'creado': self.created_at,
+                'inicio': self.started_at,
+                'fin': self.finished_at,
+                'negocios': list(self.businesses),
+                'log': list(self.logs),
+            }
+
+
+class _JobLogHandler(logging.Handler):
+    """Copia al log de cada trabajo los mensajes emitidos mientras se ejecuta (en su hilo o en los del pool)"""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    def emit(self, record):
+        job = _current_job.get()
+        if job is not None:
+            try:
+                job.log(self.format(record).strip('\n'))
+            except Exception:
+                self.handleError(record)
+
+
+class JobManager:
+    """Ejecuta ScrapeJobs en un pool de hilos, cada uno con un navegador reutilizable"""
+
+    def __init__(self, max_concurrent=2, idle_timeout=600, cache_path=None, profile_root=None, store=None,
+                 **scraper_kwargs):
+        """Configura el gestor
+
+        max_concurrent: búsquedas simultáneas (y navegadores principales abiertos).
+        idle_timeout: segundos sin uso tras los que se cierra cada navegador.
+        cache_path: PlaceCache compartida por los trabajos.
+        profile_root: carpeta con un perfil de Chrome por navegador simultáneo.
+        store: ProspectStore donde se guarda cada negocio en cuanto se extrae.
+        scraper_kwargs: opciones fijas de los navegadores (p. ej. headless).
+        """
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.store = store
+        profile_root = profile_root or os.path.join(os.getcwd(), "job_profiles")
+        self.sessions = [
+            ManagedScraperSession(
+                idle_timeout=idle_timeout,
+                cache_path=cache_path,
+                profile_dir=os.path.join(profile_root, f"job_{slot}"),
+                **scraper_kwargs
+            )
+            for slot in range(self.max_concurrent)
+        ]
+        self._free_sessions = queue.Queue()
+        for session in self.sessions:
+            self._free_sessions.put(session)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='scrape-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+        self._log_handler = _JobLogHandler()
+        logging.getLogger().addHandler(self._log_handler)
+        # Solo los loggers del scraper bajan a INFO; el nivel global no se toca
+        for name in JOB_LOGGERS:
+            logger = logging.getLogger(name)
+            if logger.getEffectiveLevel() > logging.INFO:
+                logger.setLevel(logging.INFO)
+
+    def submit(self, url, max_results, search_name, **options):
+        """Encola una búsqueda; options: workers, use_observer, use_cache, offline_parsing, snapshot_dir"""
+        job = ScrapeJob(url, max_results, search_name, options)
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job)
+        log.info(f"📥 Trabajo {job.id} en cola: {search_name}")
+        return job
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            job._finish(CANCELLED)
+            return
+
+        session = self._free_sessions.get()
+        token = _current_job.set(job)
+        try:
+            with job._lock:
+                job.status = RUNNING
+                job.started_at = _now()
+            with session.use(**job.options) as scraper:
+                for business in scraper.iter_businesses(job.url, max_results=job.max_results,
+                                                        cancel=job.cancel_event):
+                    business.busqueda = job.search_name
+                    business.fecha_extraccion = _now()
+                    if self.store:
+                        self.store.upsert(business)
+                    job.add_business(business)
+            job._finish(CANCELLED if job.cancel_event.is_set() else DONE)
+        except Exception as e:
+            job.log(f"❌ {e}")
+            job._finish(FAILED, str(e))
+        finally:
+            if self.store and job.businesses:
+                self.store.record_search(job.search_name, job.url, len(job.businesses))
+            _current_job.reset(token)
+            self._free_sessions.put(session)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, job_ids=None):
+        """Trabajos en orden de envío (solo los de job_ids si se indican)"""
+        with self._lock:
+            if job_ids is None:
+                return list(self._jobs.values())
+            return [self._jobs[job_id] for job_id in job_ids if job_id in self._jobs]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job and not job.done:
+            job.cancel()
+            return True
+        return False
+
+    def forget(self, job_id):
+        """Elimina un trabajo terminado del registro (sus resultados ya se recogieron)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job.done:
+                del self._jobs[job_id]
+
+    def active_count(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.done)
+
+    def shutdown(self):
+        for job in self.jobs():
+            job.cancel()
+        self._executor.shutdown(wait=True)
+        logging.getLogger().removeHandler(self._log_handler)
+        for session in self.sessions:
+            session.close()
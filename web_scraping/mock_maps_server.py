@@ -0,0 +1,324 @@
+"""Servidor HTTP local que imita Google Maps para pruebas y benchmarks sin conexión.
+
+Sirve páginas de búsqueda con el feed de resultados (.Nv2PK / a.hfpxzc) que carga
+más tarjetas al hacer scroll, y páginas de detalle con la estructura que espera
+GoogleMapsScraper (h1.DUwDvf, div.F7nice, button[data-item-id=...]). La latencia
+de cada respuesta es configurable para reproducir condiciones de red, y con
+asset_kb las fichas cargan fotos, una fuente y teselas de mapa de ese tamaño para
+medir el modo ligero del scraper.
+
+    python mock_maps_server.py --port 8765 --places 120 --latency 0.2
+
+y luego, con el scraper:
+
+    GoogleMapsScraper(extra_hosts=['127.0.0.1:8765']).search_businesses(
+        'http://127.0.0.1:8765/maps/search/dentistas/@19.4326,-99.1332,15z', 30)
+"""
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote_plus
+
+_FEATURE_ID_RE = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)')
+
+_NAMES = ["Taquería", "Consultorio Dental", "Café", "Gimnasio", "Hotel", "Panadería",
+          "Farmacia", "Estética", "Restaurante", "Veterinaria", "Librería", "Ferretería"]
+_SURNAMES = ["El Güero", "Sonrisa", "Central", "La Esquina", "Roma", "Polanco", "Del Valle",
+             "Coyoacán", "Condesa", "San Ángel", "Juárez", "Reforma", "Doctores", "Narvarte"]
+_STREETS = ["Av. Reforma", "Calle Durango", "Av. Insurgentes Sur", "Calle Orizaba",
+            "Av. Álvaro Obregón", "Calle Madero", "Av. Universidad", "Calle Tonalá"]
+_TYPES = {"Taquería": "Restaurante", "Consultorio Dental": "Dentista", "Café": "Cafetería",
+          "Gimnasio": "Gimnasio", "Hotel": "Hotel", "Panadería": "Panadería", "Farmacia": "Farmacia",
+          "Estética": "Salón de belleza", "Restaurante": "Restaurante", "Veterinaria": "Veterinario",
+          "Librería": "Librería", "Ferretería": "Ferretería"}
+
+
+def generate_places(count=120, seed=42):
+    """Genera un conjunto determinista de negocios con algunos campos faltantes"""
+    rng = random.Random(seed)
+    places = []
+    for i in range(count):
+        prefix = rng.choice(_NAMES)
+        name = f"{prefix} {rng.choice(_SURNAMES)} {i + 1}"
+        lat = 19.35 + rng.random() * 0.15
+        lng = -99.20 + rng.random() * 0.15
+        place = {
+            'feature_id': f"0x85d1{i:012x}:0x{rng.getrandbits(60):x}",
+            'nombre': name,
+            'calificacion': f"{rng.uniform(3.0, 5.0):.1f}".replace('.', ','),
+            'num_reviews': f"{rng.randint(1, 4000):,}".replace(',', '.'),
+            'tipo': _TYPES[prefix],
+            'direccion': f"{rng.choice(_STREETS)} {rng.randint(1, 999)}, CDMX",
+            'telefono': f"55 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}" if rng.random() < 0.8 else None,
+            'website': f"https://negocio{i + 1}.example.mx/" if rng.random() < 0.6 else None,
+            'lat': round(lat, 6),
+            'lng': round(lng, 6),
+        }
+        if rng.random() < 0.1:
+            place['calificacion'] = None
+            place['num_reviews'] = None
+        places.append(place)
+    return places
+
+
+def place_path(place):
+    """Ruta /maps/place/ de un negocio, con el mismo formato de data= que Google Maps"""
+    return (f"/maps/place/{quote_plus(place['nombre'])}/@{place['lat']},{place['lng']},17z"
+            f"/data=!3m1!4b1!4m6!3m5!1s{place['feature_id']}!8m2!3d{place['lat']}!4d{place['lng']}"
+            f"!16s%2Fg%2F11mock?entry=ttu")
+
+
+def _card_html(place):
+    name = html.escape(place['nombre'])
+    rating = ''
+    if place['calificacion']:
+        rating = (f'<span class="MW4etd">{place["calificacion"]}</span>'
+                  f'<span class="UY7F9">({place["num_reviews"]})</span>')
+    return (
+        f'<div class="Nv2PK THOPZb" role="article" style="min-height:110px;border-bottom:1px solid #ddd">'
+        f'<a class="hfpxzc" href="{html.escape(place_path(place))}" aria-label="{name}" '
+        f'jsaction="pane.wfvdle10;navigate">{name}</a>'
+        f'<div class="qBF1Pd fontHeadlineSmall">{name}</div>{rating}'
+        f'<div class="W4Efsd">{html.escape(place["tipo"])}</div></div>'
+    )
+
+
+_END_OF_LIST_HTML = ('<p class="fontBodyMedium"><span><span class="HlvSq">'
+                     'Has llegado al final de la lista.</span></span></p>')
+
+_SEARCH_PAGE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{query} - Google Maps</title></head>
+<body style="margin:0">
+<div role="main" aria-label="Resultados de {query}">
+  <div class="m6QErb DxyBCb kA9KIf dS8AEf" role="feed" style="height:600px;overflow-y:auto">
+    {cards}
+  </div>
+</div>
+<script>
+  (function () {{
+    var feed = document.querySelector("[role='feed']");
+    var offset = {offset}, loading = false, ended = {ended};
+    feed.addEventListener('scroll', function () {{
+      if (loading || ended) return;
+      if (feed.scrollTop + feed.clientHeight < feed.scrollHeight - 200) return;
+      loading = true;
+      fetch('/api/feed?q={query_param}&offset=' + offset)
+        .then(function (r) {{ return r.json(); }})
+        .then(function (page) {{
+          feed.insertAdjacentHTML('beforeend', page.html);
+          offset = page.next;
+          ended = page.end;
+          loading = false;
+        }});
+    }});
+  }})();
+</script>
+</body></html>"""
+
+_PLACE_PAGE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{name} - Google Maps</title></head>
+<body>
+<div role="main" aria-label="{name}">
+  <h1 class="DUwDvf lfPIob">{name}</h1>
+  {rating}
+  <div><button class="DkEaL" jsaction="pane.rating.category">{tipo}</button></div>
+  <div role="region" aria-label="Información de {name}">
+    <button class="CsEnBe" data-item-id="address" aria-label="Dirección: {direccion}">
+      <div class="Io6YTe fontBodyMedium">{direccion}</div>
+    </button>
+    {phone}
+    {website}
+  </div>
+</div>
+{assets}
+</body></html>"""
+
+# Recursos pesados de una ficha real: fotos, fuente web y teselas del mapa
+_PLACE_ASSETS = """<style>
+  @font-face {{ font-family: 'GoogleSans'; src: url('/assets/googlesans.woff2') format('woff2'); }}
+  body {{ font-family: 'GoogleSans', sans-serif; }}
+</style>
+<div class="ZKCDEc">
+  <img src="/assets/photo_{fid}_1.jpg" alt=""><img src="/assets/photo_{fid}_2.jpg" alt="">
+  <img src="/assets/photo_{fid}_3.jpg" alt="">
+</div>
+<div class="maps-tiles">
+  <img src="/maps/vt?x=1&y=1&fid={fid}" alt=""><img src="/maps/vt?x=2&y=1&fid={fid}" alt="">
+  <img src="/maps/vt?x=1&y=2&fid={fid}" alt=""><img src="/maps/vt?x=2&y=2&fid={fid}" alt="">
+</div>"""
+
+_ASSET_TYPES = {'.jpg': 'image/jpeg', '.woff2': 'font/woff2'}
+
+
+class MockMapsServer:
+    """Servidor local con latencia configurable que se ejecuta en un hilo aparte"""
+
+    def __init__(self, places=None, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 first_page=7, page_size=8, asset_kb=0):
+        """Configura el servidor
+
+        places: lista de negocios (por defecto generate_places()).
+        port: 0 elige un puerto libre.
+        latency / jitter: segundos de retardo por respuesta (latency ± jitter).
+        first_page / page_size: tarjetas en la carga inicial y en cada carga por scroll.
+        asset_kb: tamaño de cada foto, fuente y tesela de las fichas (0 = fichas sin recursos).
+        """
+        self.places = places if places is not None else generate_places()
+        self.by_feature_id = {place['feature_id']: place for place in self.places}
+        self.latency = latency
+        self.jitter = jitter
+        self.first_page = first_page
+        self.page_size = page_size
+        self.asset_kb = asset_kb
+        self.requests = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def host(self):
+        host, port = self._httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}"
+
+    def search_url(self, query, lat=19.4326, lng=-99.1332, zoom=15):
+        return f"{self.base_url}/maps/search/{quote_plus(query)}/@{lat},{lng},{zoom}z"
+
+    def _feed_page(self, offset, size):
+        chunk = self.places[offset:offset + size]
+        end = offset + len(chunk) >= len(self.places)
+        cards = ''.join(_card_html(place) for place in chunk)
+        if end:
+            cards += _END_OF_LIST_HTML
+        return cards, offset + len(chunk), end
+
+    def _delay(self):
+        delay = self.latency + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type='text/html; charset=utf-8'):
+                data = body.encode('utf-8') if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                server.requests += 1
+                server._delay()
+                parsed = urlparse(self.path)
+
+                if parsed.path.startswith('/maps/search/'):
+                    query = parsed.path[len('/maps/search/'):].split('/@')[0].split('/')[0]
+                    cards, offset, end = server._feed_page(0, server.first_page)
+                    self._send(200, _SEARCH_PAGE.format(
+                        query=html.escape(query.replace('+', ' ')), query_param=query,
+                        cards=cards, offset=offset, ended='true' if end else 'false'))
+                elif parsed.path == '/api/feed':
+                    params = parse_qs(parsed.query)
+                    offset = int(params.get('offset', ['0'])[0])
+                    cards, next_offset, end = server._feed_page(offset, server.page_size)
+                    self._send(200, json.dumps({'html': cards, 'next': next_offset, 'end': end}),
+                               'application/json')
+                elif parsed.path.startswith('/maps/place/'):
+                    match = _FEATURE_ID_RE.search(self.path)
+                    place = server.by_feature_id.get(match.group(1)) if match else None
+                    if place is None:
+                        self._send(404, '<html><body>No encontrado</body></html>')
+                    else:
+                        self._send(200, server.render_place(place))
+                elif server.asset_kb and (parsed.path.startswith('/assets/') or parsed.path == '/maps/vt'):
+                    extension = parsed.path[parsed.path.rfind('.'):] if '.' in parsed.path else '.png'
+                    self._send(200, b'\0' * (server.asset_kb * 1024), _ASSET_TYPES.get(extension, 'image/png'))
+                else:
+                    self._send(404, '<html><body>No encontrado</body></html>')
+
+        return Handler
+
+    def render_place(self, place):
+        esc = html.escape
+        rating = ''
+        if place['calificacion']:
+            rating = (f'<div class="F7nice"><span><span aria-hidden="true">{place["calificacion"]}</span></span>'
+                      f'<span><span aria-label="{place["num_reviews"]} opiniones">({place["num_reviews"]})</span></span></div>')
+        phone = ''
+        if place['telefono']:
+            digits = place['telefono'].replace(' ', '')
+            phone = (f'<button class="CsEnBe" data-item-id="phone:tel:{digits}" '
+                     f'aria-label="Teléfono: {esc(place["telefono"])}">'
+                     f'<div class="Io6YTe fontBodyMedium">{esc(place["telefono"])}</div></button>')
+        website = ''
+        if place['website']:
+            website = (f'<a class="CsEnBe" data-item-id="authority" href="{esc(place["website"])}">'
+                       f'<div class="Io6YTe fontBodyMedium">{esc(place["website"])}</div></a>')
+        assets = _PLACE_ASSETS.format(fid=quote_plus(place['feature_id'])) if self.asset_kb else ''
+        return _PLACE_PAGE.format(
+            name=esc(place['nombre']), rating=rating, tipo=esc(place['tipo']),
+            direccion=esc(place['direccion']), phone=phone, website=website, assets=assets)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita Google Maps")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--places', type=int, default=120, help="Número de negocios generados")
+    parser.add_argument('--fixtures', help="JSON con una lista de negocios en lugar de los generados")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', type=float, default=0.0, help="Segundos de retardo por respuesta")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--asset-kb', type=int, default=0, help="KB de cada foto, fuente y tesela de las fichas")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        with open(args.fixtures, encoding='utf-8') as f:
+            places = json.load(f)
+    else:
+        places = generate_places(args.places, args.seed)
+
+    server = MockMapsServer(places, host=args.host, port=args.port,
+                            latency=args.latency, jitter=args.jitter, asset_kb=args.asset_kb)
+    print(f"🧪 Servidor de prueba con {len(places)} negocios en {server.base_url}")
+    print(f"   Ejemplo: {server.search_url('dentistas cdmx')}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
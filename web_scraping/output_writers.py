@@ -0,0 +1,272 @@
+"""Escritores de resultados que añaden cada negocio al archivo en cuanto se extrae.
+
+Sustituyen al volcado de un DataFrame completo al final de la búsqueda: la
+memoria no crece con la ejecución y lo extraído está en disco desde el primer
+negocio. Todos calculan sobre la marcha el resumen de completitud por columna.
+
+    with open_writer('negocios.csv') as writer:        # .csv, .jsonl, .json o .parquet
+        for business in scraper.iter_businesses(url):
+            writer.write(business)
+    writer.summary.log_summary()
+
+CSV y JSON (Lines o lista) vacían el buffer tras cada fila (y fsync cada `fsync_every`
+filas y al cerrar; fsync_every=0 lo desactiva, para archivos temporales). Parquet escribe un grupo de filas cada `row_group_size`
+negocios; el archivo solo es legible tras close(), que escribe el pie.
+"""
+import csv
+import json
+import logging
+import os
+import threading
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from business_record import arrow_schema
+
+log = logging.getLogger(__name__)
+
+# Valores que cuentan como dato faltante en el resumen de completitud
+MISSING_VALUES = (None, '', 'No disponible')
+
+
+class CompletenessSummary:
+    """Cuenta, por columna, cuántas filas traen un valor disponible"""
+
+    def __init__(self):
+        self.total = 0
+        self.available = {}
+
+    def add(self, row):
+        self.total += 1
+        for column, value in row.items():
+            count = self.available.setdefault(column, 0)
+            if not _is_missing(value):
+                self.available[column] = count + 1
+
+    def as_dict(self):
+        """{columna: {'disponibles': n, 'total': n, 'porcentaje': p}}"""
+        return {
+            column: {
+                'disponibles': count,
+                'total': self.total,
+                'porcentaje': round(count / self.total * 100, 1) if self.total else 0.0,
+            }
+            for column, count in self.available.items()
+        }
+
+    def log_summary(self):
+        log.info(f"📊 Total de negocios extraídos: {self.total}")
+        log.info("\n📋 Resumen de extracción:")
+        for column, count in self.available.items():
+            log.info(f"  {column}: {count}/{self.total} disponibles")
+
+
+def _is_missing(value):
+    if isinstance(value, float) and value != value:  # NaN
+        return True
+    try:
+        return value in MISSING_VALUES
+    except TypeError:
+        return False
+
+
+def _prepare_directory(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+class RowWriter:
+    """Base de los escritores: cuenta filas, lleva el resumen y es segura entre hilos"""
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.columns = list(columns) if columns else None
+        self.rows = 0
+        self.summary = CompletenessSummary()
+        self._lock = threading.Lock()
+        self._closed = False
+        _prepare_directory(path)
+
+    def write(self, row):
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"El escritor de {self.path} ya está cerrado")
+            if self.columns is None:
+                self.columns = list(row)
+            self._write(row)
+            self.rows += 1
+            self.summary.add({column: row.get(column) for column in self.columns})
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, row):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class _TextRowWriter(RowWriter):
+    """Escritor de texto con flush por fila y fsync periódico"""
+
+    def __init__(self, path, columns=None, append=False, fsync_every=50, encoding='utf-8'):
+        super().__init__(path, columns)
+        self.fsync_every = fsync_every
+        self.appending = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, 'a' if self.appending else 'w', encoding=encoding, newline='')
+
+    def _sync(self, force=False):
+        self._file.flush()
+        if self.fsync_every and (force or self.rows % self.fsync_every == 0):
+            os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._sync(force=True)
+        self._file.close()
+
+
+class CsvRowWriter(_TextRowWriter):
+    """CSV con una fila por negocio; con append=True continúa un archivo existente"""
+
+    def __init__(self, path, columns=None, append=False, fsync_every=50):
+        appending = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if appending and not columns:
+            # Continuar con las columnas de la cabecera ya escrita
+            with open(path, encoding='utf-8-sig', newline='') as f:
+                columns = next(csv.reader(f), None)
+        # La BOM solo al principio del archivo (Excel la necesita para leer UTF-8)
+        super().__init__(path, columns, append, fsync_every, encoding='utf-8' if appending else 'utf-8-sig')
+        self._writer = None
+
+    def _write(self, row):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore')
+            if not self.appending:
+                self._writer.writeheader()
+        self._writer.writerow(row)
+        self._sync()
+
+    def _close(self):
+        if self._writer is None and self.columns and not self.appending:
+            # Sin filas: dejar al menos la cabecera
+            csv.DictWriter(self._file, fieldnames=self.columns).writeheader()
+        super()._close()
+
+
+class JsonLinesRowWriter(_TextRowWriter):
+    """JSON Lines: un objeto por negocio, con todas sus claves; con append=True continúa un archivo existente"""
+
+    def __init__(self, path, columns=None, append=False, fsync_every=50):
+        super().__init__(path, columns, append, fsync_every)
+
+    def _write(self, row):
+        self._file.write(json.dumps(dict(row), ensure_ascii=False, default=str) + '\n')
+        self._sync()
+
+
+class JsonArrayRowWriter(_TextRowWriter):
+    """JSON legible: una lista de objetos con sangría, escrita objeto a objeto"""
+
+    def __init__(self, path, columns=None, fsync_every=50, indent=2):
+        super().__init__(path, columns, append=False, fsync_every=fsync_every)
+        self.indent = indent
+
+    def _write(self, row):
+        self._file.write('[\n' if self.rows == 0 else ',\n')
+        self._file.write(json.dumps(dict(row), ensure_ascii=False, indent=self.indent, default=str))
+        self._sync()
+
+    def _close(self):
+        self._file.write('\n]\n' if self.rows else '[]\n')
+        super()._close()
+
+
+class ParquetRowWriter(RowWriter):
+    """Parquet escrito por grupos de filas; por defecto con los tipos de BusinessRecord"""
+
+    def __init__(self, path, columns=None, row_group_size=500, schema=None, compression='snappy'):
+        if pa is None:
+            raise ImportError("Para escribir Parquet se necesita pyarrow: pip install pyarrow")
+        if schema is not None and not columns:
+            columns = schema.names
+        super().__init__(path, columns)
+        self.row_group_size = row_group_size
+        self.schema = schema
+        self.compression = compression
+        self._text_columns = set()
+        self._buffer = []
+        self._writer = None
+
+    def _write(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        if not self._buffer:
+            return
+        if self.schema is None:
+            self.schema = arrow_schema(self.columns)
+            self._text_columns = {
+                field.name for field in self.schema
+                if pa.types.is_string(field.type) or pa.types.is_dictionary(field.type)
+            }
+        rows = []
+        for row in self._buffer:
+            values = {column: row.get(column) for column in self.columns}
+            for column in self._text_columns:
+                if values[column] is not None and not isinstance(values[column], str):
+                    values[column] = str(values[column])
+            rows.append(values)
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._buffer = []
+
+    def flush(self):
+        """Escribe ya el grupo de filas pendiente (aunque sea más pequeño de lo normal)"""
+        with self._lock:
+            self._flush_buffer()
+
+    def _close(self):
+        self._flush_buffer()
+        if self._writer is not None:
+            self._writer.close()
+
+
+WRITERS = {
+    '.csv': CsvRowWriter,
+    '.jsonl': JsonLinesRowWriter,
+    '.json': JsonArrayRowWriter,
+    '.parquet': ParquetRowWriter,
+}
+
+
+def open_writer(path, columns=None, **kwargs):
+    """Crea el escritor adecuado según la extensión del archivo (.csv, .jsonl, .json o .parquet)"""
+    extension = os.path.splitext(path)[1].lower()
+    writer_class = WRITERS.get(extension)
+    if writer_class is None:
+        raise ValueError(f"Formato de salida no soportado: '{extension}' (usa .csv, .jsonl, .json o .parquet)")
+    return writer_class(path, columns=columns, **kwargs)
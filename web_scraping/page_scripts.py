@@ -0,0 +1,263 @@
+"""JavaScript que el scraper inyecta en las páginas de Google Maps.
+
+Cada script resuelve en el navegador lo que antes requería muchas llamadas
+find_element/get_attribute, de modo que cada operación cuesta un solo
+execute_script (una sola ida y vuelta a chromedriver).
+"""
+
+# Selectores de respaldo por campo de la ficha de un negocio, en orden de prioridad.
+# read: 'text' (texto visible), 'label' (aria-label o texto) o 'href'.
+# strip: prefijo que se elimina del valor leído.
+PLACE_FIELDS = {
+    'nombre': {
+        'selectors': ["h1.DUwDvf", "h1[data-attrid='title']", ".x3AX1-LfntMc-header-title-title"],
+        'read': 'text',
+    },
+    'calificacion': {
+        'selectors': ["div.F7nice", ".MW4etd", ".ceNzKf"],
+        'read': 'text',
+    },
+    'tipo': {
+        'selectors': ["button.DkEaL", ".YhemCb"],
+        'read': 'text',
+    },
+    'direccion': {
+        'selectors': [
+            "button[data-item-id='address']",
+            "[data-item-id='address'] .Io6YTe",
+            ".LrzXr",
+        ],
+        'read': 'label',
+        'strip': 'Dirección:',
+    },
+    'telefono': {
+        'selectors': [
+            "button[data-item-id^='phone:tel:']",
+            "[data-item-id*='phone'] .Io6YTe",
+        ],
+        'read': 'label',
+        'strip': 'Teléfono:',
+    },
+    'website': {
+        'selectors': [
+            "a[data-item-id='authority']",
+            "a[href^='http']:not([href*='google.com'])",
+        ],
+        'read': 'href',
+    },
+}
+
+# Evalúa todos los selectores de respaldo dentro de la página y devuelve
+# {fields, matched}: fields con nombre, calificacion, num_reviews, tipo, direccion,
+# telefono y website (null en los campos no encontrados) y matched con el
+# selector que encontró cada campo (null si ninguno).
+EXTRACT_PLACE_JS = """
+    var fields = arguments[0];
+    var out = {};
+    var matched = {};
+
+    function firstMatch(selectors) {
+        for (var i = 0; i < selectors.length; i++) {
+            var el = null;
+            try { el = document.querySelector(selectors[i]); } catch (e) {}
+            if (el) return {el: el, selector: selectors[i]};
+        }
+        return null;
+    }
+
+    function read(el, mode) {
+        if (mode === 'href') return el.href || el.getAttribute('href');
+        if (mode === 'label') return el.getAttribute('aria-label') || el.innerText || '';
+        return el.innerText || '';
+    }
+
+    for (var name in fields) {
+        var spec = fields[name];
+        var match = firstMatch(spec.selectors);
+        matched[name] = match ? match.selector : null;
+        if (!match) { out[name] = null; continue; }
+        var value = read(match.el, spec.read);
+        if (value && spec.strip) value = value.split(spec.strip).join('').trim();
+        out[name] = value;
+    }
+
+    // "4,5(1.234)" -> calificacion "4,5", num_reviews "1.234"
+    out.num_reviews = null;
+    if (out.calificacion !== null) {
+        var parts = out.calificacion.split('(');
+        out.calificacion = parts[0].trim();
+        if (parts.length > 1) out.num_reviews = parts[1].replace(/\\)/g, '').trim();
+    }
+    return {fields: out, matched: matched};
+"""
+
+# Selectores de enlaces a negocios en el listado de resultados, en orden de prioridad
+LINK_SELECTORS = [
+    "a[href*='/maps/place/'][data-value]",  # Más específico
+    "a[href*='/maps/place/']",
+    "a[data-result-index]",
+    ".hfpxzc",
+    "a[jsaction*='navigate']",
+    "div[role='article'] a[href*='place']",
+    ".Nv2PK a[href*='place']",
+    "[role='main'] a[href*='/maps/place/']",
+    ".THOPZb a[href*='/maps/place/']",
+]
+
+# Recorre todos los selectores en la página y devuelve {links, counts, matches}: los
+# href de negocios visibles, sin duplicados y en orden de aparición, cuántos enlaces
+# nuevos aportó cada selector y cuántos encuentra por sí solo (aunque otro anterior
+# ya los hubiera aportado)
+COLLECT_LINKS_JS = """
+    var selectors = arguments[0];
+    var seen = new Set();
+    var links = [];
+    var counts = {};
+    var matches = {};
+
+    function visible(el) {
+        if (!el.getClientRects().length) return false;
+        var style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    }
+
+    for (var i = 0; i < selectors.length; i++) {
+        var elements;
+        counts[selectors[i]] = 0;
+        matches[selectors[i]] = 0;
+        try { elements = document.querySelectorAll(selectors[i]); } catch (e) { continue; }
+        for (var j = 0; j < elements.length; j++) {
+            var href = elements[j].href;
+            if (!href || href.indexOf('/maps/place/') === -1) continue;
+            if (!visible(elements[j])) continue;
+            matches[selectors[i]]++;
+            if (seen.has(href)) continue;
+            seen.add(href);
+            links.push(href);
+            counts[selectors[i]]++;
+        }
+    }
+    return {links: links, counts: counts, matches: matches};
+"""
+
+# Contenedores posibles del listado de resultados (el primero que exista se observa)
+FEED_SELECTORS = [
+    "[role='main'] [role='feed']",
+    "div[role='feed']",
+    "div.m6QErb.DxyBCb.kA9KIf.dS8AEf",
+    "div[role='main']",
+]
+
+# Marcadores de fin de lista que Google Maps muestra al agotar los resultados
+END_OF_LIST_SELECTORS = ["span.HlvSq", "p.fontBodyMedium > span > span.HlvSq"]
+END_OF_LIST_TEXTS = [
+    "Has llegado al final de la lista",
+    "You've reached the end of the list",
+]
+
+# Instala un MutationObserver sobre el feed que acumula en window.__gmsFeed.buffer
+# los enlaces de negocios nuevos y marca `end` cuando aparece el fin de lista.
+# Los enlaces ya presentes se cargan en el buffer al instalarlo.
+FEED_OBSERVER_INSTALL_JS = """
+    var feedSelectors = arguments[0], endSelectors = arguments[1], endTexts = arguments[2];
+    if (window.__gmsFeed) window.__gmsFeed.observer.disconnect();
+
+    var root = null;
+    for (var i = 0; i < feedSelectors.length && !root; i++) {
+        try { root = document.querySelector(feedSelectors[i]); } catch (e) {}
+    }
+    if (!root) return false;
+
+    var state = {root: root, buffer: [], seen: new Set(), end: false, observer: null};
+
+    function collect(node) {
+        if (!node || node.nodeType !== 1) return;
+        var anchors = [];
+        if (node.matches && node.matches("a[href*='/maps/place/']")) anchors.push(node);
+        var inner = node.querySelectorAll ? node.querySelectorAll("a[href*='/maps/place/']") : [];
+        for (var j = 0; j < inner.length; j++) anchors.push(inner[j]);
+        for (var k = 0; k < anchors.length; k++) {
+            var href = anchors[k].href;
+            if (href && !state.seen.has(href)) {
+                state.seen.add(href);
+                state.buffer.push(href);
+            }
+        }
+    }
+
+    function checkEnd(node) {
+        if (state.end || !node || node.nodeType !== 1) return;
+        for (var i = 0; i < endSelectors.length; i++) {
+            try {
+                if ((node.matches && node.matches(endSelectors[i])) || node.querySelector(endSelectors[i])) {
+                    state.end = true;
+                    return;
+                }
+            } catch (e) {}
+        }
+        var text = node.textContent || '';
+        for (var t = 0; t < endTexts.length; t++) {
+            if (text.indexOf(endTexts[t]) !== -1) { state.end = true; return; }
+        }
+    }
+
+    collect(root);
+    checkEnd(root);
+    state.observer = new MutationObserver(function (mutations) {
+        for (var m = 0; m < mutations.length; m++) {
+            var added = mutations[m].addedNodes;
+            for (var n = 0; n < added.length; n++) {
+                collect(added[n]);
+                checkEnd(added[n]);
+            }
+        }
+    });
+    state.observer.observe(root, {childList: true, subtree: true});
+    window.__gmsFeed = state;
+    return true;
+"""
+
+# Vacía el buffer del observer: {links: [...], end: bool}
+FEED_DRAIN_JS = """
+    var state = window.__gmsFeed;
+    if (!state) return {links: [], end: false};
+    return {links: state.buffer.splice(0, state.buffer.length), end: state.end};
+"""
+
+# Indica si hay enlaces pendientes en el buffer o si se alcanzó el fin de lista
+FEED_PENDING_JS = """
+    var state = window.__gmsFeed;
+    return !!state && (state.buffer.length > 0 || state.end);
+"""
+
+# Lleva el feed observado hasta el final para provocar la carga de más tarjetas
+FEED_SCROLL_JS = """
+    var state = window.__gmsFeed;
+    var root = state && state.root;
+    if (root && root !== document.body && root.scrollHeight > root.clientHeight) {
+        root.scrollTop = root.scrollHeight;
+    } else {
+        window.scrollTo(0, document.body.scrollHeight);
+    }
+"""
+
+FEED_OBSERVER_STOP_JS = """
+    if (window.__gmsFeed) {
+        window.__gmsFeed.observer.disconnect();
+        window.__gmsFeed = null;
+    }
+"""
+
+# Bytes transferidos por el documento y sus recursos (Resource Timing) y duración
+# de la carga; sirve para medir el ahorro del modo ligero
+PAGE_WEIGHT_JS = """
+    var nav = performance.getEntriesByType('navigation')[0];
+    var bytes = nav ? (nav.transferSize || 0) : 0;
+    var resources = performance.getEntriesByType('resource');
+    for (var i = 0; i < resources.length; i++) bytes += resources[i].transferSize || 0;
+    return {
+        bytes: bytes,
+        resources: resources.length,
+        load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null
+    };
+"""
@@ -0,0 +1,86 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class PlaceCache:
+    """Caché en disco (SQLite) de fichas de negocio por identificador de lugar
+
+    Las entradas caducan tras `ttl_days` y, si se supera `max_entries`, se
+    eliminan primero las menos usadas recientemente. Es segura entre hilos, así
+    que varios navegadores del pool pueden compartirla.
+    """
+
+    def __init__(self, path='place_cache.sqlite', ttl_days=30, max_entries=20000):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS places (
+                place_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_places_accessed ON places(accessed_at)")
+        self.purge_expired()
+
+    def get(self, place_id):
+        """Devuelve los datos guardados del negocio o None si no están o caducaron"""
+        if not place_id:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM places WHERE place_id = ? AND created_at >= ?",
+                (place_id, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE places SET accessed_at = ? WHERE place_id = ?", (now, place_id))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, place_id, data):
+        if not place_id:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO places (place_id, data, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (place_id, json.dumps(data, ensure_ascii=False), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Elimina las entradas menos usadas si se supera el tamaño máximo"""
+        count = self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM places WHERE place_id IN "
+                "(SELECT place_id FROM places ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+
+    def purge_expired(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM places WHERE created_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,238 @@
+"""Extracción de fichas de negocio a partir del HTML, fuera del navegador.
+
+El navegador solo captura `page_source` y pasa a la siguiente página; el análisis
+se hace aquí con selectolax (o lxml + cssselect como alternativa) en un pool de
+procesos. Las mismas funciones sirven para re-extraer instantáneas guardadas en
+disco sin volver a hacer scraping:
+
+    python place_parser.py snapshots/ negocios_reextraidos.csv
+"""
+import hashlib
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from business_record import BusinessRecord
+from output_writers import open_writer
+from page_scripts import PLACE_FIELDS
+from place_urls import place_key
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+    except ImportError:
+        _SelectolaxParser = None
+
+try:
+    import lxml.html as _lxml_html
+    import cssselect  # noqa: F401  (lxml lo necesita para los selectores CSS)
+except ImportError:
+    _lxml_html = None
+
+# Primera línea de cada instantánea guardada: conserva la URL de origen
+_SNAPSHOT_HEADER = "<!-- gms-url: {url} -->\n"
+_SNAPSHOT_HEADER_RE = re.compile(r"^<!-- gms-url: (.*?) -->")
+
+def new_business(index, url=None):
+    """Registro de negocio vacío (todos los campos en None)"""
+    return BusinessRecord(indice=index, place_key=place_key(url) if url else None)
+
+
+def business_from_fields(fields, index, url=None):
+    """Normaliza los campos extraídos (None = no encontrado) en un BusinessRecord"""
+    return BusinessRecord.from_fields(fields, index, place_key(url) if url else None)
+
+
+def _clean_text(text):
+    return ' '.join((text or '').split())
+
+
+class _SelectolaxDocument:
+    def __init__(self, html):
+        self.tree = _SelectolaxParser(html)
+
+    def first(self, selector):
+        try:
+            return self.tree.css_first(selector)
+        except Exception:
+            return None
+
+    def text(self, node):
+        return _clean_text(node.text(separator=' '))
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+
+class _LxmlDocument:
+    def __init__(self, html):
+        self.tree = _lxml_html.fromstring(html)
+
+    def first(self, selector):
+        try:
+            found = self.tree.cssselect(selector)
+        except Exception:
+            return None
+        return found[0] if found else None
+
+    def text(self, node):
+        return _clean_text(node.text_content())
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+def _document(html):
+    if _SelectolaxParser is not None:
+        return _SelectolaxDocument(html)
+    if _lxml_html is not None:
+        return _LxmlDocument(html)
+    raise ImportError("Se necesita selectolax o lxml + cssselect para analizar HTML: pip install selectolax")
+
+
+def parse_place_fields(html, spec_fields=None, matched=None):
+    """Equivalente en Python de EXTRACT_PLACE_JS: mismos selectores y mismas claves
+
+    spec_fields: especificación con la forma de PLACE_FIELDS (p. ej. reordenada por SelectorStats).
+    matched: dict opcional que recibe el selector que encontró cada campo (None si ninguno).
+    """
+    doc = _document(html)
+    fields = {}
+    for name, spec in (spec_fields or PLACE_FIELDS).items():
+        node = None
+        found = None
+        for selector in spec['selectors']:
+            node = doc.first(selector)
+            if node is not None:
+                found = selector
+                break
+        if matched is not None:
+            matched[name] = found
+        if node is None:
+            fields[name] = None
+            continue
+
+        if spec['read'] == 'href':
+            value = doc.attr(node, 'href')
+        elif spec['read'] == 'label':
+            value = doc.attr(node, 'aria-label') or doc.text(node)
+        else:
+            value = doc.text(node)
+        if value and spec.get('strip'):
+            value = value.replace(spec['strip'], '').strip()
+        fields[name] = value
+
+    # "4,5(1.234)" -> calificacion "4,5", num_reviews "1.234"
+    fields['num_reviews'] = None
+    if fields.get('calificacion') is not None:
+        parts = fields['calificacion'].split('(')
+        fields['calificacion'] = parts[0].strip()
+        if len(parts) > 1:
+            fields['num_reviews'] = parts[1].replace(')', '').strip()
+    return fields
+
+
+def parse_place_html(html, url=None, index=0):
+    """Devuelve el registro del negocio a partir del HTML de su página (o None si no lo es)"""
+    return parse_place_page(html, url, index)[0]
+
+
+def parse_place_page(html, url=None, index=0, spec_fields=None):
+    """Como parse_place_html, pero devuelve (registro, {campo: selector que lo encontró})"""
+    matched = {}
+    fields = parse_place_fields(html, spec_fields, matched)
+    if fields.get('nombre') is None:
+        return None, matched
+    return business_from_fields(fields, index, url), matched
+
+
+def save_snapshot(directory, url, html):
+    """Guarda el HTML de una página de negocio para poder re-extraerla después"""
+    os.makedirs(directory, exist_ok=True)
+    name = (place_key(url) or url).replace(':', '_').replace('/', '_')
+    if not re.fullmatch(r'[\w.\-]+', name):
+        name = hashlib.sha1(name.encode('utf-8')).hexdigest()
+    path = os.path.join(directory, f"{name}.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_SNAPSHOT_HEADER.format(url=url))
+        f.write(html)
+    return path
+
+
+def load_snapshot(path):
+    """Lee una instantánea guardada; devuelve (url, html)"""
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    match = _SNAPSHOT_HEADER_RE.match(html)
+    return (match.group(1) if match else None), html
+
+
+def _parse_snapshot_file(path, index):
+    url, html = load_snapshot(path)
+    return parse_place_html(html, url, index)
+
+
+class SnapshotParser:
+    """Pool de procesos que analiza HTML de páginas de negocios en paralelo"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 2
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, html, url=None, index=0, spec_fields=None):
+        """Encola el análisis de una página; devuelve un Future con (registro, selectores encontrados)"""
+        return self._get_executor().submit(parse_place_page, html, url, index, spec_fields)
+
+    def parse_directory(self, directory):
+        """Re-extrae todas las instantáneas .html de una carpeta, en orden de nombre"""
+        paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.html')
+        )
+        futures = {
+            self._get_executor().submit(_parse_snapshot_file, path, index): index
+            for index, path in enumerate(paths)
+        }
+        results = [None] * len(paths)
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                print(f"   ⚠️ Error analizando {paths[futures[future]]}: {e}")
+        return [business for business in results if business]
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Uso: python place_parser.py <carpeta_instantaneas> <salida.csv>")
+        sys.exit(1)
+
+    directory, output = sys.argv[1], sys.argv[2]
+    parser = SnapshotParser()
+    try:
+        businesses = parser.parse_directory(directory)
+    finally:
+        parser.close()
+
+    if not businesses:
+        print("❌ No se extrajo ningún negocio de las instantáneas.")
+        return
+    with open_writer(output) as writer:
+        writer.write_many(businesses)
+    print(f"💾 {len(businesses)} negocios re-extraídos en {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import re
+import threading
+from collections import Counter
+from urllib.parse import urlparse, parse_qs, unquote_plus
+
+# Identificador de entidad ("feature id") dentro del segmento data= de la URL: !1s0x...:0x...
+_FEATURE_ID_RE = re.compile(r'!1s(0x[0-9a-fA-F]+:0x[0-9a-fA-F]+)')
+# Place ID de la API de Places dentro de data=: !19sChIJ...
+_PLACE_ID_RE = re.compile(r'!19s(ChIJ[\w-]+)')
+# Nombre del negocio en la ruta: /maps/place/<nombre>/@lat,lng,zoom/data=...
+_PLACE_NAME_RE = re.compile(r'/maps/place/([^/@?]+)')
+
+
+def is_maps_url(url, extra_hosts=()):
+    """True si la URL es de Google Maps o de uno de los hosts adicionales permitidos
+
+    extra_hosts admite 'host' o 'host:puerto' (p. ej. el servidor local de pruebas).
+    """
+    if not url:
+        return False
+    if "google.com/maps" in url or "maps.google.com" in url:
+        return True
+    netloc = urlparse(url).netloc
+    return bool(netloc) and any(netloc == host or netloc.split(':')[0] == host for host in extra_hosts)
+
+
+def extract_place_id(url):
+    """Obtiene un identificador estable del negocio a partir de una URL /maps/place/
+
+    Prueba, en orden: el feature id de data= (!1s0x...:0x...), el parámetro ftid,
+    el parámetro cid y el Place ID (ChIJ...). Devuelve None si la URL no trae ninguno.
+    """
+    if not url:
+        return None
+
+    match = _FEATURE_ID_RE.search(url)
+    if match:
+        return match.group(1).lower()
+
+    query = parse_qs(urlparse(url).query)
+    if query.get('ftid'):
+        return query['ftid'][0].lower()
+    if query.get('cid'):
+        return f"cid:{query['cid'][0]}"
+
+    match = _PLACE_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    return None
+
+
+def place_key(url):
+    """Clave canónica de un negocio: iguala URLs que solo difieren en data=, @lat,lng o parámetros
+
+    Usa el identificador de lugar cuando la URL lo trae y, si no, el nombre de la ruta
+    normalizado; como último recurso, la propia URL.
+    """
+    place_id = extract_place_id(url)
+    if place_id:
+        return place_id
+    match = _PLACE_NAME_RE.search(urlparse(url or '').path)
+    if match:
+        return 'nombre:' + unquote_plus(match.group(1)).strip().lower()
+    return url
+
+
+class DedupIndex:
+    """Índice de negocios ya vistos por clave canónica, con estadísticas de duplicados
+
+    Volver a ver exactamente la misma URL no cuenta como duplicado (el listado se
+    re-escanea en cada scroll); sí cuenta una URL distinta del mismo negocio.
+    """
+
+    def __init__(self):
+        self._first_url = {}
+        self._lock = threading.Lock()
+        self.dropped = Counter()
+
+    def add(self, url, stage='general', key=None):
+        """Registra la URL; devuelve True si el negocio es nuevo"""
+        key = key or place_key(url)
+        with self._lock:
+            first = self._first_url.get(key)
+            if first is None:
+                self._first_url[key] = url
+                return True
+            if first != url:
+                self.dropped[stage] += 1
+            return False
+
+    def __contains__(self, url):
+        return place_key(url) in self._first_url
+
+    def __len__(self):
+        return len(self._first_url)
+
+    def stats(self):
+        return {'unicos': len(self._first_url), 'duplicados': dict(self.dropped)}
@@ -0,0 +1,518 @@
+"""Base de datos de prospectos (SQLite en modo WAL) compartida por el CLI y las apps.
+
+Sustituye a los CSV sueltos por búsqueda y a las listas de session_state: cada
+negocio se guarda una sola vez por place_key (volver a extraerlo actualiza sus
+datos sin perder los que ya se conocían) y se recuerda en qué búsquedas apareció.
+Las columnas por las que se filtra están indexadas, así que filtrar cientos de
+miles de prospectos es una consulta al índice y no un recorrido de un DataFrame:
+
+    store = ProspectStore('prospectos.sqlite')
+    store.upsert(business)
+    store.query(busquedas=['dentistas_cdmx'], min_rating=4.0, has_phone=True, limit=100)
+    store.stats()
+
+Desde la línea de comandos:
+
+    python prospect_store.py importar negocios_*.csv
+    python prospect_store.py consultar --busqueda dentistas_cdmx --con-telefono --min-calificacion 4
+    python prospect_store.py exportar prospectos.csv --con-website
+"""
+import argparse
+import contextlib
+import csv
+import json
+import sqlite3
+import sys
+import threading
+import uuid
+from datetime import datetime
+
+from business_record import FIELDS, BusinessRecord, apply_dtypes, clean_text
+from csv_ingest import ingest_csv
+from output_writers import open_writer
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# Columnas devueltas por las consultas, en el orden de los CSV de siempre
+COLUMNS = [
+    'nombre', 'calificacion', 'num_reviews', 'tipo', 'direccion', 'telefono', 'website', 'email',
+    'busqueda', 'fecha_extraccion', 'place_key'
+]
+_TEXT_FIELDS = ['nombre', 'tipo', 'direccion', 'telefono', 'website', 'email']
+
+# Columnas por las que se puede ordenar una consulta
+ORDER_COLUMNS = {
+    'nombre': 'nombre COLLATE NOCASE',
+    'calificacion': 'calificacion',
+    'num_reviews': 'num_reviews',
+    'fecha_extraccion': 'fecha_extraccion',
+    'primera_extraccion': 'primera_extraccion',
+}
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS prospectos (
+        place_key TEXT PRIMARY KEY,
+        nombre TEXT,
+        calificacion REAL,
+        num_reviews INTEGER,
+        tipo TEXT,
+        direccion TEXT,
+        telefono TEXT,
+        website TEXT,
+        email TEXT,
+        busqueda TEXT,
+        fecha_extraccion TEXT,
+        primera_extraccion TEXT,
+        has_phone INTEGER NOT NULL DEFAULT 0,
+        has_website INTEGER NOT NULL DEFAULT 0,
+        extra TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_prospectos_busqueda ON prospectos(busqueda);
+    CREATE INDEX IF NOT EXISTS idx_prospectos_tipo ON prospectos(tipo);
+    CREATE INDEX IF NOT EXISTS idx_prospectos_calificacion ON prospectos(calificacion);
+    CREATE INDEX IF NOT EXISTS idx_prospectos_telefono ON prospectos(has_phone, calificacion);
+    CREATE INDEX IF NOT EXISTS idx_prospectos_website ON prospectos(has_website, calificacion);
+    CREATE INDEX IF NOT EXISTS idx_prospectos_fecha ON prospectos(fecha_extraccion);
+
+    -- Un negocio puede aparecer en varias búsquedas
+    CREATE TABLE IF NOT EXISTS apariciones (
+        place_key TEXT NOT NULL,
+        busqueda TEXT NOT NULL,
+        fecha TEXT,
+        PRIMARY KEY (busqueda, place_key)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_apariciones_place ON apariciones(place_key);
+
+    CREATE TABLE IF NOT EXISTS busquedas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        busqueda TEXT NOT NULL,
+        url TEXT,
+        resultados INTEGER,
+        fecha TEXT
+    );
+"""
+
+# Parámetros por consulta IN (SQLite antiguo admite como máximo 999)
+_KEYS_PER_QUERY = 500
+
+_UPSERT = """
+    INSERT INTO prospectos (place_key, nombre, calificacion, num_reviews, tipo, direccion, telefono, website,
+                            email, busqueda, fecha_extraccion, primera_extraccion, has_phone, has_website, extra)
+    VALUES (:place_key, :nombre, :calificacion, :num_reviews, :tipo, :direccion, :telefono, :website,
+            :email, :busqueda, :fecha_extraccion, :fecha_extraccion, :has_phone, :has_website, :extra)
+    ON CONFLICT(place_key) DO UPDATE SET
+        nombre = COALESCE(excluded.nombre, nombre),
+        calificacion = COALESCE(excluded.calificacion, calificacion),
+        num_reviews = COALESCE(excluded.num_reviews, num_reviews),
+        tipo = COALESCE(excluded.tipo, tipo),
+        direccion = COALESCE(excluded.direccion, direccion),
+        telefono = COALESCE(excluded.telefono, telefono),
+        website = COALESCE(excluded.website, website),
+        email = COALESCE(excluded.email, email),
+        busqueda = COALESCE(excluded.busqueda, busqueda),
+        fecha_extraccion = COALESCE(excluded.fecha_extraccion, fecha_extraccion),
+        has_phone = MAX(excluded.has_phone, has_phone),
+        has_website = MAX(excluded.has_website, has_website),
+        extra = COALESCE(excluded.extra, extra)
+"""
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def prospect_key(record):
+    """place_key del negocio; sin él, nombre y dirección normalizados"""
+    if record.place_key:
+        return record.place_key
+    if not record.nombre:
+        return None
+    return f"nombre:{record.nombre.lower()}|{(record.direccion or '').lower()}"
+
+
+def _row(business):
+    """Negocio (BusinessRecord, dict del scraper o fila de CSV) -> parámetros de la consulta de upsert"""
+    record = BusinessRecord.coerce(business)
+    row = {column: record[column] for column in COLUMNS}
+    row.update({
+        'place_key': prospect_key(record),
+        'fecha_extraccion': record.fecha_extraccion or _now(),
+        'has_phone': int(record.telefono is not None),
+        'has_website': int(record.website is not None),
+    })
+    # Campos que no tienen columna propia (p. ej. columnas añadidas a mano en un CSV)
+    extra = {} if isinstance(business, BusinessRecord) else {
+        key: value for key, value in business.items()
+        if key not in FIELDS and clean_text(value) is not None
+    }
+    row['extra'] = json.dumps(extra, ensure_ascii=False, default=str) if extra else None
+    return row
+
+
+class ProspectStore:
+    """Prospectos en SQLite con upsert por place_key y consultas sobre columnas indexadas
+
+    Es segura entre hilos (una conexión protegida por un lock, como PlaceCache), así
+    que los trabajos en segundo plano y la interfaz pueden compartir una instancia.
+    """
+
+    def __init__(self, path='prospectos.sqlite'):
+        self.path = path
+        self._lock = threading.Lock()
+        # Identifican la versión de los datos (ver data_version)
+        self._uid = uuid.uuid4().hex[:8]
+        self._changes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL: las lecturas de la interfaz no esperan a las escrituras del scraper
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # --- Escritura ---
+
+    def upsert(self, business):
+        """Guarda o actualiza un negocio; devuelve True si es nuevo"""
+        return self.upsert_many([business])[0] == 1
+
+    def upsert_many(self, businesses):
+        """Guarda varios negocios en una transacción; devuelve (nuevos, actualizados)"""
+        rows = [row for row in map(_row, businesses) if row['place_key']]
+        if not rows:
+            return 0, 0
+        keys = list({row['place_key']: None for row in rows})
+        with self._lock, self._conn:
+            # Las claves del bloque que ya estaban guardadas (por el índice, sin contar la tabla)
+            existing = 0
+            for start in range(0, len(keys), _KEYS_PER_QUERY):
+                chunk = keys[start:start + _KEYS_PER_QUERY]
+                existing += self._conn.execute(
+                    f"SELECT COUNT(*) FROM prospectos WHERE place_key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchone()[0]
+            self._conn.executemany(_UPSERT, rows)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO apariciones (place_key, busqueda, fecha) VALUES (?, ?, ?)",
+                [(row['place_key'], row['busqueda'], row['fecha_extraccion']) for row in rows if row['busqueda']]
+            )
+            self._changes += 1
+        new = len(keys) - existing
+        return new, len(rows) - new
+
+    def record_search(self, busqueda, url=None, resultados=0, fecha=None):
+        """Añade una búsqueda al historial"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO busquedas (busqueda, url, resultados, fecha) VALUES (?, ?, ?, ?)",
+                (busqueda, url, resultados, fecha or _now())
+            )
+            self._changes += 1
+
+    def import_csv(self, path, busqueda=None, batch_size=5000):
+        """Importa un CSV del scraper (p. ej. negocios_<búsqueda>.csv); devuelve (nuevos, actualizados)
+
+        Lee por bloques (ver csv_ingest.ingest_csv, que además devuelve el informe de velocidad).
+        """
+        report = ingest_csv(self, path, busqueda=busqueda, batch_size=batch_size)
+        return report['nuevos'], report['actualizados']
+
+    def delete_search(self, busqueda):
+        """Olvida una búsqueda y los prospectos que solo aparecían en ella"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM apariciones WHERE busqueda = ?", (busqueda,))
+            self._conn.execute("DELETE FROM busquedas WHERE busqueda = ?", (busqueda,))
+            self._conn.execute(
+                "DELETE FROM prospectos WHERE busqueda = ? "
+                "AND place_key NOT IN (SELECT place_key FROM apariciones)",
+                (busqueda,)
+            )
+            self._changes += 1
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM apariciones")
+            self._conn.execute("DELETE FROM busquedas")
+            self._conn.execute("DELETE FROM prospectos")
+            self._changes += 1
+
+    # --- Consultas ---
+
+    def data_version(self):
+        """Texto que cambia con cada escritura, de este proceso o de otro sobre el mismo archivo
+
+        Sirve de clave para memoizar consultas: mientras no cambie, los resultados tampoco.
+        """
+        with self._lock:
+            external = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return f"{self._uid}:{self._changes}:{external}"
+
+    @staticmethod
+    def _where(busquedas=None, tipos=None, min_rating=None, has_phone=None, has_website=None,
+               since=None, until=None, text=None):
+        clauses, params = [], []
+        if busquedas is not None:
+            busquedas = list(busquedas)
+            if not busquedas:
+                # Ninguna búsqueda elegida (p. ej. un multiselect vacío): no coincide nada
+                clauses.append("0")
+            else:
+                marks = ','.join('?' * len(busquedas))
+                clauses.append(f"place_key IN (SELECT place_key FROM apariciones WHERE busqueda IN ({marks}))")
+                params += busquedas
+        if tipos:
+            tipos = list(tipos)
+            clauses.append(f"tipo IN ({','.join('?' * len(tipos))})")
+            params += tipos
+        if min_rating is not None:
+            clauses.append("calificacion >= ?")
+            params.append(min_rating)
+        if has_phone is not None:
+            clauses.append("has_phone = ?")
+            params.append(int(has_phone))
+        if has_website is not None:
+            clauses.append("has_website = ?")
+            params.append(int(has_website))
+        if since:
+            clauses.append("fecha_extraccion >= ?")
+            params.append(since)
+        if until:
+            clauses.append("fecha_extraccion <= ?")
+            params.append(until)
+        if text:
+            clauses.append("(nombre LIKE ? OR direccion LIKE ?)")
+            params += [f"%{text}%"] * 2
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _fetch(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _select(self, order_by='fecha_extraccion', descending=True, limit=None, offset=0, **filters):
+        where, params = self._where(**filters)
+        order = ORDER_COLUMNS.get(order_by)
+        if order is None:
+            raise ValueError(f"No se puede ordenar por '{order_by}' (opciones: {', '.join(ORDER_COLUMNS)})")
+        direction = 'DESC' if descending else 'ASC'
+        # place_key desempata: el orden es estable entre consultas con límite
+        sql = f"SELECT {', '.join(COLUMNS)} FROM prospectos{where} ORDER BY {order} {direction}, place_key {direction}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        return sql, params
+
+    def query(self, order_by='fecha_extraccion', descending=True, limit=None, offset=0, **filters):
+        """Prospectos que cumplen los filtros, como lista de dicts (None = dato no disponible)
+
+        Filtros: busquedas (una lista vacía no devuelve nada), tipos, min_rating, has_phone,
+        has_website, since, until (fechas 'AAAA-MM-DD') y text (busca en nombre y dirección).
+        """
+        sql, params = self._select(order_by, descending, limit, offset, **filters)
+        return [dict(row) for row in self._fetch(sql, params)]
+
+    def query_df(self, **kwargs):
+        """Como query(), pero devuelve un DataFrame tipado (Float64, Int64, categorías)"""
+        if pd is None:
+            raise ImportError("query_df necesita pandas")
+        return apply_dtypes(pd.DataFrame(self.query(**kwargs), columns=COLUMNS))
+
+    def iter_query(self, batch_size=5000, **kwargs):
+        """Recorre una consulta con un solo cursor, de batch_size en batch_size filas
+
+        Con una base en archivo se lee con una conexión propia (en WAL ve una instantánea
+        fija y no frena al scraper); en ':memory:' se comparte la conexión y el cerrojo
+        se toma en cada bloque.
+        """
+        sql, params = self._select(**kwargs)
+        if self.path == ':memory:':
+            conn, lock = self._conn, self._lock
+        else:
+            conn, lock = sqlite3.connect(self.path, check_same_thread=False), contextlib.nullcontext()
+            conn.row_factory = sqlite3.Row
+        try:
+            with lock:
+                cursor = conn.execute(sql, params)
+            while True:
+                with lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            if conn is not self._conn:
+                conn.close()
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        return self._fetch(f"SELECT COUNT(*) FROM prospectos{where}", params)[0][0]
+
+    def stats(self, **filters):
+        """Totales y completitud de los prospectos filtrados"""
+        where, params = self._where(**filters)
+        row = self._fetch(
+            "SELECT COUNT(*), COALESCE(SUM(has_phone), 0), COALESCE(SUM(has_website), 0), "
+            "COUNT(calificacion), AVG(calificacion), COUNT(direccion), COUNT(tipo), COUNT(nombre) "
+            f"FROM prospectos{where}",
+            params
+        )[0]
+        return {
+            'total': row[0],
+            'con_telefono': row[1],
+            'con_website': row[2],
+            'con_calificacion': row[3],
+            'calificacion_promedio': round(row[4], 2) if row[4] is not None else None,
+            'con_direccion': row[5],
+            'con_tipo': row[6],
+            'con_nombre': row[7],
+        }
+
+    def tipo_counts(self, limit=15, **filters):
+        """[(tipo, cantidad)] de los tipos más frecuentes"""
+        where, params = self._where(**filters)
+        where = (where + " AND" if where else " WHERE") + " tipo IS NOT NULL"
+        rows = self._fetch(
+            f"SELECT tipo, COUNT(*) AS n FROM prospectos{where} GROUP BY tipo ORDER BY n DESC LIMIT ?",
+            params + [limit]
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    def ratings(self, **filters):
+        """Calificaciones disponibles de los prospectos filtrados (para histogramas)"""
+        where, params = self._where(**filters)
+        where = (where + " AND" if where else " WHERE") + " calificacion IS NOT NULL"
+        return [row[0] for row in self._fetch(f"SELECT calificacion FROM prospectos{where}", params)]
+
+    def rating_distribution(self, **filters):
+        """[(calificación, cantidad)] redondeando a una décima, como las muestra Google Maps"""
+        where, params = self._where(**filters)
+        where = (where + " AND" if where else " WHERE") + " calificacion IS NOT NULL"
+        rows = self._fetch(
+            f"SELECT ROUND(calificacion, 1) AS c, COUNT(*) FROM prospectos{where} GROUP BY c ORDER BY c",
+            params
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    def searches(self):
+        """[{busqueda, negocios, ultima_extraccion}] de todas las búsquedas con prospectos"""
+        rows = self._fetch(
+            "SELECT busqueda, COUNT(*), MAX(fecha) FROM apariciones GROUP BY busqueda ORDER BY MAX(fecha) DESC"
+        )
+        return [{'busqueda': row[0], 'negocios': row[1], 'ultima_extraccion': row[2]} for row in rows]
+
+    def history(self):
+        """Historial de búsquedas ejecutadas, de la más antigua a la más reciente"""
+        rows = self._fetch("SELECT busqueda, url, resultados, fecha FROM busquedas ORDER BY id")
+        return [dict(row) for row in rows]
+
+    def export(self, path, writer_options=None, **kwargs):
+        """Escribe una consulta en un archivo .csv, .jsonl, .json o .parquet; devuelve el número de filas
+
+        writer_options: opciones del escritor de output_writers (p. ej. {'fsync_every': 0}).
+        """
+        with open_writer(path, columns=COLUMNS, **(writer_options or {})) as writer:
+            for row in self.iter_query(**kwargs):
+                writer.write(row)
+        return writer.rows
+
+    def __len__(self):
+        return self.count()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _add_filters(parser):
+    parser.add_argument('--busqueda', action='append', help="Solo estas búsquedas (se puede repetir)")
+    parser.add_argument('--tipo', action='append', help="Solo estos tipos de negocio (se puede repetir)")
+    parser.add_argument('--min-calificacion', type=float)
+    parser.add_argument('--con-telefono', action='store_true')
+    parser.add_argument('--con-website', action='store_true')
+    parser.add_argument('--desde', help="Extraídos desde esta fecha (AAAA-MM-DD)")
+    parser.add_argument('--texto', help="Texto en el nombre o la dirección")
+
+
+def _filters(args):
+    return {
+        'busquedas': args.busqueda,
+        'tipos': args.tipo,
+        'min_rating': args.min_calificacion,
+        'has_phone': True if args.con_telefono else None,
+        'has_website': True if args.con_website else None,
+        'since': args.desde,
+        'text': args.texto,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Base de datos de prospectos extraídos de Google Maps")
+    parser.add_argument('--db', default='prospectos.sqlite', help="Archivo de la base de datos")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importar = commands.add_parser('importar', help="Importa CSV generados por el scraper")
+    importar.add_argument('files', nargs='+')
+    importar.add_argument('--busqueda', help="Nombre de búsqueda para filas que no lo traen")
+
+    consultar = commands.add_parser('consultar', help="Muestra los prospectos que cumplen los filtros")
+    _add_filters(consultar)
+    consultar.add_argument('--orden', default='fecha_extraccion', choices=list(ORDER_COLUMNS))
+    consultar.add_argument('--limite', type=int, default=20)
+
+    exportar = commands.add_parser('exportar', help="Exporta los prospectos filtrados (.csv, .jsonl, .json o .parquet)")
+    exportar.add_argument('output')
+    _add_filters(exportar)
+
+    commands.add_parser('resumen', help="Totales, completitud y búsquedas")
+    args = parser.parse_args()
+
+    store = ProspectStore(args.db)
+    try:
+        if args.command == 'importar':
+            for path in args.files:
+                try:
+                    report = ingest_csv(store, path, busqueda=args.busqueda)
+                except (OSError, ValueError, csv.Error) as e:
+                    print(f"❌ {path}: {e}")
+                    continue
+                print(f"📥 {path}: {report['nuevos']} nuevos, {report['actualizados']} actualizados "
+                      f"({report['filas']} filas en {report['segundos']:.1f}s, {report['filas_por_segundo']} filas/s)")
+            print(f"🗄️ {len(store)} prospectos en {args.db}")
+
+        elif args.command == 'consultar':
+            filters = _filters(args)
+            rows = store.query(order_by=args.orden, limit=args.limite, **filters)
+            print(f"🔍 {store.count(**filters)} prospectos (mostrando {len(rows)})")
+            for row in rows:
+                rating = f"{row['calificacion']:.1f}⭐" if row['calificacion'] is not None else "sin calificación"
+                print(f"   • {row['nombre']} · {rating} · {row['telefono'] or 'sin teléfono'}"
+                      f" · {row['website'] or 'sin website'}")
+
+        elif args.command == 'exportar':
+            try:
+                rows = store.export(args.output, **_filters(args))
+            except (ValueError, ImportError) as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+            print(f"💾 {rows} prospectos exportados a {args.output}")
+
+        elif args.command == 'resumen':
+            stats = store.stats()
+            total = stats['total'] or 1
+            print(f"🗄️ {stats['total']} prospectos en {args.db}")
+            for label, key in [('Teléfono', 'con_telefono'), ('Website', 'con_website'),
+                               ('Calificación', 'con_calificacion'), ('Dirección', 'con_direccion')]:
+                print(f"   • {label}: {stats[key]} ({stats[key] / total * 100:.1f}%)")
+            if stats['calificacion_promedio'] is not None:
+                print(f"   • Calificación promedio: {stats['calificacion_promedio']}")
+            print("\n📋 BÚSQUEDAS:")
+            for search in store.searches():
+                print(f"   • {search['busqueda']}: {search['negocios']} negocios (última: {search['ultima_extraccion']})")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Estadísticas de aciertos de los selectores CSS, persistidas entre ejecuciones.
+
+Cada grupo (un campo de la ficha, o 'enlaces' para el listado) guarda por
+selector sus aciertos, fallos, último acierto y una puntuación con decaimiento
+exponencial. `ordered` devuelve la lista de selectores con los que más y más
+recientemente aciertan primero, así que cuando Google cambia el marcado el
+selector que ahora funciona pasa delante en pocas páginas.
+
+    python selector_stats.py [selector_stats.json]   # informe de selectores muertos
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+# Peso de la historia frente al último resultado al actualizar la puntuación
+DECAY = 0.8
+
+# Intentos sin ningún acierto (o días sin acertar) para considerar muerto un selector
+DEAD_MIN_ATTEMPTS = 20
+DEAD_AFTER_DAYS = 14
+
+
+class SelectorStats:
+    """Aciertos y fallos por grupo y selector, guardados en un archivo JSON"""
+
+    def __init__(self, path='selector_stats.json', decay=DECAY):
+        self.path = path
+        self.decay = decay
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.groups = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.groups = json.load(f).get('grupos', {})
+            except (OSError, ValueError):
+                # Un archivo corrupto solo cuesta volver a aprender el orden
+                self.groups = {}
+
+    def _update(self, group, selector, hit, now):
+        stats = self.groups.setdefault(group, {}).setdefault(
+            selector, {'aciertos': 0, 'fallos': 0, 'puntuacion': 0.0, 'ultimo_acierto': None}
+        )
+        stats['puntuacion'] = stats['puntuacion'] * self.decay + (1 - self.decay) * (1 if hit else 0)
+        if hit:
+            stats['aciertos'] += 1
+            stats['ultimo_acierto'] = now
+        else:
+            stats['fallos'] += 1
+
+    def record_first_match(self, group, selectors, matched):
+        """Registra una búsqueda que se detiene en el primer selector que existe
+
+        Los selectores probados antes de `matched` fallaron; los posteriores no se
+        evaluaron. Si matched es None fallaron todos.
+        """
+        now = time.time()
+        with self._lock:
+            for selector in selectors:
+                if selector == matched:
+                    self._update(group, selector, True, now)
+                    break
+                self._update(group, selector, False, now)
+            self._dirty = True
+
+    def record_each(self, group, results):
+        """Registra selectores evaluados todos a la vez: {selector: acertó}"""
+        now = time.time()
+        with self._lock:
+            for selector, hit in results.items():
+                self._update(group, selector, bool(hit), now)
+            self._dirty = True
+
+    def ordered(self, group, selectors):
+        """Selectores ordenados por puntuación; los empates conservan el orden original"""
+        with self._lock:
+            known = self.groups.get(group)
+            if not known:
+                return list(selectors)
+            scores = {selector: known[selector]['puntuacion'] for selector in selectors if selector in known}
+        return sorted(selectors, key=lambda selector: -scores.get(selector, 0.0))
+
+    def ordered_fields(self, fields):
+        """Copia de un dict tipo PLACE_FIELDS con los selectores de cada campo reordenados"""
+        return {name: dict(spec, selectors=self.ordered(name, spec['selectors'])) for name, spec in fields.items()}
+
+    def dead_selectors(self, min_attempts=DEAD_MIN_ATTEMPTS, after_days=DEAD_AFTER_DAYS):
+        """Selectores que nunca acertaron en min_attempts intentos o que llevan after_days sin acertar"""
+        cutoff = time.time() - after_days * 86400
+        dead = []
+        with self._lock:
+            for group, selectors in sorted(self.groups.items()):
+                for selector, stats in selectors.items():
+                    last_hit = stats['ultimo_acierto']
+                    never = last_hit is None and stats['fallos'] >= min_attempts
+                    stale = last_hit is not None and last_hit < cutoff and stats['fallos'] > 0
+                    if never or stale:
+                        dead.append({
+                            'grupo': group,
+                            'selector': selector,
+                            'aciertos': stats['aciertos'],
+                            'fallos': stats['fallos'],
+                            'ultimo_acierto': last_hit,
+                        })
+        return dead
+
+    def report(self):
+        """Filas por grupo y selector con su tasa de acierto, en el orden en que se probarán"""
+        rows = []
+        with self._lock:
+            groups = {group: dict(selectors) for group, selectors in self.groups.items()}
+        for group, selectors in sorted(groups.items()):
+            for selector in self.ordered(group, list(selectors)):
+                stats = selectors[selector]
+                attempts = stats['aciertos'] + stats['fallos']
+                rows.append({
+                    'grupo': group,
+                    'selector': selector,
+                    'aciertos': stats['aciertos'],
+                    'intentos': attempts,
+                    'tasa': stats['aciertos'] / attempts if attempts else 0.0,
+                    'puntuacion': stats['puntuacion'],
+                })
+        return rows
+
+    def print_report(self):
+        dead = self.dead_selectors()
+        if not dead:
+            print("✅ No hay selectores muertos")
+            return
+        print(f"\n🪦 Selectores muertos ({len(dead)}):")
+        for entry in dead:
+            if entry['ultimo_acierto'] is None:
+                when = "nunca"
+            else:
+                when = time.strftime('%Y-%m-%d', time.localtime(entry['ultimo_acierto']))
+            print(f"  {entry['grupo']}: {entry['selector']} "
+                  f"({entry['aciertos']} aciertos / {entry['fallos']} fallos, último acierto: {when})")
+
+    def save(self):
+        """Escribe las estadísticas si cambiaron (reemplazo atómico del archivo)"""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'grupos': self.groups}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def close(self):
+        self.save()
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'selector_stats.json'
+    if not os.path.exists(path):
+        print(f"❌ No existe {path}")
+        sys.exit(1)
+
+    stats = SelectorStats(path)
+    print("📊 Selectores por grupo (en orden de prueba):")
+    current = None
+    for row in stats.report():
+        if row['grupo'] != current:
+            current = row['grupo']
+            print(f"\n  {current}:")
+        print(f"    {row['tasa']:6.1%}  {row['aciertos']}/{row['intentos']}  {row['selector']}")
+    stats.print_report()
+
+
+if __name__ == "__main__":
+    main()
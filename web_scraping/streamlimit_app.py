@@ -1,11 +1,14 @@
 import streamlit as st
 import pandas as pd
 import time
-from io import BytesIO
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
-from undetected_method3 import GoogleMapsScraper
+from job_queue import JobManager, QUEUED, RUNNING, DONE, CANCELLED, FAILED
+from prospect_store import ProspectStore
+from business_record import to_frame
+from dashboard_data import dashboard_summary, filtered_table, lazy_export
+from place_urls import is_maps_url
 import json
 
 # Configuración de la página
@@ -78,50 +81,117 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Inicializar session state
-if 'scraped_data' not in st.session_state:
-    st.session_state.scraped_data = []
-if 'scraping_history' not in st.session_state:
-    st.session_state.scraping_history = []
 if 'is_scraping' not in st.session_state:
     st.session_state.is_scraping = False
 
-# Función para realizar scraping (SIN threading - versión síncrona)
-def perform_scraping(url, max_results, search_name):
-    """Realiza el scraping de forma síncrona"""
-    try:
-        with st.spinner('🔧 Configurando navegador...'):
-            scraper = GoogleMapsScraper()
-        
-        with st.spinner('🌐 Accediendo a Google Maps y extrayendo datos...'):
-            businesses = scraper.search_businesses(url, max_results=max_results)
+if 'job_ids' not in st.session_state:
+    st.session_state.job_ids = []
+if 'merged_jobs' not in st.session_state:
+    st.session_state.merged_jobs = set()
+if 'session_searches' not in st.session_state:
+    st.session_state.session_searches = []
+
+# Filas máximas de la tabla (los filtros y métricas se calculan sobre toda la base)
+MAX_TABLE_ROWS = 5000
+
+@st.cache_resource
+def get_store():
+    """Base de prospectos: los resultados sobreviven a reinicios y se comparten entre pestañas"""
+    return ProspectStore('prospectos.sqlite')
+
+@st.cache_resource
+def get_job_manager():
+    """Cola de trabajos (y navegadores) compartida por todas las pestañas del proceso de Streamlit"""
+    return JobManager(max_concurrent=2, idle_timeout=600, cache_path='place_cache.sqlite', store=get_store())
+
+JOB_STATUS_LABELS = {
+    QUEUED: "⏳ En cola",
+    RUNNING: "🔄 Ejecutando",
+    DONE: "✅ Completado",
+    CANCELLED: "🛑 Cancelado",
+    FAILED: "❌ Error",
+}
+
+def dismiss_job(job_id):
+    st.session_state.job_ids.remove(job_id)
+    st.session_state.merged_jobs.discard(job_id)
+    get_job_manager().forget(job_id)
+
+def render_jobs_panel():
+    """Estado, negocios parciales y log de los trabajos de esta sesión (se refresca solo)"""
+    manager = get_job_manager()
+    jobs = manager.jobs(st.session_state.job_ids)
+    if not jobs:
+        return
+    
+    st.markdown("## 🧵 Trabajos de Scraping")
+    newly_finished = False
+    
+    for job in jobs:
+        snapshot = job.snapshot()
+        businesses = snapshot['negocios']
+        if job.done and job.id not in st.session_state.merged_jobs:
+            # Sus negocios ya están en la base de prospectos: solo hay que refrescar el panel
+            st.session_state.merged_jobs.add(job.id)
+            newly_finished = True
         
-        if businesses:
-            # Agregar metadatos
-            for i, business in enumerate(businesses):
-                business['busqueda'] = search_name
-                business['fecha_extraccion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                business['indice_global'] = len(st.session_state.scraped_data) + i
-            
-            # Guardar datos
-            st.session_state.scraped_data.extend(businesses)
-            st.session_state.scraping_history.append({
-                'busqueda': search_name,
-                'url': url,
-                'resultados': len(businesses),
-                'fecha': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
+        with st.container(border=True):
+            col_info, col_action = st.columns([4, 1])
+            with col_info:
+                status_label = "🛑 Cancelando..." if snapshot['cancelando'] else JOB_STATUS_LABELS[snapshot['estado']]
+                st.markdown(f"**{snapshot['busqueda']}** · {status_label} · enviado {snapshot['creado']}")
+                
+                if not job.done:
+                    st.progress(
+                        min(len(businesses) / snapshot['max_resultados'], 1.0),
+                        text=f"🏪 {len(businesses)}/{snapshot['max_resultados']} negocios extraídos"
+                             + (f" · último: {businesses[-1].nombre}" if businesses else "")
+                    )
+                elif snapshot['estado'] == DONE and businesses:
+                    st.markdown(f"""
+                    <div class="success-box">
+                        <strong>✅ Extracción completada exitosamente</strong><br>
+                        📊 Negocios encontrados: {len(businesses)}<br>
+                        🏷️ Búsqueda: {snapshot['busqueda']}
+                    </div>
+                    """, unsafe_allow_html=True)
+                else:
+                    reason = snapshot['error'] or (
+                        "Búsqueda cancelada" if snapshot['estado'] == CANCELLED else "No se encontraron resultados"
+                    )
+                    saved = f" ({len(businesses)} negocios guardados)" if businesses else ""
+                    st.markdown(f"""
+                    <div class="error-box">
+                        <strong>❌ Extracción incompleta</strong><br>
+                        {reason}{saved}
+                    </div>
+                    """, unsafe_allow_html=True)
             
-            return True, businesses
-        else:
-            return False, "No se encontraron resultados"
+            with col_action:
+                if not job.done:
+                    st.button("🛑 Cancelar", key=f"cancel_{job.id}", disabled=snapshot['cancelando'],
+                              on_click=manager.cancel, args=(job.id,), use_container_width=True)
+                else:
+                    st.button("✖️ Quitar", key=f"dismiss_{job.id}", on_click=dismiss_job, args=(job.id,),
+                              use_container_width=True)
             
-    except Exception as e:
-        return False, f"Error durante el scraping: {str(e)}"
-    finally:
-        try:
-            scraper.close()
-        except:
-            pass
+            if businesses and not job.done:
+                st.dataframe(
+                    to_frame(businesses, columns=['nombre', 'calificacion', 'tipo', 'telefono', 'website']),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            with st.expander("📜 Log"):
+                st.code("\n".join(snapshot['log'][-60:]) or "Sin mensajes todavía", language=None)
+    
+    if newly_finished:
+        # Refrescar el panel de resultados con los negocios recién incorporados
+        st.rerun(scope="app")
+
+# Datos de la base memoizados por versión: solo se recalculan al añadir o borrar negocios
+store = get_store()
+data_version = store.data_version()
+summary = dashboard_summary(store, data_version)
 
 # Sidebar con configuración
 st.sidebar.markdown("## ⚙️ Panel de Control")
@@ -136,6 +206,49 @@ with st.sidebar.expander("🔧 Configuración Avanzada", expanded=True):
         step=5,
         help="Cantidad de negocios a extraer (recomendado: 15-50)"
     )
+    
+    parallel_browsers = st.number_input(
+        "Navegadores en paralelo",
+        min_value=1,
+        max_value=8,
+        value=1,
+        step=1,
+        help="Cada navegador extrae páginas de negocios de forma independiente (más rápido, más memoria)"
+    )
+    
+    use_observer = st.checkbox(
+        "Detección incremental de resultados",
+        value=False,
+        help="Usa un MutationObserver en la página para detectar tarjetas nuevas al instante y detener el scroll al llegar al máximo"
+    )
+    
+    use_cache = st.checkbox(
+        "Usar caché de negocios",
+        value=True,
+        help="Reutiliza los datos de negocios ya extraídos en búsquedas anteriores (30 días) sin volver a abrir su página"
+    )
+    
+    offline_parsing = st.checkbox(
+        "Análisis offline del HTML",
+        value=False,
+        help="El navegador solo captura cada página (guardada en 'snapshots/') y el análisis se hace en paralelo con todos los núcleos"
+    )
+
+with st.sidebar.expander("🧭 Navegadores"):
+    for slot, session in enumerate(get_job_manager().sessions):
+        session_status = session.status()
+        if session_status['en_uso']:
+            st.info(f"#{slot + 1} 🔄 En uso por una búsqueda")
+        elif session_status['activo']:
+            st.success(f"#{slot + 1} ✅ Abierto · inactivo {session_status['inactivo_s']}s")
+        else:
+            st.caption(f"#{slot + 1} 💤 Cerrado: se iniciará con la próxima búsqueda")
+        if session_status['ultimo_error']:
+            st.caption(f"⚠️ Último error: {session_status['ultimo_error']}")
+        if session_status['activo'] and not session_status['en_uso']:
+            if st.button("🔄 Reiniciar", key=f"restart_session_{slot}"):
+                session.restart()
+                st.rerun()
 
 # Información y ayuda
 with st.sidebar.expander("💡 Ejemplos de URLs Válidas"):
@@ -156,10 +269,11 @@ with st.sidebar.expander("💡 Ejemplos de URLs Válidas"):
     ```
     """)
 
-with st.sidebar.expander("📊 Estadísticas de Sesión"):
-    if st.session_state.scraped_data:
-        total_businesses = len(st.session_state.scraped_data)
-        searches_count = len(st.session_state.scraping_history)
+with st.sidebar.expander("📊 Estadísticas de la Base"):
+    sidebar_stats = summary['stats']
+    if sidebar_stats['total']:
+        total_businesses = sidebar_stats['total']
+        searches_count = len(summary['historial'])
         
         col_stat1, col_stat2 = st.columns(2)
         with col_stat1:
@@ -167,24 +281,25 @@ with st.sidebar.expander("📊 Estadísticas de Sesión"):
         with col_stat2:
             st.metric("🔍 Búsquedas", searches_count)
         
-        if total_businesses > 0:
-            df = pd.DataFrame(st.session_state.scraped_data)
-            completeness_metrics = {}
-            for col in ['telefono', 'website', 'direccion', 'calificacion']:
-                if col in df.columns:
-                    available = (df[col] != 'No disponible').sum()
-                    percentage = (available / total_businesses) * 100
-                    completeness_metrics[col] = percentage
-            
-            st.markdown("**📈 Completitud de Datos:**")
-            for field, percentage in completeness_metrics.items():
-                st.progress(percentage / 100, text=f"{field.title()}: {percentage:.1f}%")
+        completeness_metrics = {
+            'telefono': sidebar_stats['con_telefono'],
+            'website': sidebar_stats['con_website'],
+            'direccion': sidebar_stats['con_direccion'],
+            'calificacion': sidebar_stats['con_calificacion'],
+        }
+        
+        st.markdown("**📈 Completitud de Datos:**")
+        for field, available in completeness_metrics.items():
+            percentage = (available / total_businesses) * 100
+            st.progress(percentage / 100, text=f"{field.title()}: {percentage:.1f}%")
     else:
         st.info("🎯 Realiza tu primera búsqueda para ver estadísticas")
 
 # Área principal
 st.markdown("## 🔍 Nueva Búsqueda de Negocios")
 
+has_active_jobs = any(not job.done for job in get_job_manager().jobs(st.session_state.job_ids))
+
 # Formulario de búsqueda
 with st.form("search_form", clear_on_submit=False):
     search_url = st.text_input(
@@ -221,87 +336,75 @@ with st.form("search_form", clear_on_submit=False):
         )
     
     with col_clear:
+        # La base se comparte con otras pestañas: solo se borran las búsquedas de esta sesión
         clear_button = st.form_submit_button(
             "🗑️ Limpiar Datos",
-            use_container_width=True
+            use_container_width=True,
+            disabled=has_active_jobs or not st.session_state.session_searches,
+            help="Borra los negocios de las búsquedas hechas en esta sesión"
         )
 
 # Limpiar datos
 if clear_button:
-    st.session_state.scraped_data = []
-    st.session_state.scraping_history = []
-    st.success("✅ Todos los datos han sido limpiados")
+    for name in st.session_state.session_searches:
+        store.delete_search(name)
+    st.session_state.session_searches = []
+    st.success("✅ Los datos de esta sesión han sido limpiados")
     st.rerun()
 
 # Lógica de scraping
 if submit_button and search_url:
-    if "google.com/maps" not in search_url and "maps.google.com" not in search_url:
+    if not is_maps_url(search_url):
         st.error("❌ La URL no parece ser válida. Debe ser una búsqueda de Google Maps.")
     else:
         # Preparar nombre de búsqueda
         if not search_name:
-            search_name = f"busqueda_{len(st.session_state.scraping_history) + 1}"
-        
-        st.info("🚀 Iniciando scraping. Esto puede tomar varios minutos...")
+            search_name = f"busqueda_{len(summary['historial']) + len(st.session_state.job_ids) + 1}"
         
-        # Realizar scraping de forma síncrona
-        success, result = perform_scraping(search_url, form_max_results, search_name)
-        
-        if success:
-            businesses = result
-            st.markdown(f"""
-            <div class="success-box">
-                <strong>✅ Extracción completada exitosamente</strong><br>
-                📊 Negocios encontrados: {len(businesses)}<br>
-                🏷️ Búsqueda: {search_name}
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="error-box">
-                <strong>❌ Error en la extracción</strong><br>
-                {result}
-            </div>
-            """, unsafe_allow_html=True)
+        # Encolar la búsqueda: se ejecuta en segundo plano y la página sigue respondiendo
+        job = get_job_manager().submit(
+            search_url, form_max_results, search_name,
+            workers=parallel_browsers, use_observer=use_observer, use_cache=use_cache,
+            offline_parsing=offline_parsing, snapshot_dir='snapshots' if offline_parsing else None
+        )
+        st.session_state.job_ids.append(job.id)
+        st.session_state.session_searches.append(search_name)
+        has_active_jobs = True
+        st.info(f"📥 Búsqueda '{search_name}' en cola. Puedes seguir usando la app mientras se ejecuta.")
+
+# Trabajos en curso: el panel se refresca solo mientras alguno no haya terminado
+st.fragment(run_every=2 if has_active_jobs else None)(render_jobs_panel)()
 
 # Mostrar resultados si hay datos
-if st.session_state.scraped_data:
+stats = summary['stats']
+if stats['total']:
     st.markdown("---")
     st.markdown("## 📊 Panel de Resultados")
     
-    df = pd.DataFrame(st.session_state.scraped_data)
-    
-    # Métricas principales
+    # Métricas principales (agregados precalculados, sin cargar la tabla)
+    total = stats['total']
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        st.metric("🏪 Total Negocios", len(df))
+        st.metric("🏪 Total Negocios", total)
     
     with col2:
-        with_phone = (df['telefono'] != 'No disponible').sum()
-        phone_percentage = (with_phone / len(df)) * 100
+        with_phone = stats['con_telefono']
+        phone_percentage = (with_phone / total) * 100
         st.metric("📞 Con Teléfono", with_phone, delta=f"{phone_percentage:.1f}%")
     
     with col3:
-        with_website = (df['website'] != 'No disponible').sum()
-        website_percentage = (with_website / len(df)) * 100
+        with_website = stats['con_website']
+        website_percentage = (with_website / total) * 100
         st.metric("🌐 Con Website", with_website, delta=f"{website_percentage:.1f}%")
     
     with col4:
-        with_rating = (df['calificacion'] != 'No disponible').sum()
-        rating_percentage = (with_rating / len(df)) * 100
+        with_rating = stats['con_calificacion']
+        rating_percentage = (with_rating / total) * 100
         st.metric("⭐ Con Calificación", with_rating, delta=f"{rating_percentage:.1f}%")
     
     with col5:
-        avg_rating = None
-        try:
-            ratings = df[df['calificacion'] != 'No disponible']['calificacion']
-            ratings_numeric = pd.to_numeric(ratings, errors='coerce').dropna()
-            if not ratings_numeric.empty:
-                avg_rating = ratings_numeric.mean()
-        except:
-            avg_rating = None
-        
+        avg_rating = stats['calificacion_promedio']
         if avg_rating:
             st.metric("📊 Promedio", f"{avg_rating:.1f} ⭐")
         else:
@@ -322,7 +425,7 @@ if st.session_state.scraped_data:
         col_filter1, col_filter2, col_filter3 = st.columns(3)
         
         with col_filter1:
-            busquedas_unicas = df['busqueda'].unique() if 'busqueda' in df.columns else []
+            busquedas_unicas = [search['busqueda'] for search in summary['busquedas']]
             filtro_busqueda = st.multiselect(
                 "🔍 Filtrar por búsqueda:",
                 busquedas_unicas,
@@ -332,7 +435,7 @@ if st.session_state.scraped_data:
         with col_filter2:
             filtros_rapidos = st.multiselect(
                 "⚡ Filtros rápidos:",
-                ["Solo con teléfono", "Solo con website", "Solo con calificación", "Calificación > 4.0"],
+                ["Solo con teléfono", "Solo con website", "Solo con calificación", "Calificación ≥ 4.0"],
                 default=[]
             )
         
@@ -343,29 +446,32 @@ if st.session_state.scraped_data:
                 index=0
             )
         
-        # Aplicar filtros
-        df_filtered = df.copy()
+        # Los filtros se resuelven en la base con sus índices
+        filters = {}
+        if len(filtro_busqueda) < len(busquedas_unicas):
+            filters['busquedas'] = filtro_busqueda
+        if "Solo con teléfono" in filtros_rapidos:
+            filters['has_phone'] = True
+        if "Solo con website" in filtros_rapidos:
+            filters['has_website'] = True
+        if "Solo con calificación" in filtros_rapidos:
+            filters['min_rating'] = 0
+        if "Calificación ≥ 4.0" in filtros_rapidos:
+            filters['min_rating'] = 4.0
         
-        if filtro_busqueda and 'busqueda' in df.columns:
-            df_filtered = df_filtered[df_filtered['busqueda'].isin(filtro_busqueda)]
-        
-        for filtro in filtros_rapidos:
-            if filtro == "Solo con teléfono":
-                df_filtered = df_filtered[df_filtered['telefono'] != 'No disponible']
-            elif filtro == "Solo con website":
-                df_filtered = df_filtered[df_filtered['website'] != 'No disponible']
-            elif filtro == "Solo con calificación":
-                df_filtered = df_filtered[df_filtered['calificacion'] != 'No disponible']
-            elif filtro == "Calificación > 4.0":
-                try:
-                    ratings = pd.to_numeric(df_filtered['calificacion'], errors='coerce')
-                    df_filtered = df_filtered[ratings > 4.0]
-                except:
-                    pass
+        order_by, descending = {
+            "Índice": ('primera_extraccion', False),
+            "Nombre": ('nombre', False),
+            "Calificación": ('calificacion', True),
+            "Número de reviews": ('num_reviews', True),
+        }[ordenar_por]
+        filtered_count, df_filtered = filtered_table(store, data_version, filters, order_by, descending, MAX_TABLE_ROWS)
         
         # Mostrar información del filtrado
-        if len(df_filtered) != len(df):
-            st.info(f"📊 Mostrando {len(df_filtered)} de {len(df)} negocios (filtrados)")
+        if filtered_count != total:
+            st.info(f"📊 Mostrando {len(df_filtered)} de {filtered_count} negocios filtrados ({total} en total)")
+        elif filtered_count > len(df_filtered):
+            st.info(f"📊 Mostrando los primeros {len(df_filtered)} de {total} negocios")
         
         # Tabla con configuración mejorada
         st.dataframe(
@@ -375,7 +481,7 @@ if st.session_state.scraped_data:
             column_config={
                 "nombre": st.column_config.TextColumn("🏪 Nombre", width="large"),
                 "calificacion": st.column_config.NumberColumn("⭐ Calificación", format="%.1f"),
-                "num_reviews": st.column_config.TextColumn("📝 Reviews"),
+                "num_reviews": st.column_config.NumberColumn("📝 Reviews"),
                 "tipo": st.column_config.TextColumn("🏷️ Tipo"),
                 "direccion": st.column_config.TextColumn("📍 Dirección", width="large"),
                 "telefono": st.column_config.TextColumn("📞 Teléfono"),
@@ -393,46 +499,42 @@ if st.session_state.scraped_data:
         
         with col_chart1:
             # Gráfico de tipos de negocio
-            if 'tipo' in df.columns:
-                tipo_counts = df[df['tipo'] != 'No disponible']['tipo'].value_counts().head(15)
-                if not tipo_counts.empty:
-                    fig = px.bar(
-                        x=tipo_counts.values,
-                        y=tipo_counts.index,
-                        orientation='h',
-                        title="🏪 Top 15 Tipos de Negocio",
-                        labels={'x': 'Cantidad', 'y': 'Tipo de Negocio'},
-                        color=tipo_counts.values,
-                        color_continuous_scale="viridis"
-                    )
-                    fig.update_layout(height=500, showlegend=False, font=dict(size=12))
-                    st.plotly_chart(fig, use_container_width=True)
+            tipo_counts = summary['tipos']
+            if tipo_counts:
+                tipos, cantidades = zip(*tipo_counts)
+                fig = px.bar(
+                    x=cantidades,
+                    y=tipos,
+                    orientation='h',
+                    title="🏪 Top 15 Tipos de Negocio",
+                    labels={'x': 'Cantidad', 'y': 'Tipo de Negocio'},
+                    color=cantidades,
+                    color_continuous_scale="viridis"
+                )
+                fig.update_layout(height=500, showlegend=False, font=dict(size=12))
+                st.plotly_chart(fig, use_container_width=True)
         
         with col_chart2:
             # Gráfico de calificaciones
-            if 'calificacion' in df.columns:
-                ratings = df[df['calificacion'] != 'No disponible']['calificacion']
-                if not ratings.empty:
-                    try:
-                        ratings_numeric = pd.to_numeric(ratings, errors='coerce').dropna()
-                        if not ratings_numeric.empty:
-                            fig = px.histogram(
-                                ratings_numeric,
-                                title="⭐ Distribución de Calificaciones",
-                                labels={'value': 'Calificación', 'count': 'Cantidad'},
-                                nbins=20,
-                                color_discrete_sequence=['#667eea']
-                            )
-                            fig.update_layout(height=500, showlegend=False)
-                            st.plotly_chart(fig, use_container_width=True)
-                    except:
-                        st.info("No se pudieron procesar las calificaciones numéricamente")
+            rating_counts = summary['calificaciones']
+            if rating_counts:
+                calificaciones, cantidades = zip(*rating_counts)
+                fig = px.bar(
+                    x=calificaciones,
+                    y=cantidades,
+                    title="⭐ Distribución de Calificaciones",
+                    labels={'x': 'Calificación', 'y': 'Cantidad'},
+                    color_discrete_sequence=['#667eea']
+                )
+                fig.update_layout(height=500, showlegend=False)
+                st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
         st.markdown("### 🗂️ Historial Completo de Búsquedas")
         
-        if st.session_state.scraping_history:
-            history_df = pd.DataFrame(st.session_state.scraping_history)
+        history = summary['historial']
+        if history:
+            history_df = pd.DataFrame(history)
             
             # Métricas del historial
             col_h1, col_h2, col_h3 = st.columns(3)
@@ -471,14 +573,10 @@ if st.session_state.scraped_data:
         with col_export1:
             st.markdown("#### 📊 Exportaciones Rápidas")
             
-            # CSV completo
-            csv_buffer = BytesIO()
-            df.to_csv(csv_buffer, index=False, encoding='utf-8-sig')
-            csv_data = csv_buffer.getvalue()
-            
+            # Los archivos se generan al pulsar cada botón, no en cada recarga
             st.download_button(
                 label="📊 Descargar CSV Completo",
-                data=csv_data,
+                data=lazy_export(store),
                 file_name=f"negocios_completo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv",
                 use_container_width=True,
@@ -486,30 +584,20 @@ if st.session_state.scraped_data:
             )
             
             # Solo con teléfono
-            df_with_phone = df[df['telefono'] != 'No disponible']
-            if not df_with_phone.empty:
-                csv_phone_buffer = BytesIO()
-                df_with_phone.to_csv(csv_phone_buffer, index=False, encoding='utf-8-sig')
-                csv_phone_data = csv_phone_buffer.getvalue()
-                
+            if stats['con_telefono']:
                 st.download_button(
                     label="📞 Solo con Teléfono",
-                    data=csv_phone_data,
+                    data=lazy_export(store, has_phone=True),
                     file_name=f"negocios_con_telefono_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                     mime="text/csv",
                     use_container_width=True
                 )
             
             # Solo con website
-            df_with_website = df[df['website'] != 'No disponible']
-            if not df_with_website.empty:
-                csv_website_buffer = BytesIO()
-                df_with_website.to_csv(csv_website_buffer, index=False, encoding='utf-8-sig')
-                csv_website_data = csv_website_buffer.getvalue()
-                
+            if stats['con_website']:
                 st.download_button(
                     label="🌐 Solo con Website",
-                    data=csv_website_data,
+                    data=lazy_export(store, has_website=True),
                     file_name=f"negocios_con_website_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                     mime="text/csv",
                     use_container_width=True
@@ -518,24 +606,17 @@ if st.session_state.scraped_data:
         with col_export2:
             st.markdown("#### 📋 Exportaciones por Búsqueda")
             
-            if 'busqueda' in df.columns:
-                busquedas_disponibles = df['busqueda'].unique()
-                
-                for busqueda in busquedas_disponibles:
-                    df_busqueda = df[df['busqueda'] == busqueda]
-                    
-                    csv_busqueda_buffer = BytesIO()
-                    df_busqueda.to_csv(csv_busqueda_buffer, index=False, encoding='utf-8-sig')
-                    csv_busqueda_data = csv_busqueda_buffer.getvalue()
-                    
-                    st.download_button(
-                        label=f"📁 {busqueda} ({len(df_busqueda)} negocios)",
-                        data=csv_busqueda_data,
-                        file_name=f"negocios_{busqueda}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        use_container_width=True,
-                        key=f"download_{busqueda}"
-                    )
+            # Un negocio aparece en cada búsqueda que lo encontró
+            for search in summary['busquedas']:
+                busqueda = search['busqueda']
+                st.download_button(
+                    label=f"📁 {busqueda} ({search['negocios']} negocios)",
+                    data=lazy_export(store, busquedas=[busqueda]),
+                    file_name=f"negocios_{busqueda}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv",
+                    use_container_width=True,
+                    key=f"download_{busqueda}"
+                )
 
 # Footer
 st.markdown("---")
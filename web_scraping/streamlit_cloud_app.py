@@ -1,11 +1,13 @@
 import streamlit as st
 import pandas as pd
 import time
-from io import BytesIO
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
 import json
+from prospect_store import ProspectStore, COLUMNS
+from csv_ingest import ingest_csv
+from dashboard_data import dashboard_summary, filtered_table, lazy_export
 
 # Configuración de la página
 st.set_page_config(
@@ -72,9 +74,19 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Inicializar session state
-if 'uploaded_data' not in st.session_state:
-    st.session_state.uploaded_data = []
+# Inicializar session state: cada sesión analiza sus datos en una base de prospectos en memoria
+if 'store' not in st.session_state:
+    st.session_state.store = ProspectStore(':memory:')
+if 'loaded_files' not in st.session_state:
+    st.session_state.loaded_files = set()
+if 'ingest_reports' not in st.session_state:
+    st.session_state.ingest_reports = []
+if 'uploader_key' not in st.session_state:
+    st.session_state.uploader_key = 0
+store = st.session_state.store
+
+# Filas máximas de la tabla (las métricas y gráficos se calculan sobre todos los datos)
+MAX_TABLE_ROWS = 5000
 
 # Función para crear datos de ejemplo
 def create_sample_data():
@@ -120,7 +132,7 @@ def create_sample_data():
             'tipo': 'Cafetería',
             'direccion': 'Coyoacán, CDMX',
             'telefono': '55-2222-3333',
-            'website': 'No disponible',
+            'website': None,
             'busqueda': 'cafeterias_coyoacan',
             'fecha_extraccion': '2025-09-10 11:15:00'
         },
@@ -130,7 +142,7 @@ def create_sample_data():
             'num_reviews': '200',
             'tipo': 'Gimnasio',
             'direccion': 'Condesa, CDMX',
-            'telefono': 'No disponible',
+            'telefono': None,
             'website': 'https://fitnesspro.mx',
             'busqueda': 'gimnasios_condesa',
             'fecha_extraccion': '2025-09-10 11:20:00'
@@ -138,6 +150,18 @@ def create_sample_data():
     ]
     return sample_businesses
 
+def reset_data():
+    """Vacía la base de la sesión y el selector de archivos (para no volver a importarlos)"""
+    st.session_state.store.clear()
+    st.session_state.loaded_files = set()
+    st.session_state.ingest_reports = []
+    st.session_state.uploader_key += 1
+
+def load_sample_data():
+    """Sustituye los datos de la sesión por los de ejemplo"""
+    reset_data()
+    st.session_state.store.upsert_many(create_sample_data())
+
 # Sidebar
 st.sidebar.markdown("## ⚙️ Panel de Control")
 
@@ -160,66 +184,79 @@ st.markdown("## 📊 Cargar Datos")
 col_upload, col_sample = st.columns(2)
 
 with col_upload:
-    st.markdown("### 📁 Subir Archivo CSV")
-    uploaded_file = st.file_uploader(
-        "Sube tu archivo CSV con datos de negocios",
+    st.markdown("### 📁 Subir Archivos CSV")
+    uploaded_files = st.file_uploader(
+        "Sube uno o varios archivos CSV con datos de negocios",
         type=['csv'],
-        help="Archivo generado por tu scraper local"
+        accept_multiple_files=True,
+        help="Archivos generados por tu scraper local; los negocios repetidos se fusionan",
+        key=f"uploader_{st.session_state.uploader_key}"
     )
     
-    if uploaded_file is not None:
-        try:
-            df = pd.read_csv(uploaded_file)
-            st.session_state.uploaded_data = df.to_dict('records')
-            st.success(f"✅ Archivo cargado: {len(df)} negocios")
-        except Exception as e:
-            st.error(f"❌ Error al cargar archivo: {e}")
+    for uploaded_file in uploaded_files or []:
+        # Cada archivo se importa una sola vez (por bloques), no en cada recarga de la página
+        file_id = (uploaded_file.name, uploaded_file.size)
+        if file_id not in st.session_state.loaded_files:
+            try:
+                with st.spinner(f"Importando {uploaded_file.name}..."):
+                    report = ingest_csv(store, uploaded_file)
+                st.session_state.loaded_files.add(file_id)
+                st.session_state.ingest_reports.append(report)
+                st.success(
+                    f"✅ {uploaded_file.name}: {report['filas']} negocios "
+                    f"({report['nuevos']} nuevos, {report['actualizados']} ya existentes)"
+                )
+            except Exception as e:
+                st.error(f"❌ Error al cargar {uploaded_file.name}: {e}")
+    
+    if st.session_state.ingest_reports:
+        with st.expander("⚡ Velocidad de importación"):
+            st.dataframe(
+                pd.DataFrame(st.session_state.ingest_reports),
+                use_container_width=True,
+                hide_index=True
+            )
 
 with col_sample:
     st.markdown("### 🎯 Datos de Ejemplo")
-    if st.button("🚀 Cargar Datos de Muestra", use_container_width=True):
-        st.session_state.uploaded_data = create_sample_data()
-        st.success("✅ Datos de ejemplo cargados")
+    if st.button("🚀 Cargar Datos de Muestra", use_container_width=True, on_click=load_sample_data):
+        st.success("✅ Datos de ejemplo cargados (sustituyen a los datos anteriores)")
+    if len(store):
+        if st.button("🗑️ Limpiar datos", use_container_width=True, on_click=reset_data):
+            st.success("✅ Datos eliminados")
 
-# Mostrar análisis si hay datos
-if st.session_state.uploaded_data:
+# Mostrar análisis si hay datos (agregados memoizados por versión de los datos cargados)
+data_version = store.data_version()
+summary = dashboard_summary(store, data_version, top_tipos=10)
+stats = summary['stats']
+if stats['total']:
     st.markdown("---")
     st.markdown("## 📊 Dashboard de Análisis")
     
-    df = pd.DataFrame(st.session_state.uploaded_data)
-    
     # Métricas principales
+    total = stats['total']
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        st.metric("🏪 Total Negocios", len(df))
+        st.metric("🏪 Total Negocios", total)
     
     with col2:
-        with_phone = (df['telefono'] != 'No disponible').sum() if 'telefono' in df.columns else 0
-        phone_percentage = (with_phone / len(df)) * 100 if len(df) > 0 else 0
+        with_phone = stats['con_telefono']
+        phone_percentage = (with_phone / total) * 100
         st.metric("📞 Con Teléfono", with_phone, delta=f"{phone_percentage:.1f}%")
     
     with col3:
-        with_website = (df['website'] != 'No disponible').sum() if 'website' in df.columns else 0
-        website_percentage = (with_website / len(df)) * 100 if len(df) > 0 else 0
+        with_website = stats['con_website']
+        website_percentage = (with_website / total) * 100
         st.metric("🌐 Con Website", with_website, delta=f"{website_percentage:.1f}%")
     
     with col4:
-        with_rating = (df['calificacion'] != 'No disponible').sum() if 'calificacion' in df.columns else 0
-        rating_percentage = (with_rating / len(df)) * 100 if len(df) > 0 else 0
+        with_rating = stats['con_calificacion']
+        rating_percentage = (with_rating / total) * 100
         st.metric("⭐ Con Calificación", with_rating, delta=f"{rating_percentage:.1f}%")
     
     with col5:
-        avg_rating = None
-        if 'calificacion' in df.columns:
-            try:
-                ratings = df[df['calificacion'] != 'No disponible']['calificacion']
-                ratings_numeric = pd.to_numeric(ratings, errors='coerce').dropna()
-                if not ratings_numeric.empty:
-                    avg_rating = ratings_numeric.mean()
-            except:
-                avg_rating = None
-        
+        avg_rating = stats['calificacion_promedio']
         if avg_rating:
             st.metric("📊 Promedio", f"{avg_rating:.1f} ⭐")
         else:
@@ -237,16 +274,19 @@ if st.session_state.uploaded_data:
         st.markdown("### 📋 Datos de Negocios")
         
         # Filtros
-        if 'busqueda' in df.columns:
-            busquedas_unicas = df['busqueda'].unique()
+        busquedas_unicas = [search['busqueda'] for search in summary['busquedas']]
+        filtro_busqueda = None
+        if busquedas_unicas:
             filtro_busqueda = st.multiselect(
                 "🔍 Filtrar por búsqueda:",
                 busquedas_unicas,
-                default=list(busquedas_unicas)
+                default=busquedas_unicas
             )
-            df_filtered = df[df['busqueda'].isin(filtro_busqueda)] if filtro_busqueda else df
-        else:
-            df_filtered = df
+        # Sin búsquedas elegidas la tabla queda vacía; solo se cargan las primeras MAX_TABLE_ROWS
+        filtered_count, df_filtered = filtered_table(store, data_version, {'busquedas': filtro_busqueda},
+                                                     'primera_extraccion', False, MAX_TABLE_ROWS)
+        if filtered_count > len(df_filtered):
+            st.info(f"📊 Mostrando los primeros {len(df_filtered)} de {filtered_count} negocios")
         
         # Mostrar tabla
         st.dataframe(
@@ -256,7 +296,7 @@ if st.session_state.uploaded_data:
             column_config={
                 "nombre": st.column_config.TextColumn("🏪 Nombre", width="large"),
                 "calificacion": st.column_config.NumberColumn("⭐ Calificación", format="%.1f"),
-                "num_reviews": st.column_config.TextColumn("📝 Reviews"),
+                "num_reviews": st.column_config.NumberColumn("📝 Reviews"),
                 "tipo": st.column_config.TextColumn("🏷️ Tipo"),
                 "direccion": st.column_config.TextColumn("📍 Dirección", width="large"),
                 "telefono": st.column_config.TextColumn("📞 Teléfono"),
@@ -273,53 +313,48 @@ if st.session_state.uploaded_data:
         
         with col_chart1:
             # Gráfico de tipos de negocio
-            if 'tipo' in df.columns:
-                tipo_counts = df[df['tipo'] != 'No disponible']['tipo'].value_counts().head(10)
-                if not tipo_counts.empty:
-                    fig = px.bar(
-                        x=tipo_counts.values,
-                        y=tipo_counts.index,
-                        orientation='h',
-                        title="🏪 Tipos de Negocio",
-                        labels={'x': 'Cantidad', 'y': 'Tipo'},
-                        color=tipo_counts.values,
-                        color_continuous_scale="viridis"
-                    )
-                    fig.update_layout(height=400, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
+            tipo_counts = summary['tipos']
+            if tipo_counts:
+                tipos, cantidades = zip(*tipo_counts)
+                fig = px.bar(
+                    x=cantidades,
+                    y=tipos,
+                    orientation='h',
+                    title="🏪 Tipos de Negocio",
+                    labels={'x': 'Cantidad', 'y': 'Tipo'},
+                    color=cantidades,
+                    color_continuous_scale="viridis"
+                )
+                fig.update_layout(height=400, showlegend=False)
+                st.plotly_chart(fig, use_container_width=True)
         
         with col_chart2:
             # Gráfico de calificaciones
-            if 'calificacion' in df.columns:
-                ratings = df[df['calificacion'] != 'No disponible']['calificacion']
-                if not ratings.empty:
-                    try:
-                        ratings_numeric = pd.to_numeric(ratings, errors='coerce').dropna()
-                        if not ratings_numeric.empty:
-                            fig = px.histogram(
-                                ratings_numeric,
-                                title="⭐ Distribución de Calificaciones",
-                                labels={'value': 'Calificación', 'count': 'Cantidad'},
-                                color_discrete_sequence=['#667eea']
-                            )
-                            fig.update_layout(height=400, showlegend=False)
-                            st.plotly_chart(fig, use_container_width=True)
-                    except:
-                        st.info("No se pudieron procesar las calificaciones")
+            rating_counts = summary['calificaciones']
+            if rating_counts:
+                calificaciones, cantidades = zip(*rating_counts)
+                fig = px.bar(
+                    x=calificaciones,
+                    y=cantidades,
+                    title="⭐ Distribución de Calificaciones",
+                    labels={'x': 'Calificación', 'y': 'Cantidad'},
+                    color_discrete_sequence=['#667eea']
+                )
+                fig.update_layout(height=400, showlegend=False)
+                st.plotly_chart(fig, use_container_width=True)
         
         # Análisis de completitud
         st.markdown("### 📊 Completitud de Datos")
         completeness_data = []
-        for col in ['nombre', 'telefono', 'website', 'direccion', 'calificacion', 'tipo']:
-            if col in df.columns:
-                available = (df[col] != 'No disponible').sum()
-                percentage = (available / len(df)) * 100
-                completeness_data.append({
-                    'Campo': col.title(),
-                    'Disponible': available,
-                    'Total': len(df),
-                    'Porcentaje': percentage
-                })
+        for col, key in [('nombre', 'con_nombre'), ('telefono', 'con_telefono'), ('website', 'con_website'),
+                         ('direccion', 'con_direccion'), ('calificacion', 'con_calificacion'), ('tipo', 'con_tipo')]:
+            available = stats[key]
+            completeness_data.append({
+                'Campo': col.title(),
+                'Disponible': available,
+                'Total': total,
+                'Porcentaje': (available / total) * 100
+            })
         
         if completeness_data:
             completeness_df = pd.DataFrame(completeness_data)
@@ -342,16 +377,13 @@ if st.session_state.uploaded_data:
         
         with col_info1:
             st.markdown("**📊 Estadísticas Generales:**")
-            st.write(f"• Total de registros: {len(df)}")
-            st.write(f"• Columnas disponibles: {len(df.columns)}")
-            
-            if 'busqueda' in df.columns:
-                unique_searches = df['busqueda'].nunique()
-                st.write(f"• Búsquedas únicas: {unique_searches}")
+            st.write(f"• Total de registros: {total}")
+            st.write(f"• Columnas disponibles: {len(COLUMNS)}")
+            st.write(f"• Búsquedas únicas: {len(busquedas_unicas)}")
         
         with col_info2:
             st.markdown("**🔍 Campos del Dataset:**")
-            for col in df.columns:
+            for col in COLUMNS:
                 st.write(f"• {col}")
     
     with tab4:
@@ -359,15 +391,12 @@ if st.session_state.uploaded_data:
         
         col_exp1, col_exp2 = st.columns(2)
         
+        # Los archivos se generan al pulsar cada botón, no en cada recarga
         with col_exp1:
             # CSV completo
-            csv_buffer = BytesIO()
-            df.to_csv(csv_buffer, index=False, encoding='utf-8-sig')
-            csv_data = csv_buffer.getvalue()
-            
             st.download_button(
                 label="📊 Descargar CSV Completo",
-                data=csv_data,
+                data=lazy_export(store),
                 file_name=f"analisis_negocios_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv",
                 use_container_width=True,
@@ -376,11 +405,9 @@ if st.session_state.uploaded_data:
         
         with col_exp2:
             # JSON export
-            json_data = df.to_json(orient='records', force_ascii=False, indent=2)
-            
             st.download_button(
                 label="📄 Descargar JSON",
-                data=json_data,
+                data=lazy_export(store, '.json'),
                 file_name=f"analisis_negocios_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json",
                 use_container_width=True
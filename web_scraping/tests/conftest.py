@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del scraper se importan como módulos sueltos (from place_urls import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,94 @@
+import pickle
+
+import pytest
+
+from business_record import (
+    FIELDS, BusinessRecord, clean_text, normalize_phone, parse_rating, parse_reviews, to_frame
+)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('55 1234 5678', '+525512345678'),
+    ('(55) 1234-5678', '+525512345678'),
+    ('+52 55 1234 5678', '+525512345678'),
+    ('0052 55 1234 5678', '+525512345678'),
+    ('01 55 1234 5678', '+525512345678'),
+    ('044 55 1234 5678', '+525512345678'),
+    ('52 55 1234 5678', '+525512345678'),
+    ('+1 (212) 555-0100', '+12125550100'),
+    ('123', None),
+    ('No disponible', None),
+    ('', None),
+    (None, None),
+])
+def test_normalize_phone(value, expected):
+    assert normalize_phone(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('4,5', 4.5),
+    ('4.5 estrellas', 4.5),
+    (4, 4.0),
+    ('5', 5.0),
+    ('7', None),
+    ('No disponible', None),
+    (None, None),
+])
+def test_parse_rating(value, expected):
+    assert parse_rating(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('(1.234)', 1234),
+    ('1,234', 1234),
+    ('1 234 reseñas', 1234),
+    ('1,2 mil', 1200),
+    ('3.4K', 3400),
+    (87, 87),
+    ('sin reseñas', None),
+])
+def test_parse_reviews(value, expected):
+    assert parse_reviews(value) == expected
+
+
+def test_clean_text():
+    assert clean_text('  Café \n Central ') == 'Café Central'
+    assert clean_text('No disponible') is None
+    assert clean_text(float('nan')) is None
+
+
+def test_from_dict_normalizes_legacy_rows():
+    record = BusinessRecord.from_dict({
+        'indice': '3', 'nombre': 'Café', 'calificacion': '4,5', 'num_reviews': '(1.234)',
+        'telefono': '55 1234 5678', 'website': 'No disponible', 'email': 'Hola@Cafe.MX',
+        'columna_extra': 'x',
+    }, busqueda='cafes')
+    assert record.indice == 3
+    assert (record.calificacion, record.num_reviews) == (4.5, 1234)
+    assert record.telefono == '+525512345678'
+    assert record.website is None
+    assert record.email == 'hola@cafe.mx'
+    assert record.busqueda == 'cafes'
+
+
+def test_dict_interface():
+    record = BusinessRecord(nombre='Café')
+    assert record['nombre'] == 'Café'
+    assert record.get('telefono', 'sin teléfono') == 'sin teléfono'
+    assert record.get('no_existe') is None
+    assert list(dict(record)) == list(FIELDS)
+    record['telefono'] = '+525512345678'
+    assert record.to_dict()['telefono'] == '+525512345678'
+    with pytest.raises(KeyError):
+        record['no_existe'] = 1
+    assert BusinessRecord.coerce(record) is record
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_to_frame_dtypes():
+    pytest.importorskip('pandas')
+    df = to_frame([BusinessRecord(nombre='A', calificacion=4.5, tipo='Café'), {'nombre': 'B', 'num_reviews': '12'}])
+    assert str(df['calificacion'].dtype) == 'Float64'
+    assert str(df['num_reviews'].dtype) == 'Int64'
+    assert str(df['tipo'].dtype) == 'category'
+    assert df['calificacion'].isna().tolist() == [False, True]
@@ -0,0 +1,59 @@
+import json
+
+from checkpoint import RunJournal
+
+
+def make_journal(path):
+    journal = RunJournal(str(path))
+    journal.record_search('https://www.google.com/maps/search/dentistas', 5)
+    journal.add_frontier(['u1', 'u2', 'u3'])
+    journal.record_business('u1', {'nombre': 'Uno'})
+    return journal
+
+
+def test_replay_ignores_a_truncated_last_line(tmp_path):
+    path = tmp_path / 'dentistas.jsonl'
+    make_journal(path).close()
+    # Corte a mitad de escritura: la última línea queda sin terminar
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'tipo': 'negocio', 'url': 'u2', 'datos': {'nombre': 'Dos'}})[:20])
+
+    journal = RunJournal(str(path))
+    assert journal.frontier == ['u1', 'u2', 'u3']
+    assert list(journal.completed) == ['u1']
+    assert journal.has_progress and not journal.finished
+    # La siguiente escritura empieza en su propia línea y sobrevive a otra recarga
+    journal.record_business('u2', {'nombre': 'Dos'})
+    journal.close()
+    assert list(RunJournal(str(path)).completed) == ['u1', 'u2']
+
+
+def test_finished_survives_reload(tmp_path):
+    path = tmp_path / 'dentistas.jsonl'
+    journal = make_journal(path)
+    journal.mark_finished()
+    journal.mark_finished()
+    journal.close()
+    assert RunJournal(str(path)).finished
+    assert path.read_text(encoding='utf-8').count('"fin"') == 1
+
+
+def test_discard_removes_the_file(tmp_path):
+    path = tmp_path / 'checkpoints' / 'dentistas.jsonl'
+    journal = make_journal(path)
+    journal.discard()
+    assert not path.exists()
+    journal.discard()  # ya no existe: no falla
+    assert not RunJournal(str(path)).has_progress
+
+
+def test_new_url_starts_over(tmp_path):
+    path = tmp_path / 'dentistas.jsonl'
+    journal = make_journal(path)
+    journal.record_search('https://www.google.com/maps/search/clinicas', 5)
+    assert not journal.has_progress
+    journal.add_frontier(['v1'])
+    journal.close()
+    journal = RunJournal(str(path))
+    assert journal.search_url.endswith('clinicas')
+    assert (journal.frontier, journal.completed) == (['v1'], {})
@@ -0,0 +1,82 @@
+import csv
+import io
+
+import pytest
+
+import csv_ingest
+from prospect_store import ProspectStore
+
+HEADER = ['nombre', 'calificacion', 'num_reviews', 'tipo', 'direccion', 'telefono', 'busqueda', 'notas']
+
+
+@pytest.fixture(params=['pyarrow', 'csv'])
+def reader(request, monkeypatch):
+    """Ejecuta cada prueba con el lector de pyarrow y con csv.DictReader"""
+    if request.param == 'pyarrow':
+        pytest.importorskip('pyarrow.csv')
+    else:
+        monkeypatch.setattr(csv_ingest, 'pa_csv', None)
+    return request.param
+
+
+@pytest.fixture
+def store():
+    store = ProspectStore(':memory:')
+    yield store
+    store.close()
+
+
+def make_csv(path, rows):
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def row(i, busqueda='dentistas'):
+    return [f'Negocio {i}', '4,5' if i % 2 else 'No disponible', '(1.234)', 'Dentista', f'Calle {i}',
+            '+52 55 1234 5678' if i % 3 else '', busqueda, '']
+
+
+def test_batches_are_bounded(reader, tmp_path):
+    path = make_csv(tmp_path / 'a.csv', [row(i) for i in range(120)])
+    with open(path, 'rb') as f:
+        batches = list(csv_ingest.csv_batches(f, batch_size=50))
+    assert [len(batch) for batch in batches] == [50, 50, 20]
+    first = batches[0][0]
+    # Todo llega como texto; 'No disponible' y vacío son datos que faltan
+    assert first['nombre'] == 'Negocio 0'
+    assert first['calificacion'] in (None, 'No disponible')
+    assert batches[0][1]['telefono'] == '+52 55 1234 5678'
+
+
+def test_ingest_normalizes_and_reports(reader, store, tmp_path):
+    path = make_csv(tmp_path / 'a.csv', [row(i) for i in range(30)] + [['', '', '', '', '', '', '', '']])
+    report = csv_ingest.ingest_csv(store, path, batch_size=10)
+    assert (report['filas'], report['nuevos'], report['actualizados'], report['bloques']) == (31, 30, 0, 4)
+    assert report['bytes'] > 0 and report['filas_por_segundo'] > 0
+    (negocio,) = store.query(text='Negocio 1', limit=1)
+    assert (negocio['calificacion'], negocio['telefono']) == (4.5, '+525512345678')
+    assert store.stats()['con_telefono'] == 20
+
+
+def test_multiple_uploads_merge_duplicates(reader, store, tmp_path):
+    first = make_csv(tmp_path / 'a.csv', [row(i) for i in range(10)])
+    second = make_csv(tmp_path / 'b.csv', [row(i, busqueda='clinicas') for i in range(5, 15)])
+    csv_ingest.ingest_csv(store, first)
+    report = csv_ingest.ingest_csv(store, second)
+    assert (report['nuevos'], report['actualizados']) == (5, 5)
+    assert len(store) == 15
+    assert store.count(busquedas=['dentistas']) == 10
+    assert store.count(busquedas=['clinicas']) == 10
+
+
+def test_file_like_upload_and_default_search(reader, store, tmp_path):
+    path = make_csv(tmp_path / 'a.csv', [row(i, busqueda='') for i in range(4)])
+    upload = io.BytesIO(open(path, 'rb').read())
+    upload.name = 'subido.csv'
+    report = csv_ingest.ingest_csv(store, upload, busqueda='importado')
+    assert report['archivo'] == 'subido.csv'
+    assert not upload.closed
+    assert store.count(busquedas=['importado']) == 4
@@ -0,0 +1,72 @@
+import json
+import re
+from urllib.error import HTTPError
+from urllib.parse import urljoin
+from urllib.request import urlopen
+
+import pytest
+
+from business_record import normalize_phone, parse_rating
+from mock_maps_server import MockMapsServer, generate_places, place_path
+from place_parser import SnapshotParser, parse_place_page, save_snapshot
+from place_urls import is_maps_url, place_key
+
+pytest.importorskip('selectolax')
+
+
+@pytest.fixture(scope='module')
+def server():
+    with MockMapsServer(places=generate_places(20, seed=7), first_page=7, page_size=8) as server:
+        yield server
+
+
+def get(server, path_or_url):
+    with urlopen(urljoin(server.base_url, path_or_url), timeout=5) as response:
+        return response.read().decode('utf-8')
+
+
+def place_links(html):
+    return re.findall(r'href="([^"]*/maps/place/[^"]*)"', html)
+
+
+def test_feed_pages_cover_every_place_once(server):
+    links = place_links(get(server, server.search_url('dentistas')))
+    offset, end = len(links), False
+    while not end:
+        page = json.loads(get(server, f"/api/feed?offset={offset}"))
+        links += place_links(page['html'])
+        offset, end = page['next'], page['end']
+    keys = [place_key(link.replace('&amp;', '&')) for link in links]
+    assert len(keys) == len(set(keys)) == len(server.places)
+    assert set(keys) == set(server.by_feature_id)
+    assert is_maps_url(urljoin(server.base_url, links[0]), extra_hosts=(server.host,))
+
+
+def test_place_pages_parse_like_the_source_data(server):
+    for place in server.places:
+        url = urljoin(server.base_url, place_path(place))
+        record, matched = parse_place_page(get(server, url), url, index=0)
+        assert record.nombre == place['nombre']
+        assert record.tipo == place['tipo']
+        assert record.telefono == normalize_phone(place['telefono'])
+        assert record.calificacion == parse_rating(place['calificacion'])
+        assert record.website == place['website']
+        assert matched['nombre'] is not None
+
+
+def test_unknown_place_is_404(server):
+    with pytest.raises(HTTPError) as error:
+        get(server, "/maps/place/x/data=!1s0x0:0x0")
+    assert error.value.code == 404
+
+
+def test_snapshots_reparse_offline(server, tmp_path):
+    for place in server.places[:5]:
+        url = urljoin(server.base_url, place_path(place))
+        save_snapshot(str(tmp_path), url, get(server, url))
+    parser = SnapshotParser(workers=2)
+    try:
+        records = parser.parse_directory(str(tmp_path))
+    finally:
+        parser.close()
+    assert sorted(record.nombre for record in records) == sorted(place['nombre'] for place in server.places[:5])
@@ -0,0 +1,101 @@
+import csv
+import json
+
+import pytest
+
+from business_record import BusinessRecord
+from output_writers import CompletenessSummary, open_writer
+
+ROWS = [
+    {'nombre': 'Café Central', 'calificacion': 4.5, 'telefono': '+525512345678', 'tipo': 'Cafetería'},
+    {'nombre': 'Taller Díaz', 'calificacion': None, 'telefono': '', 'tipo': 'Taller'},
+    {'nombre': 'Dental Sur', 'calificacion': 3.9, 'telefono': 'No disponible', 'tipo': None},
+]
+
+
+def write(path, rows=ROWS, **kwargs):
+    with open_writer(str(path), **kwargs) as writer:
+        writer.write_many(rows)
+    return writer
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_round_trip_and_rewrite(tmp_path):
+    path = tmp_path / 'negocios.csv'
+    write(path)
+    write(path)
+    rows = read_csv(path)
+    assert [row['nombre'] for row in rows] == ['Café Central', 'Taller Díaz', 'Dental Sur']
+    assert rows[0]['calificacion'] == '4.5'
+
+
+def test_csv_append_keeps_a_single_header(tmp_path):
+    path = tmp_path / 'negocios.csv'
+    write(path, ROWS[:1])
+    write(path, ROWS[1:], append=True)
+    assert open(path, 'rb').read().count(b'\xef\xbb\xbf') == 1
+    assert [row['nombre'] for row in read_csv(path)] == ['Café Central', 'Taller Díaz', 'Dental Sur']
+
+
+def test_csv_without_rows_still_has_header(tmp_path):
+    path = tmp_path / 'vacio.csv'
+    write(path, [], columns=['nombre', 'telefono'])
+    assert open(path, encoding='utf-8-sig').read().strip() == 'nombre,telefono'
+
+
+def test_jsonl_rewrites_by_default_and_appends_on_request(tmp_path):
+    path = tmp_path / 'negocios.jsonl'
+    write(path)
+    write(path)
+    assert len(path.read_text(encoding='utf-8').splitlines()) == len(ROWS)
+    write(path, append=True)
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 2 * len(ROWS)
+    assert json.loads(lines[0])['nombre'] == 'Café Central'
+
+
+def test_json_array_round_trip(tmp_path):
+    path = tmp_path / 'negocios.json'
+    write(path, [BusinessRecord(nombre='Café', calificacion=4.5)] + ROWS[1:])
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert [row['nombre'] for row in data] == ['Café', 'Taller Díaz', 'Dental Sur']
+    write(path, [])
+    assert json.loads(path.read_text(encoding='utf-8')) == []
+
+
+def test_parquet_row_groups_and_types(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'negocios.parquet'
+    rows = [dict(ROWS[i % 3], indice=i) for i in range(25)]
+    write(path, rows, columns=['indice', 'nombre', 'calificacion', 'tipo'], row_group_size=10)
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_rows == 25
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert str(table.schema.field('calificacion').type) == 'double'
+    assert str(table.schema.field('tipo').type).startswith('dictionary')
+
+
+def test_unknown_extension_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_writer(str(tmp_path / 'negocios.xlsx'))
+
+
+def test_closed_writer_rejects_rows(tmp_path):
+    writer = write(tmp_path / 'negocios.csv')
+    with pytest.raises(ValueError):
+        writer.write(ROWS[0])
+
+
+def test_completeness_counts_missing_markers():
+    summary = CompletenessSummary()
+    for row in ROWS:
+        summary.add(row)
+    stats = summary.as_dict()
+    assert stats['nombre']['disponibles'] == 3
+    assert stats['telefono'] == {'disponibles': 1, 'total': 3, 'porcentaje': 33.3}
+    assert stats['calificacion']['disponibles'] == 2
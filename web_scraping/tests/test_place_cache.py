@@ -0,0 +1,62 @@
+import pytest
+
+import place_cache
+from place_cache import PlaceCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(place_cache.time, 'time', clock)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs):
+    return PlaceCache(str(tmp_path / 'place_cache.sqlite'), **kwargs)
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_days=1)
+    cache.put('0x1:0x1', {'nombre': 'Café'})
+    clock.now += 86400 - 1
+    assert cache.get('0x1:0x1') == {'nombre': 'Café'}
+    clock.now += 2
+    assert cache.get('0x1:0x1') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+    # Al abrirla de nuevo se purgan las caducadas
+    cache = make_cache(tmp_path, ttl_days=1)
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_least_recently_used_is_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=3)
+    for i in range(3):
+        clock.now += 1
+        cache.put(f'0x{i}:0x1', {'indice': i})
+    # Leer la más antigua la vuelve la más reciente
+    clock.now += 1
+    assert cache.get('0x0:0x1') == {'indice': 0}
+    clock.now += 1
+    cache.put('0x3:0x1', {'indice': 3})
+    assert len(cache) == 3
+    assert cache.get('0x1:0x1') is None
+    assert cache.get('0x0:0x1') is not None
+    cache.close()
+
+
+def test_empty_place_id_is_ignored(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put('', {'nombre': 'Café'})
+    assert cache.get(None) is None
+    assert len(cache) == 0 and cache.misses == 0
+    cache.close()
@@ -0,0 +1,40 @@
+from place_urls import DedupIndex, extract_place_id, is_maps_url, place_key
+
+FEATURE_URL = ("https://www.google.com/maps/place/Caf%C3%A9+Central/@19.43,-99.13,17z/"
+               "data=!3m1!4b1!4m6!3m5!1s0x85d1f92b:0xABCDEF12!8m2!3d19.43!4d-99.13?entry=ttu")
+
+
+def test_feature_id_ignores_coordinates_and_parameters():
+    moved = FEATURE_URL.replace('@19.43,-99.13,17z', '@19.50,-99.20,12z').replace('?entry=ttu', '?hl=es')
+    assert place_key(FEATURE_URL) == '0x85d1f92b:0xabcdef12'
+    assert place_key(moved) == place_key(FEATURE_URL)
+
+
+def test_identifier_fallbacks():
+    assert extract_place_id("https://maps.google.com/?cid=123456") == 'cid:123456'
+    assert extract_place_id("https://www.google.com/maps/place/x?ftid=0xAB:0xCD") == '0xab:0xcd'
+    assert extract_place_id("https://www.google.com/maps/place/x/data=!19sChIJabc-123") == 'ChIJabc-123'
+    assert extract_place_id(None) is None
+
+
+def test_name_key_when_url_has_no_identifier():
+    url = "https://www.google.com/maps/place/Caf%C3%A9+Central/@19.43,-99.13,17z"
+    assert place_key(url) == 'nombre:café central'
+    assert place_key("https://example.com/otra") == "https://example.com/otra"
+
+
+def test_is_maps_url_accepts_extra_hosts():
+    assert is_maps_url(FEATURE_URL)
+    assert not is_maps_url("http://127.0.0.1:8765/maps/place/x")
+    assert is_maps_url("http://127.0.0.1:8765/maps/place/x", extra_hosts=('127.0.0.1',))
+    assert not is_maps_url('')
+
+
+def test_dedup_index_counts_other_urls_of_the_same_place():
+    index = DedupIndex()
+    assert index.add(FEATURE_URL, stage='scroll')
+    # El mismo href al re-escanear el listado no es un duplicado
+    assert not index.add(FEATURE_URL, stage='scroll')
+    assert not index.add(FEATURE_URL.replace('17z', '15z'), stage='scroll')
+    assert FEATURE_URL in index
+    assert index.stats() == {'unicos': 1, 'duplicados': {'scroll': 1}}
@@ -0,0 +1,118 @@
+import csv
+import json
+
+import pytest
+
+from business_record import BusinessRecord
+from prospect_store import COLUMNS, ProspectStore
+
+FECHA = '2025-09-10 10:00:00'
+
+
+@pytest.fixture(params=['memoria', 'archivo'])
+def store(request, tmp_path):
+    path = ':memory:' if request.param == 'memoria' else str(tmp_path / 'prospectos.sqlite')
+    store = ProspectStore(path)
+    yield store
+    store.close()
+
+
+def business(i, **fields):
+    data = {'place_key': f'0x{i:04x}:0x1', 'nombre': f'Negocio {i}', 'busqueda': 'dentistas',
+            'fecha_extraccion': FECHA}
+    data.update(fields)
+    return data
+
+
+def test_upsert_keeps_known_values(store):
+    assert store.upsert_many([business(1, telefono='55 1234 5678', calificacion='4,5')]) == (1, 0)
+    # La nueva extracción no trae teléfono: se conserva el anterior
+    assert store.upsert_many([business(1, telefono='No disponible', website='https://a.mx',
+                                       busqueda='clinicas')]) == (0, 1)
+    (row,) = store.query()
+    assert row['telefono'] == '+525512345678'
+    assert row['calificacion'] == 4.5
+    assert row['website'] == 'https://a.mx'
+    assert store.count(has_phone=True, has_website=True) == 1
+    # Aparece en las dos búsquedas
+    assert store.count(busquedas=['dentistas']) == store.count(busquedas=['clinicas']) == 1
+
+
+def test_upsert_many_counts_new_and_updated(store):
+    store.upsert_many([business(i) for i in range(0, 1200, 2)])
+    # Más claves que una sola consulta IN y una clave repetida dentro del mismo bloque
+    batch = [business(i) for i in range(1200)] + [business(1)]
+    assert store.upsert_many(batch) == (600, 601)
+    assert len(store) == 1200
+
+
+def test_records_without_place_key_merge_by_name_and_address(store):
+    store.upsert(BusinessRecord(nombre='Café Central', direccion='Av. Juárez 1'))
+    store.upsert({'nombre': 'café central', 'direccion': 'AV. JUÁREZ 1', 'telefono': '5512345678'})
+    store.upsert({'telefono': '5512345678'})  # sin nombre ni place_key: se descarta
+    assert len(store) == 1
+    assert store.query()[0]['telefono'] == '+525512345678'
+
+
+def test_filters_and_stats(store):
+    store.upsert_many([
+        business(1, calificacion=4.8, tipo='Dentista', telefono='5512345678'),
+        business(2, calificacion=3.2, tipo='Dentista'),
+        business(3, tipo='Clínica', website='https://c.mx', busqueda='clinicas'),
+    ])
+    assert store.count(min_rating=4.0) == 1
+    assert store.count(tipos=['Dentista']) == 2
+    assert store.count(text='negocio 3') == 1
+    stats = store.stats()
+    assert (stats['total'], stats['con_telefono'], stats['con_website'], stats['con_calificacion']) == (3, 1, 1, 2)
+    assert store.tipo_counts() == [('Dentista', 2), ('Clínica', 1)]
+    with pytest.raises(ValueError):
+        store.query(order_by='telefono')
+
+
+def test_iter_query_streams_every_row_once(store):
+    # Todas con la misma fecha: el orden solo lo decide el desempate por place_key
+    store.upsert_many([business(i) for i in range(2500)])
+    keys = [row['place_key'] for row in store.iter_query(batch_size=300, order_by='primera_extraccion')]
+    assert len(keys) == len(set(keys)) == 2500
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_export_round_trip(store, tmp_path):
+    store.upsert_many([business(i, calificacion=4.0 + i / 10) for i in range(5)])
+    for _ in range(2):
+        assert store.export(str(tmp_path / 'p.csv'), has_phone=False) == 5
+        assert store.export(str(tmp_path / 'p.jsonl')) == 5
+    with open(tmp_path / 'p.csv', encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == COLUMNS
+    assert sorted(float(row['calificacion']) for row in rows) == [4.0, 4.1, 4.2, 4.3, 4.4]
+    lines = (tmp_path / 'p.jsonl').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 5 and json.loads(lines[0])['busqueda'] == 'dentistas'
+
+
+def test_data_version_changes_on_writes(store):
+    version = store.data_version()
+    assert store.data_version() == version
+    store.upsert(business(1))
+    after_upsert = store.data_version()
+    assert after_upsert != version
+    store.clear()
+    assert store.data_version() != after_upsert
+    assert len(store) == 0
+
+
+def test_delete_search_keeps_prospects_seen_elsewhere(store):
+    store.upsert_many([business(1), business(2)])
+    store.upsert(business(2, busqueda='clinicas'))
+    store.record_search('dentistas', resultados=2)
+    store.delete_search('dentistas')
+    assert [row['place_key'] for row in store.query()] == ['0x0002:0x1']
+    assert store.history() == []
+
+
+def test_empty_search_filter_matches_nothing(store):
+    store.upsert_many([business(1), business(2, busqueda='clinicas')])
+    assert store.count(busquedas=[]) == 0
+    assert store.query(busquedas=[]) == []
+    assert store.count(busquedas=None) == 2
@@ -1,24 +1,108 @@
-import time
-import pandas as pd
+import asyncio
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 import re
 import os
+import logging
+from concurrent.futures import as_completed
+from datetime import datetime
+from waits import AdaptiveWaiter, PhaseTimer
+from instrumentation import get_metrics, set_metrics, Metrics, JsonLinesExporter
+from checkpoint import RunJournal
+from place_cache import PlaceCache
+from selector_stats import SelectorStats
+from place_urls import is_maps_url, extract_place_id, place_key, DedupIndex
+from place_parser import SnapshotParser, business_from_fields, save_snapshot
+from business_record import BusinessRecord
+from output_writers import open_writer
+from prospect_store import ProspectStore
+from page_scripts import (
+    PLACE_FIELDS, EXTRACT_PLACE_JS, LINK_SELECTORS, COLLECT_LINKS_JS,
+    FEED_SELECTORS, END_OF_LIST_SELECTORS, END_OF_LIST_TEXTS,
+    FEED_OBSERVER_INSTALL_JS, FEED_DRAIN_JS, FEED_PENDING_JS, FEED_SCROLL_JS, FEED_OBSERVER_STOP_JS,
+    PAGE_WEIGHT_JS
+)
+
+# Enlaces a fichas de negocio dentro del listado de resultados
+PLACE_LINK_SELECTOR = "a[href*='/maps/place/']"
+
+# Recursos que el modo ligero bloquea (Network.setBlockedURLs): solo se leen textos
+LEAN_BLOCKED_URLS = [
+    # Imágenes, fotos de los negocios y teselas del mapa
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*googleusercontent.com/*", "*ggpht.com/*", "*/maps/vt*", "*/kh/v=*", "*khms*.google.com/*",
+    # Fuentes
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.gstatic.com/*",
+    # Audio y vídeo
+    "*.mp4", "*.webm", "*.mp3", "*.m4a",
+    # Analítica y telemetría
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*", "*/gen_204*", "*/log?*",
+]
+
+log = logging.getLogger(__name__)
 
 class GoogleMapsScraper:
-    def __init__(self):
-        """Inicializa el scraper"""
+    def __init__(self, profile_dir=None, workers=1, timer=None, use_observer=False, cache=None,
+                 offline_parsing=False, snapshot_dir=None, extra_hosts=(), headless=False, metrics=None,
+                 selector_stats=None, lean=False):
+        """Inicializa el scraper
+
+        profile_dir: directorio de perfil de Chrome propio de esta instancia.
+        workers: número de navegadores en paralelo para extraer las páginas de detalle.
+        timer: PhaseTimer compartido (el pool lo comparte entre sus navegadores).
+        use_observer: detectar resultados nuevos con un MutationObserver en lugar de re-escanear el DOM.
+        cache: PlaceCache (o ruta a su archivo) consultada antes de navegar a cada negocio.
+        offline_parsing: capturar solo el HTML de cada negocio y analizarlo en un pool de procesos.
+        snapshot_dir: carpeta donde guardar el HTML capturado para re-extraerlo más tarde.
+        extra_hosts: hosts aceptados además de Google Maps (p. ej. el servidor local de pruebas).
+        headless: iniciar Chrome sin ventana.
+        metrics: registro de spans y contadores (por defecto el global de instrumentation).
+        selector_stats: SelectorStats (o ruta a su archivo) para probar primero los selectores que aciertan.
+        lean: modo ligero; Chrome sin ventana y sin cargar imágenes, fuentes, vídeo, teselas ni analítica.
+        """
         self.driver = None
         self.wait = None
+        self.waiter = None
+        self.timer = timer or PhaseTimer()
+        self.metrics = metrics or get_metrics()
+        self.profile_dir = profile_dir or os.path.join(os.getcwd(), "temp_chrome_profile")
+        self.workers = max(1, int(workers))
+        self.use_observer = use_observer
+        self.journal = None
+        self.cache = PlaceCache(cache) if isinstance(cache, str) else cache
+        self.selector_stats = SelectorStats(selector_stats) if isinstance(selector_stats, str) else selector_stats
+        self.dedup = DedupIndex()
+        self.offline_parsing = offline_parsing
+        self.snapshot_dir = snapshot_dir
+        self.extra_hosts = tuple(extra_hosts)
+        self.lean = lean
+        self.headless = headless or lean
+        self.parser = None
+        self.pool = None
+        self.cancel_event = None
         self.setup_driver()
     
     def setup_driver(self):
         """Configura el navegador Chrome con undetected_chromedriver"""
+        with self.metrics.span('setup_driver'):
+            self._start_chrome()
+            if self.lean:
+                self._block_heavy_resources()
+
+    def _block_heavy_resources(self):
+        """Modo ligero: bloquea por CDP las peticiones de recursos que no se leen"""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+            log.info("🪶 Modo ligero: imágenes, fuentes, vídeo, teselas y analítica bloqueados")
+        except Exception as e:
+            log.warning(f"⚠️ No se pudo activar el bloqueo de recursos: {e}")
+
+    def _start_chrome(self):
         options = uc.ChromeOptions()
         
         # Configuraciones estables
@@ -31,16 +115,20 @@ class GoogleMapsScraper:
         options.add_argument("--allow-running-insecure-content")
         options.add_argument("--no-first-run")
         options.add_argument("--disable-default-apps")
+        if self.headless:
+            options.add_argument("--headless=new")
+        if self.lean:
+            # Respaldo del bloqueo por CDP: Blink ni siquiera pide las imágenes
+            options.add_argument("--blink-settings=imagesEnabled=false")
         
         # User-Agent más realista
         options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
         
         try:
-            print("✅ Configurando Undetected ChromeDriver...")
+            log.info("✅ Configurando Undetected ChromeDriver...")
             
-            # Crear directorio temporal para datos del usuario
-            temp_user_data = os.path.join(os.getcwd(), "temp_chrome_profile")
-            options.add_argument(f"--user-data-dir={temp_user_data}")
+            # Directorio de perfil propio (cada navegador del pool usa uno distinto)
+            options.add_argument(f"--user-data-dir={self.profile_dir}")
             
             self.driver = uc.Chrome(
                 options=options,
@@ -50,11 +138,12 @@ class GoogleMapsScraper:
             )
             
             self.wait = WebDriverWait(self.driver, 25)
-            print("✅ Chrome iniciado correctamente")
+            self.waiter = AdaptiveWaiter(self.driver, self.timer, metrics=self.metrics)
+            log.info("✅ Chrome iniciado correctamente")
             
         except Exception as e:
-            print(f"❌ Error configurando Undetected ChromeDriver: {e}")
-            print("\n🔄 Intentando configuración alternativa...")
+            log.error(f"❌ Error configurando Undetected ChromeDriver: {e}")
+            log.info("\n🔄 Intentando configuración alternativa...")
             try:
                 options = uc.ChromeOptions()
                 options.add_argument("--no-sandbox")
@@ -63,18 +152,84 @@ class GoogleMapsScraper:
                 
                 self.driver = uc.Chrome(options=options)
                 self.wait = WebDriverWait(self.driver, 25)
-                print("✅ Chrome iniciado en modo alternativo")
+                self.waiter = AdaptiveWaiter(self.driver, self.timer, metrics=self.metrics)
+                log.info("✅ Chrome iniciado en modo alternativo")
                 
             except Exception as e2:
-                print(f"❌ Error en configuración alternativa: {e2}")
+                log.error(f"❌ Error en configuración alternativa: {e2}")
                 raise
 
-    def scroll_and_load_results(self, max_results=10):
-        """Hace scroll inteligente para cargar más resultados de Google Maps"""
-        print(f"🔄 Cargando hasta {max_results} resultados...")
-        
-        # Esperar un momento inicial para que cargue la página
-        time.sleep(3)
+    def configure(self, workers=None, use_observer=None, offline_parsing=None, snapshot_dir=None):
+        """Cambia las opciones de ejecución sin reiniciar el navegador (None = sin cambios)"""
+        if workers is not None and max(1, int(workers)) != self.workers:
+            # El pool se recrea con el nuevo tamaño al primer uso
+            if self.pool:
+                self.pool.close()
+                self.pool = None
+            self.workers = max(1, int(workers))
+        if use_observer is not None:
+            self.use_observer = use_observer
+        if offline_parsing is not None:
+            self.offline_parsing = offline_parsing
+        if snapshot_dir is not None:
+            self.snapshot_dir = snapshot_dir or None
+
+    def cancelled(self):
+        """True si se pidió cancelar la búsqueda en curso (evento `cancel` de iter_businesses)"""
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def is_alive(self):
+        """Verifica que el navegador siga respondiendo"""
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _store_business(self, url, data):
+        """Guarda un negocio recién extraído en el diario y en la caché de lugares"""
+        with self.metrics.span('save', destino='diario_cache'):
+            record = data.to_dict()
+            if self.journal:
+                self.journal.record_business(url, record)
+            if self.cache:
+                record.pop('indice')
+                self.cache.put(extract_place_id(url), record)
+
+    def _place_fields(self):
+        """PLACE_FIELDS con los selectores de cada campo en el orden aprendido"""
+        if self.selector_stats:
+            return self.selector_stats.ordered_fields(PLACE_FIELDS)
+        return PLACE_FIELDS
+
+    def _record_matches(self, spec_fields, matched):
+        """Anota en SelectorStats qué selector encontró cada campo"""
+        if self.selector_stats:
+            for name, spec in spec_fields.items():
+                if name in matched:
+                    self.selector_stats.record_first_match(name, spec['selectors'], matched[name])
+
+    def _count_fields(self, business):
+        """Contadores de aciertos/fallos de selectores por campo de un negocio extraído"""
+        for field in PLACE_FIELDS:
+            if business.get(field) is None:
+                self.metrics.incr('selector_misses', campo=field)
+            else:
+                self.metrics.incr('selector_hits', campo=field)
+
+    def _record_frontier(self, urls):
+        """Guarda en el diario de la ejecución las URLs recolectadas hasta ahora"""
+        if self.journal:
+            self.journal.add_frontier(urls)
+
+    def scroll_and_load_results(self, max_results=10, known_urls=None):
+        """Hace scroll inteligente para cargar más resultados de Google Maps
+
+        known_urls: URLs ya recolectadas en una ejecución anterior (frontera guardada).
+        """
+        log.info(f"🔄 Cargando hasta {max_results} resultados...")
         
         # Buscar el panel de resultados con selectores más específicos
         results_panel_selectors = [
@@ -86,260 +241,328 @@ class GoogleMapsScraper:
             "[role='main'] [role='feed']"
         ]
         
+        # Esperar a que el panel exista en lugar de una pausa fija
+        self.waiter.for_any_selector(results_panel_selectors, timeout=10)
+        
+        if self.use_observer:
+            observed_urls = self.scroll_with_observer(max_results, known_urls=known_urls)
+            if observed_urls is not None:
+                return observed_urls
+            log.warning("⚠️ No se pudo observar el feed de resultados, usando el modo clásico")
+        
         results_panel = None
         for selector in results_panel_selectors:
             try:
                 results_panel = self.driver.find_element(By.CSS_SELECTOR, selector)
                 if results_panel and results_panel.is_displayed():
-                    print(f"✅ Panel de resultados encontrado: {selector}")
+                    log.info(f"✅ Panel de resultados encontrado: {selector}")
                     break
             except:
                 continue
         
-        unique_urls = set()
+        # Deduplicación por clave canónica: variantes de la URL del mismo negocio cuentan una vez
+        unique_urls = [link for link in (known_urls or []) if self.dedup.add(link, 'recoleccion')]
         scroll_attempts = 0
         max_scroll_attempts = 20
         no_new_results_count = 0
         
-        while len(unique_urls) < max_results and scroll_attempts < max_scroll_attempts:
+        while len(unique_urls) < max_results and scroll_attempts < max_scroll_attempts and not self.cancelled():
             scroll_attempts += 1
+            with self.metrics.span('scroll_iteration', modo='clasico'):
+                # Obtener enlaces actuales antes del scroll
+                current_links = self.get_current_business_links()
+                previous_count = len(unique_urls)
+                links_in_dom = self.waiter.count(PLACE_LINK_SELECTOR)
             
-            # Obtener enlaces actuales antes del scroll
-            current_links = self.get_current_business_links()
-            previous_count = len(unique_urls)
-            
-            # Agregar nuevos enlaces únicos
-            for link in current_links:
-                if len(unique_urls) >= max_results:
-                    break
-                if link and '/maps/place/' in link:
-                    unique_urls.add(link)
+                # Agregar nuevos enlaces únicos
+                for link in current_links:
+                    if len(unique_urls) >= max_results:
+                        break
+                    if link and '/maps/place/' in link and self.dedup.add(link, 'recoleccion'):
+                        unique_urls.append(link)
             
-            current_count = len(unique_urls)
-            print(f"   📊 Intento {scroll_attempts}: {current_count} resultados únicos encontrados")
+                current_count = len(unique_urls)
+                self._record_frontier(unique_urls)
+                log.info(f"   📊 Intento {scroll_attempts}: {current_count} resultados únicos encontrados")
             
-            # Verificar si encontramos nuevos resultados
-            if current_count == previous_count:
-                no_new_results_count += 1
-            else:
-                no_new_results_count = 0
+                # Verificar si encontramos nuevos resultados
+                if current_count == previous_count:
+                    no_new_results_count += 1
+                else:
+                    no_new_results_count = 0
             
-            # Si llevamos varios intentos sin nuevos resultados, salir
-            if no_new_results_count >= 5:
-                print(f"⚠️ No se encontraron nuevos resultados en los últimos {no_new_results_count} intentos")
-                break
+                # Si llevamos varios intentos sin nuevos resultados, salir
+                if no_new_results_count >= 5:
+                    log.warning(f"⚠️ No se encontraron nuevos resultados en los últimos {no_new_results_count} intentos")
+                    break
                 
-            if current_count >= max_results:
-                print(f"✅ ¡Objetivo alcanzado! {current_count} resultados encontrados")
-                break
+                if current_count >= max_results:
+                    log.info(f"✅ ¡Objetivo alcanzado! {current_count} resultados encontrados")
+                    break
             
-            # Estrategias múltiples de scroll
-            try:
-                if results_panel:
-                    # Método 1: Scroll en el panel de resultados (más efectivo)
-                    self.driver.execute_script("""
-                        arguments[0].scrollBy(0, 800);
-                        arguments[0].scrollTop = arguments[0].scrollTop;
-                    """, results_panel)
+                # Estrategias múltiples de scroll
+                try:
+                    if results_panel:
+                        # Método 1: Scroll en el panel de resultados (más efectivo)
+                        self.driver.execute_script("""
+                            arguments[0].scrollBy(0, 800);
+                            arguments[0].scrollTop = arguments[0].scrollTop;
+                        """, results_panel)
                     
-                    # Método 2: Scroll hasta el último elemento visible
-                    try:
-                        last_result = results_panel.find_elements(By.CSS_SELECTOR, "a[href*='/maps/place/']")
-                        if last_result:
-                            self.driver.execute_script("arguments[0].scrollIntoView(true);", last_result[-1])
-                    except:
-                        pass
+                        # Método 2: Scroll hasta el último elemento visible
+                        try:
+                            last_result = results_panel.find_elements(By.CSS_SELECTOR, "a[href*='/maps/place/']")
+                            if last_result:
+                                self.driver.execute_script("arguments[0].scrollIntoView(true);", last_result[-1])
+                        except:
+                            pass
                         
-                else:
-                    # Scroll en toda la página si no encontramos el panel
-                    self.driver.execute_script("window.scrollBy(0, 1000);")
-                
-                # Método 3: Usar ActionChains cada ciertos intentos
-                if scroll_attempts % 3 == 0:
-                    actions = ActionChains(self.driver)
-                    actions.send_keys(Keys.PAGE_DOWN).perform()
-                    time.sleep(1)
-                    actions.send_keys(Keys.END).perform()
+                    else:
+                        # Scroll en toda la página si no encontramos el panel
+                        self.driver.execute_script("window.scrollBy(0, 1000);")
                 
-                # Método 4: Simular scroll con la rueda del mouse
-                if scroll_attempts % 4 == 0:
-                    try:
-                        element_to_scroll = results_panel or self.driver.find_element(By.TAG_NAME, "body")
+                    # Método 3: Usar ActionChains cada ciertos intentos
+                    if scroll_attempts % 3 == 0:
                         actions = ActionChains(self.driver)
-                        actions.move_to_element(element_to_scroll).perform()
+                        actions.send_keys(Keys.PAGE_DOWN).perform()
+                        self.waiter.for_network_idle(idle_time=0.3, timeout=1)
+                        actions.send_keys(Keys.END).perform()
+                
+                    # Método 4: Simular scroll con la rueda del mouse
+                    if scroll_attempts % 4 == 0:
+                        try:
+                            element_to_scroll = results_panel or self.driver.find_element(By.TAG_NAME, "body")
+                            actions = ActionChains(self.driver)
+                            actions.move_to_element(element_to_scroll).perform()
                         
-                        # Simular múltiples scrolls con rueda
-                        for i in range(3):
-                            actions.scroll_by_amount(0, 300).perform()
-                            time.sleep(0.5)
-                    except:
-                        pass
+                            # Simular múltiples scrolls con rueda
+                            for i in range(3):
+                                actions.scroll_by_amount(0, 300).perform()
+                                self.waiter.for_count_change(PLACE_LINK_SELECTOR, links_in_dom, timeout=0.5)
+                        except:
+                            pass
                         
-            except Exception as e:
-                print(f"   ⚠️ Error en scroll {scroll_attempts}: {e}")
+                except Exception as e:
+                    log.warning(f"   ⚠️ Error en scroll {scroll_attempts}: {e}")
             
-            # Esperar a que se carguen nuevos resultados
-            time.sleep(2.5)
+                # Esperar a que aparezcan nuevas tarjetas (o agotar el máximo si no hay más)
+                links_in_dom = self.waiter.for_count_change(PLACE_LINK_SELECTOR, links_in_dom, timeout=2.5)
             
-            # Intentar hacer clic en "Mostrar más resultados" si existe
-            if scroll_attempts % 6 == 0:
-                try:
-                    # Buscar botones de "Mostrar más" con diferentes métodos
-                    load_more_buttons_found = False
-                    
-                    # Método 1: Selectores CSS directos
-                    css_selectors = [
-                        "button[jsaction*='load']",
-                        ".HlvSq",
-                        "button[aria-label*='más']",
-                        "button[aria-label*='more']"
-                    ]
-                    
-                    for selector in css_selectors:
-                        try:
-                            load_more = self.driver.find_element(By.CSS_SELECTOR, selector)
-                            if load_more.is_displayed() and load_more.is_enabled():
-                                self.driver.execute_script("arguments[0].click();", load_more)
-                                print("   🔄 Botón 'Mostrar más' encontrado y clickeado")
-                                time.sleep(3)
-                                load_more_buttons_found = True
-                                break
-                        except:
-                            continue
+                # Intentar hacer clic en "Mostrar más resultados" si existe
+                if scroll_attempts % 6 == 0:
+                    try:
+                        # Buscar botones de "Mostrar más" con diferentes métodos
+                        load_more_buttons_found = False
                     
-                    # Método 2: XPath para texto específico
-                    if not load_more_buttons_found:
-                        xpath_selectors = [
-                            "//*[contains(text(), 'Mostrar más')]",
-                            "//*[contains(text(), 'Ver más')]",
-                            "//*[contains(text(), 'Show more')]",
-                            "//*[contains(text(), 'Load more')]"
+                        # Método 1: Selectores CSS directos
+                        css_selectors = [
+                            "button[jsaction*='load']",
+                            ".HlvSq",
+                            "button[aria-label*='más']",
+                            "button[aria-label*='more']"
                         ]
-                        
-                        for xpath in xpath_selectors:
+                    
+                        for selector in css_selectors:
                             try:
-                                load_more = self.driver.find_element(By.XPATH, xpath)
+                                load_more = self.driver.find_element(By.CSS_SELECTOR, selector)
                                 if load_more.is_displayed() and load_more.is_enabled():
                                     self.driver.execute_script("arguments[0].click();", load_more)
-                                    print("   🔄 Botón 'Mostrar más' encontrado y clickeado")
-                                    time.sleep(3)
+                                    log.info("   🔄 Botón 'Mostrar más' encontrado y clickeado")
+                                    self.waiter.for_count_change(PLACE_LINK_SELECTOR, links_in_dom, timeout=3)
+                                    load_more_buttons_found = True
                                     break
                             except:
                                 continue
+                    
+                        # Método 2: XPath para texto específico
+                        if not load_more_buttons_found:
+                            xpath_selectors = [
+                                "//*[contains(text(), 'Mostrar más')]",
+                                "//*[contains(text(), 'Ver más')]",
+                                "//*[contains(text(), 'Show more')]",
+                                "//*[contains(text(), 'Load more')]"
+                            ]
+                        
+                            for xpath in xpath_selectors:
+                                try:
+                                    load_more = self.driver.find_element(By.XPATH, xpath)
+                                    if load_more.is_displayed() and load_more.is_enabled():
+                                        self.driver.execute_script("arguments[0].click();", load_more)
+                                        log.info("   🔄 Botón 'Mostrar más' encontrado y clickeado")
+                                        self.waiter.for_count_change(PLACE_LINK_SELECTOR, links_in_dom, timeout=3)
+                                        break
+                                except:
+                                    continue
                                 
-                except:
-                    pass
+                    except:
+                        pass
         
-        print(f"🏁 Scroll completado: {len(unique_urls)} resultados únicos disponibles")
+        log.info(f"🏁 Scroll completado: {len(unique_urls)} resultados únicos disponibles")
         
         # Si no conseguimos suficientes resultados, intentar una última estrategia
         if len(unique_urls) < max_results and len(unique_urls) > 0:
-            print(f"🔍 Intentando estrategia adicional para obtener más resultados...")
+            log.info("🔍 Intentando estrategia adicional para obtener más resultados...")
             
             # Scroll más agresivo al final
             for i in range(5):
                 try:
+                    links_in_dom = self.waiter.count(PLACE_LINK_SELECTOR)
                     if results_panel:
                         self.driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight);", results_panel)
                     else:
                         self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(2)
+                    self.waiter.for_count_change(PLACE_LINK_SELECTOR, links_in_dom, timeout=2)
                     
                     # Verificar si hay nuevos resultados
                     current_links = self.get_current_business_links()
                     for link in current_links:
                         if len(unique_urls) >= max_results:
                             break
-                        if link and '/maps/place/' in link:
-                            unique_urls.add(link)
+                        if link and '/maps/place/' in link and self.dedup.add(link, 'recoleccion'):
+                            unique_urls.append(link)
+                    self._record_frontier(unique_urls)
                             
                     if len(unique_urls) >= max_results:
                         break
                         
                 except Exception as e:
-                    print(f"   ⚠️ Error en scroll final: {e}")
+                    log.warning(f"   ⚠️ Error en scroll final: {e}")
                     break
         
         final_count = len(unique_urls)
         if final_count < max_results:
-            print(f"ℹ️ Se obtuvieron {final_count} resultados de {max_results} solicitados")
-            print("   Esto puede deberse a que no hay más negocios disponibles en esta búsqueda")
+            log.info(f"ℹ️ Se obtuvieron {final_count} resultados de {max_results} solicitados")
+            log.info("   Esto puede deberse a que no hay más negocios disponibles en esta búsqueda")
         
-        return list(unique_urls)
+        return unique_urls
 
-    def get_current_business_links(self):
-        """Obtiene todos los enlaces de negocios visibles actualmente con mejor detección"""
-        business_links = []
-        
-        # Selectores más específicos y completos
-        selectors = [
-            "a[href*='/maps/place/'][data-value]",  # Más específico
-            "a[href*='/maps/place/']",
-            "a[data-result-index]",
-            ".hfpxzc",
-            "a[jsaction*='navigate']",
-            "div[role='article'] a[href*='place']",
-            ".Nv2PK a[href*='place']",
-            "[role='main'] a[href*='/maps/place/']",
-            ".THOPZb a[href*='/maps/place/']"
-        ]
+    def scroll_with_observer(self, max_results=10, max_scroll_attempts=20, stale_limit=5, known_urls=None):
+        """Carga resultados de forma incremental con un MutationObserver sobre el feed
+
+        El observer acumula en la página los enlaces recién insertados y Python solo
+        vacía ese buffer, así que cada iteración sabe al instante si llegaron tarjetas
+        nuevas o el marcador de fin de lista. Devuelve None si no hay feed que observar.
+        """
+        installed = self.driver.execute_script(
+            FEED_OBSERVER_INSTALL_JS, FEED_SELECTORS, END_OF_LIST_SELECTORS, END_OF_LIST_TEXTS
+        )
+        if not installed:
+            return None
         
-        for selector in selectors:
-            try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    try:
-                        href = element.get_attribute('href')
-                        if href and '/maps/place/' in href and href not in business_links:
-                            # Verificar que el elemento sea visible
-                            if element.is_displayed():
-                                business_links.append(href)
-                    except:
-                        continue
-            except Exception as e:
-                continue
+        unique_urls = [link for link in (known_urls or []) if self.dedup.add(link, 'recoleccion')]
+        scroll_attempts = 0
+        stale_rounds = 0
         
-        # Eliminar duplicados manteniendo el orden
-        unique_links = []
-        seen = set()
-        for link in business_links:
-            if link not in seen:
-                seen.add(link)
-                unique_links.append(link)
+        try:
+            while True:
+                with self.metrics.span('scroll_iteration', modo='observer'):
+                    state = self.driver.execute_script(FEED_DRAIN_JS) or {}
+                    for link in state.get('links', []):
+                        if len(unique_urls) >= max_results:
+                            break
+                        if link and '/maps/place/' in link and self.dedup.add(link, 'recoleccion'):
+                            unique_urls.append(link)
+                    self._record_frontier(unique_urls)
+                
+                    if len(unique_urls) >= max_results:
+                        log.info(f"✅ ¡Objetivo alcanzado! {len(unique_urls)} resultados encontrados")
+                        break
+                    if state.get('end'):
+                        log.info(f"🏁 Fin de la lista de resultados: {len(unique_urls)} disponibles")
+                        break
+                    if scroll_attempts >= max_scroll_attempts or self.cancelled():
+                        break
+                
+                    scroll_attempts += 1
+                    self.driver.execute_script(FEED_SCROLL_JS)
+                
+                    # Devuelve en cuanto el observer registra tarjetas nuevas o el fin de lista
+                    arrived = self.waiter.until(lambda: self.driver.execute_script(FEED_PENDING_JS), timeout=3, kind='feed')
+                    if arrived:
+                        stale_rounds = 0
+                    else:
+                        stale_rounds += 1
+                        if stale_rounds >= stale_limit:
+                            log.warning(f"⚠️ No se encontraron nuevos resultados en los últimos {stale_rounds} intentos")
+                            break
+                    log.info(f"   📊 Scroll {scroll_attempts}: {len(unique_urls)} resultados únicos encontrados")
+        finally:
+            try:
+                self.driver.execute_script(FEED_OBSERVER_STOP_JS)
+            except Exception:
+                pass
         
-        return unique_links
+        if len(unique_urls) < max_results:
+            log.info(f"ℹ️ Se obtuvieron {len(unique_urls)} resultados de {max_results} solicitados")
+        return unique_urls
 
-    def search_businesses(self, url, max_results=10):
-        """Busca y extrae información de negocios en Google Maps."""
-        print(f"🔍 Accediendo a: {url}")
-        
-        if "google.com/maps" not in url and "maps.google.com" not in url:
-            print("❌ La URL no parece ser una búsqueda válida de Google Maps")
-            print("📝 Ejemplo de URL válida: https://www.google.com/maps/search/restaurantes+cerca+de+mi/@19.4326,-99.1332,15z")
+    def get_current_business_links(self):
+        """Obtiene todos los enlaces de negocios visibles actualmente con mejor detección"""
+        # Una sola llamada: selección, filtrado de visibles y deduplicación en la página
+        selectors = self.selector_stats.ordered('enlaces', LINK_SELECTORS) if self.selector_stats else LINK_SELECTORS
+        try:
+            result = self.driver.execute_script(COLLECT_LINKS_JS, selectors) or {}
+            # Acierto = el selector encuentra enlaces, aunque uno anterior ya los hubiera aportado
+            matches = result.get('matches') or {}
+            if self.selector_stats and matches:
+                self.selector_stats.record_each('enlaces', {selector: count > 0 for selector, count in matches.items()})
+            return result.get('links') or []
+        except Exception as e:
+            log.warning(f"   ⚠️ Error obteniendo enlaces: {e}")
             return []
-        
+
+    def search_businesses(self, url, max_results=10, journal=None):
+        """Busca y extrae información de negocios en Google Maps."""
+        businesses_data = list(self.iter_businesses(url, max_results=max_results, journal=journal))
+        return sorted(businesses_data, key=lambda business: business.indice)
+
+    async def aiter_businesses(self, url, max_results=10):
+        """Variante asíncrona de iter_businesses: el navegador trabaja en un hilo aparte"""
+        loop = asyncio.get_running_loop()
+        iterator = self.iter_businesses(url, max_results=max_results)
+        finished = object()
         try:
-            self.driver.get(url)
-            print("⏳ Esperando que cargue la página de resultados...")
+            while True:
+                business = await loop.run_in_executor(None, next, iterator, finished)
+                if business is finished:
+                    break
+                yield business
+        finally:
+            iterator.close()
+
+    def open_search(self, url):
+        """Carga la página de resultados, cierra popups y verifica que haya resultados"""
+        with self.timer.phase('carga'):
+            with self.metrics.span('navigate', pagina='busqueda'):
+                self.driver.get(url)
+            log.info("⏳ Esperando que cargue la página de resultados...")
             
-            # Esperar a que aparezcan los primeros resultados
-            time.sleep(5)
+            # Posibles botones de cierre o "Aceptar"
+            close_buttons = [
+                "button[aria-label*='close']",
+                "button[aria-label*='dismiss']",
+                "button[data-value='Accept']",
+                ".VfPpkd-Bz112c-LgbsSe"  # Botón de Google
+            ]
+            
+            # Resultados básicos que indican que la búsqueda cargó
+            initial_selectors = [
+                "a[href*='/maps/place/']",
+                "div[role='article']",
+                ".Nv2PK"
+            ]
+            
+            # Esperar a que aparezcan resultados o un popup, lo que ocurra primero
+            self.waiter.for_any_selector(initial_selectors + close_buttons, timeout=25)
             
             # Intentar cerrar cualquier popup o notificación
             try:
-                # Posibles botones de cierre o "Aceptar"
-                close_buttons = [
-                    "button[aria-label*='close']",
-                    "button[aria-label*='dismiss']",
-                    "button[data-value='Accept']",
-                    ".VfPpkd-Bz112c-LgbsSe"  # Botón de Google
-                ]
                 for selector in close_buttons:
                     try:
                         button = self.driver.find_element(By.CSS_SELECTOR, selector)
                         if button.is_displayed():
                             button.click()
-                            time.sleep(1)
+                            self.waiter.for_hidden(selector, timeout=1)
                             break
                     except:
                         continue
@@ -347,222 +570,357 @@ class GoogleMapsScraper:
                 pass
             
             # Verificar que hay resultados básicos
-            initial_selectors = [
-                "a[href*='/maps/place/']",
-                "div[role='article']",
-                ".Nv2PK"
-            ]
-            
-            found_results = False
-            for selector in initial_selectors:
-                try:
-                    self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    found_results = True
-                    print(f"✅ Resultados iniciales encontrados con: {selector}")
-                    break
-                except TimeoutException:
-                    continue
+            found_selector = self.waiter.for_any_selector(initial_selectors, timeout=25)
+            if not found_selector:
+                log.error("❌ No se encontraron resultados iniciales. Verifica la URL de búsqueda.")
+                return False
+            log.info(f"✅ Resultados iniciales encontrados con: {found_selector}")
+            return True
+
+    def iter_businesses(self, url, max_results=10, journal=None, cancel=None):
+        """Genera cada negocio en cuanto se extrae (en orden de llegada con varios navegadores)
+
+        journal: RunJournal (o ruta a uno) para guardar el progreso tras cada negocio y
+        reanudar una ejecución interrumpida sin repetir los negocios ya extraídos.
+        cancel: threading.Event; al activarlo la búsqueda se detiene en el siguiente
+        scroll o negocio (el diario queda sin marcar como terminado).
+        """
+        log.info(f"🔍 Accediendo a: {url}")
+        
+        if not is_maps_url(url, self.extra_hosts):
+            log.error("❌ La URL no parece ser una búsqueda válida de Google Maps")
+            log.info("📝 Ejemplo de URL válida: https://www.google.com/maps/search/restaurantes+cerca+de+mi/@19.4326,-99.1332,15z")
+            return
+        
+        owns_journal = isinstance(journal, str)
+        if owns_journal:
+            journal = RunJournal(journal)
+        self.journal = journal
+        self.dedup = DedupIndex()
+        self.cancel_event = cancel
+        
+        self.timer.reset()
+        try:
+            known_urls = []
+            if journal:
+                # Un diario de otra URL se vacía aquí, antes de decidir si se reanuda
+                journal.record_search(url, max_results)
+                if journal.has_progress:
+                    log.info(f"♻️ Reanudando ejecución: {len(journal.frontier)} URLs recolectadas, "
+                          f"{len(journal.completed)} negocios ya extraídos")
+                known_urls = journal.frontier[:max_results]
+                
+                # Los negocios ya extraídos se entregan sin volver a visitarlos
+                # (solo los que entran en max_results, por si ahora se piden menos)
+                for business_url in known_urls:
+                    if journal.is_completed(business_url):
+                        yield BusinessRecord.from_dict(journal.completed[business_url])
             
-            if not found_results:
-                print("❌ No se encontraron resultados iniciales. Verifica la URL de búsqueda.")
-                return []
+            if len(known_urls) >= max_results:
+                # La frontera guardada ya cubre la búsqueda: no hace falta volver a hacer scroll
+                unique_urls = known_urls
+            else:
+                if not self.open_search(url):
+                    return
+                
+                # 🔥 SCROLL AUTOMÁTICO MEJORADO
+                with self.timer.phase('scroll'):
+                    unique_urls = self.scroll_and_load_results(max_results, known_urls=known_urls)
+                
+                # Con diario, el orden de la frontera fija el índice de cada negocio entre ejecuciones
+                if journal:
+                    unique_urls = journal.frontier
             
-            # 🔥 SCROLL AUTOMÁTICO MEJORADO
-            unique_urls = self.scroll_and_load_results(max_results)
+            if self.cancelled():
+                log.info("🛑 Búsqueda cancelada")
+                return
             
             if not unique_urls:
-                print("❌ No se pudieron obtener URLs de negocios.")
-                return []
+                log.error("❌ No se pudieron obtener URLs de negocios.")
+                return
             
-            print(f"✅ Se encontraron {len(unique_urls)} negocios únicos para procesar.")
+            log.info(f"✅ Se encontraron {len(unique_urls)} negocios únicos para procesar.")
             
-            # Limitar a la cantidad solicitada
-            urls_to_process = unique_urls[:max_results]
+            # Limitar a la cantidad solicitada, sin repetir negocios y saltando lo ya extraído
+            pending = []
+            keys_in_run = set()
+            for i, business_url in enumerate(unique_urls[:max_results]):
+                key = place_key(business_url)
+                if key in keys_in_run:
+                    self.dedup.dropped['extraccion'] += 1
+                    continue
+                keys_in_run.add(key)
+                if not (journal and journal.is_completed(business_url)):
+                    pending.append((i, business_url))
+            
+            # Los negocios presentes en la caché no necesitan navegador
+            if self.cache:
+                to_fetch = []
+                for i, business_url in pending:
+                    cached = self.cache.get(extract_place_id(business_url))
+                    if cached:
+                        self.metrics.incr('cache_hits')
+                        data = BusinessRecord.from_dict(cached, indice=i, place_key=place_key(business_url))
+                        log.info(f"   ⚡ En caché: {data.nombre}")
+                        if journal:
+                            journal.record_business(business_url, data.to_dict())
+                        yield data
+                    else:
+                        self.metrics.incr('cache_misses')
+                        to_fetch.append((i, business_url))
+                pending = to_fetch
             
-            businesses_data = []
-            for i, business_url in enumerate(urls_to_process):
-                print(f"\n🔍 Procesando negocio {i+1}/{len(urls_to_process)}...")
-                data = self.extract_business_data(business_url, i)
+            for business_url, data in self._extract_pending(pending):
                 if data:
-                    businesses_data.append(data)
-                    
-                # Pausa entre solicitudes para evitar detección
-                time.sleep(2)
+                    self.metrics.incr('businesses_extracted')
+                    self._store_business(business_url, data)
+                    yield data
+                else:
+                    self.metrics.incr('extraction_failures')
+                if self.cancelled():
+                    log.info("🛑 Búsqueda cancelada")
+                    return
             
-            return businesses_data
+            if journal:
+                journal.mark_finished()
             
         except Exception as e:
-            print(f"❌ Error durante la búsqueda: {e}")
-            return []
+            # Se registra y se propaga: quien consume el generador decide si la búsqueda falló
+            log.error(f"❌ Error durante la búsqueda: {e}")
+            raise
+        finally:
+            self.journal = None
+            self.cancel_event = None
+            if owns_journal:
+                journal.close()
+            duplicates = sum(self.dedup.dropped.values())
+            if duplicates:
+                log.info(f"🧹 Duplicados descartados: {duplicates} {dict(self.dedup.dropped)}")
+            if self.selector_stats:
+                self.selector_stats.save()
+            self.timer.print_report()
 
-    def extract_business_data(self, url, index):
-        """Navega a la página de un negocio y extrae toda su información."""
-        business_data = {
-            'indice': index, 
-            'nombre': 'No disponible', 
-            'calificacion': 'No disponible', 
-            'num_reviews': 'No disponible', 
-            'tipo': 'No disponible', 
-            'direccion': 'No disponible', 
-            'telefono': 'No disponible', 
-            'website': 'No disponible', 
-            'email': 'No disponible'
-        }
+    def _iter_pages(self, pending, method):
+        """Aplica `method` (extract_business_data o capture_place_page) a cada (índice, url)
+
+        Con varios navegadores el trabajo se reparte en el pool y los resultados llegan
+        en orden de finalización; genera (índice, resultado).
+        """
+        if self.workers > 1:
+            pool = self.get_pool()
+            log.info(f"🧭 Procesando {len(pending)} negocios con {min(pool.size, len(pending))} navegadores en paralelo...")
+            yield from pool.imap_unordered(
+                [url for _, url in pending], indices=[i for i, _ in pending], method=method
+            )
+            return
         
-        try:
-            print(f"   🚗 Navegando a la página del negocio...")
-            self.driver.get(url)
-            
-            # Espera más flexible para diferentes elementos
-            selectors_to_wait = [
-                "h1.DUwDvf",
-                "h1[data-attrid='title']",
-                ".x3AX1-LfntMc-header-title-title"
-            ]
+        for n, (i, business_url) in enumerate(pending):
+            log.info(f"\n🔍 Procesando negocio {n+1}/{len(pending)}...")
+            with self.timer.phase('extraccion'):
+                result = getattr(self, method)(business_url, i)
+            yield i, result
             
-            title_element = None
-            for selector in selectors_to_wait:
-                try:
-                    title_element = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    break
-                except TimeoutException:
-                    continue
-            
-            if not title_element:
-                print("   ❌ No se pudo cargar la página del negocio")
-                return None
-                
-            print("   ✅ Página de detalles cargada.")
+            # Pausa entre solicitudes para evitar detección: se deja terminar
+            # la actividad de red de la página en lugar de dormir un tiempo fijo
+            with self.timer.phase('pausa'):
+                self.waiter.for_network_idle(idle_time=0.5, timeout=2)
 
-            # Extracción de datos con múltiples selectores de respaldo
-            try:
-                name_selectors = ["h1.DUwDvf", "h1[data-attrid='title']", ".x3AX1-LfntMc-header-title-title"]
-                for selector in name_selectors:
-                    try:
-                        business_data['nombre'] = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                rating_selectors = ["div.F7nice", ".MW4etd", ".ceNzKf"]
-                for selector in rating_selectors:
-                    try:
-                        rating_text = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                        parts = rating_text.split('(')
-                        if len(parts) > 0: 
-                            business_data['calificacion'] = parts[0].strip()
-                        if len(parts) > 1: 
-                            business_data['num_reviews'] = parts[1].replace(')', '').strip()
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                type_selectors = ["button.DkEaL", ".YhemCb"]
-                for selector in type_selectors:
-                    try:
-                        business_data['tipo'] = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                address_selectors = [
-                    "button[data-item-id='address']",
-                    "[data-item-id='address'] .Io6YTe",
-                    ".LrzXr"
-                ]
-                for selector in address_selectors:
-                    try:
-                        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        address = element.get_attribute('aria-label') or element.text
-                        business_data['direccion'] = address.replace('Dirección:', '').strip()
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                phone_selectors = [
-                    "button[data-item-id^='phone:tel:']",
-                    "[data-item-id*='phone'] .Io6YTe"
-                ]
-                for selector in phone_selectors:
-                    try:
-                        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        phone = element.get_attribute('aria-label') or element.text
-                        business_data['telefono'] = phone.replace('Teléfono:', '').strip()
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
+    def _extract_pending(self, pending):
+        """Genera (url, datos) para cada negocio pendiente según el modo de extracción"""
+        if not pending:
+            return
+        urls = dict(pending)
+        
+        if not self.offline_parsing:
+            for i, data in self._iter_pages(pending, 'extract_business_data'):
+                yield urls[i], data
+            return
+        
+        # Modo offline: el navegador solo captura HTML y el análisis corre en otros procesos
+        parser = self.get_parser()
+        spec_fields = self._place_fields()
+        futures = {}
+        
+        def parsed(future):
             try:
-                website_selectors = [
-                    "a[data-item-id='authority']",
-                    "a[href^='http']:not([href*='google.com'])"
-                ]
-                for selector in website_selectors:
-                    try:
-                        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        business_data['website'] = element.get_attribute('href')
-                        break
-                    except:
-                        continue
-            except: 
-                pass
+                data, matched = future.result()
+                self._record_matches(spec_fields, matched)
+            except Exception as e:
+                log.warning(f"   ⚠️ Error analizando el HTML de {futures[future]}: {e}")
+                data = None
+            if data:
+                self._count_fields(data)
+                log.info(f"   ✅ Extraído: {data.nombre}")
+            return futures.pop(future), data
+        
+        for i, snapshot in self._iter_pages(pending, 'capture_place_page'):
+            if snapshot:
+                if self.snapshot_dir:
+                    save_snapshot(self.snapshot_dir, snapshot['url'], snapshot['html'])
+                futures[parser.submit(snapshot['html'], snapshot['url'], i, spec_fields)] = snapshot['url']
+            # Entregar lo que ya terminó de analizarse sin esperar al resto
+            for future in [f for f in futures if f.done()]:
+                yield parsed(future)
+        
+        for future in as_completed(list(futures)):
+            yield parsed(future)
+
+    def get_parser(self):
+        """Pool de procesos para el análisis offline del HTML (se crea al primer uso)"""
+        if self.parser is None:
+            self.parser = SnapshotParser()
+        return self.parser
+
+    def _open_place_page(self, url):
+        """Navega a la página de un negocio y espera su título; False si no carga"""
+        log.info("   🚗 Navegando a la página del negocio...")
+        with self.metrics.span('navigate', pagina='negocio'):
+            self.driver.get(url)
+        
+        # Un único sondeo para todos los selectores de título
+        title_selector = self.waiter.for_any_selector(self._place_fields()['nombre']['selectors'], timeout=25)
+        
+        if not title_selector:
+            log.error("   ❌ No se pudo cargar la página del negocio")
+            return False
+            
+        log.info("   ✅ Página de detalles cargada.")
+        if self.metrics.enabled:
+            self._record_page_weight()
+        return True
+
+    def _record_page_weight(self):
+        """Suma a las métricas los bytes y recursos que cargó la página actual"""
+        try:
+            weight = self.driver.execute_script(PAGE_WEIGHT_JS) or {}
+        except Exception:
+            return
+        self.metrics.incr('bytes_transferred', weight.get('bytes') or 0)
+        self.metrics.incr('resources_loaded', weight.get('resources') or 0)
+        self.metrics.incr('pages_measured')
+
+    def capture_place_page(self, url, index):
+        """Navega al negocio y devuelve su HTML para analizarlo fuera del navegador"""
+        try:
+            with self.metrics.span('extract', modo='captura') as span:
+                if not self._open_place_page(url):
+                    span.set(resultado='sin_carga')
+                    return None
+                return {'url': url, 'indice': index, 'html': self.driver.page_source}
+        except Exception as e:
+            log.warning(f"   ⚠️ Error capturando la página del negocio: {e}")
+            return None
+
+    def extract_business_data(self, url, index):
+        """Navega a la página de un negocio y extrae toda su información."""
+        try:
+            with self.metrics.span('extract', modo='directo') as span:
+                if not self._open_place_page(url):
+                    span.set(resultado='sin_carga')
+                    return None
+
+                # Extracción de todos los campos (con sus selectores de respaldo) en una sola llamada
+                spec_fields = self._place_fields()
+                result = self.driver.execute_script(EXTRACT_PLACE_JS, spec_fields) or {}
+                self._record_matches(spec_fields, result.get('matched') or {})
+                # Calificación, reseñas y teléfono se normalizan aquí, una sola vez
+                business_data = business_from_fields(result.get('fields'), index, url)
+            self._count_fields(business_data)
             
-            print(f"   ✅ Extraído: {business_data['nombre']}")
+            log.info(f"   ✅ Extraído: {business_data.nombre}")
             return business_data
 
         except TimeoutException:
-            print("   ❌ La página del negocio no cargó a tiempo.")
+            log.error("   ❌ La página del negocio no cargó a tiempo.")
             return None
         except Exception as e:
-            print(f"   ⚠️ Error inesperado extrayendo datos: {e}")
+            log.warning(f"   ⚠️ Error inesperado extrayendo datos: {e}")
             return None
 
     def save_to_csv(self, businesses, filename='negocios_extraidos.csv'):
+        """Guarda una lista de negocios (CSV, .jsonl o .parquet según la extensión)"""
         if not businesses:
-            print("❌ No hay datos para guardar.")
+            log.error("❌ No hay datos para guardar.")
             return
         
-        df = pd.DataFrame(businesses)
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
-        print(f"\n💾 Datos guardados en {filename}")
-        print(f"📊 Total de negocios extraídos: {len(businesses)}")
+        with self.metrics.span('save', destino='csv'):
+            with open_writer(filename) as writer:
+                writer.write_many(businesses)
+        log.info(f"\n💾 Datos guardados en {filename}")
         
         # Mostrar resumen de datos extraídos
-        print("\n📋 Resumen de extracción:")
-        for col in df.columns:
-            no_disponible = (df[col] == 'No disponible').sum()
-            disponible = len(df) - no_disponible
-            print(f"  {col}: {disponible}/{len(df)} disponibles")
+        writer.summary.log_summary()
     
+    def get_pool(self):
+        """Devuelve el pool de navegadores para extracción paralela (se crea al primer uso)"""
+        if self.pool is None:
+            from browser_pool import BrowserPool
+            self.pool = BrowserPool(
+                size=self.workers,
+                # Perfiles junto al de este navegador: varias sesiones no comparten carpetas
+                profile_root=f"{self.profile_dir}_pool",
+                scraper_class=type(self),
+                timer=self.timer,
+                scraper_kwargs={
+                    'headless': self.headless,
+                    'metrics': self.metrics,
+                    'selector_stats': self.selector_stats,
+                    'lean': self.lean,
+                }
+            )
+        return self.pool
+
     def close(self):
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+        
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+        
+        if self.selector_stats:
+            self.selector_stats.save()
+        
+        if self.parser:
+            self.parser.close()
+            self.parser = None
+            
         if self.driver:
-            self.driver.quit()
-            print("\n🔒 Navegador cerrado")
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+            log.info("\n🔒 Navegador cerrado")
             
-        # Limpiar directorio temporal si existe
-        temp_user_data = os.path.join(os.getcwd(), "temp_chrome_profile")
+        # Limpiar directorio de perfil si existe
         try:
-            if os.path.exists(temp_user_data):
+            if os.path.exists(self.profile_dir):
                 import shutil
-                shutil.rmtree(temp_user_data, ignore_errors=True)
+                shutil.rmtree(self.profile_dir, ignore_errors=True)
         except:
             pass
 
+def print_store_summary(store, search_name):
+    """Completitud de los negocios de una búsqueda, calculada en la base de prospectos"""
+    stats = store.stats(busquedas=[search_name])
+    total = stats['total'] or 1
+    print(f"\n💾 Datos guardados en {store.path}")
+    print(f"📋 Resumen de extracción ({stats['total']} prospectos):")
+    for label, key in [('telefono', 'con_telefono'), ('website', 'con_website'),
+                       ('calificacion', 'con_calificacion'), ('direccion', 'con_direccion'), ('tipo', 'con_tipo')]:
+        print(f"  {label}: {stats[key]}/{stats['total']} disponibles ({stats[key] / total * 100:.0f}%)")
+
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
+    # Métricas opcionales: GMAPS_METRICS_DIR=metrics python undetected_method3.py
+    metrics_dir = os.environ.get('GMAPS_METRICS_DIR')
+    metrics = None
+    if metrics_dir:
+        metrics = set_metrics(Metrics(exporters=[JsonLinesExporter(os.path.join(metrics_dir, 'eventos.jsonl'))]))
+    
     print("🚀 Google Maps Business Scraper con Scroll Automático Mejorado")
     print("="*70)
     print("💡 Ejemplos de URLs válidas:")
@@ -571,11 +929,16 @@ def main():
     print("="*70)
     
     scraper = None
-    all_businesses = []
     search_count = 0
+    store = None
+    total_businesses = 0
+    new_prospects = 0
+    businesses_per_search = {}
     
     try:
-        scraper = GoogleMapsScraper()
+        # Base de prospectos: un negocio repetido entre búsquedas se guarda una sola vez
+        store = ProspectStore()
+        scraper = GoogleMapsScraper(cache=PlaceCache(), selector_stats=SelectorStats())
         
         while True:
             search_count += 1
@@ -589,7 +952,7 @@ def main():
                 break
             
             # Validar URL básica
-            if "google.com/maps" not in url and "maps.google.com" not in url:
+            if not is_maps_url(url, scraper.extra_hosts):
                 print("❌ La URL no parece válida. Inténtalo de nuevo.")
                 continue
             
@@ -604,76 +967,109 @@ def main():
             except:
                 max_results = 10
             
+            # Pedir número de navegadores en paralelo para la extracción
+            try:
+                workers = int(input(f"🧭 ¿Cuántos navegadores en paralelo? (por defecto {scraper.workers}): ") or scraper.workers)
+                scraper.configure(workers=workers)
+            except:
+                pass
+            
             # Pedir nombre personalizado para esta búsqueda
             search_name = input(f"🏷️ Nombre para esta búsqueda (ej: 'restaurantes_cdmx'): ").strip()
             if not search_name:
                 search_name = f"busqueda_{search_count}"
             
+            # Diario de la búsqueda: permite reanudarla si el proceso o Chrome se caen
+            journal = RunJournal(os.path.join('checkpoints', f'{search_name}.jsonl'))
+            if journal.has_progress:
+                print(f"♻️ Hay una ejecución previa de '{search_name}' con {len(journal.completed)} negocios extraídos")
+                resume = input("¿Reanudarla? (s/n): ").strip().lower()
+                if resume not in ['s', 'si', 'sí', 'y', 'yes']:
+                    journal.discard()
+                    journal = RunJournal(os.path.join('checkpoints', f'{search_name}.jsonl'))
+            
             print(f"\n⚡ Procesando búsqueda: {search_name}")
             print("="*60)
             
-            # Realizar búsqueda
-            businesses = scraper.search_businesses(url, max_results=max_results)
+            # Cada negocio se guarda en la base de prospectos en cuanto se extrae
+            search_total = 0
+            offset = total_businesses
+            try:
+                for business in scraper.iter_businesses(url, max_results=max_results, journal=journal):
+                    business.busqueda = search_name
+                    business.indice_global = offset + business.indice
+                    business.fecha_extraccion = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    if store.upsert(business):
+                        new_prospects += 1
+                    search_total += 1
+                    total_businesses += 1
+            except Exception:
+                # El error ya quedó en el log; lo extraído se conserva y el diario permite reanudar
+                print(f"⚠️ La búsqueda '{search_name}' se interrumpió por un error")
+            finally:
+                journal.close()
             
-            if businesses:
-                # Agregar identificador de búsqueda a cada negocio
-                for business in businesses:
-                    business['busqueda'] = search_name
-                    business['indice_global'] = len(all_businesses) + business['indice']
-                
-                all_businesses.extend(businesses)
+            if search_total:
+                store.record_search(search_name, url, search_total)
+                businesses_per_search[search_name] = search_total
+                print_store_summary(store, search_name)
                 
-                # Guardar esta búsqueda individual
-                individual_filename = f'negocios_{search_name}.csv'
-                scraper.save_to_csv(businesses, individual_filename)
+                # Ya está en la base: el diario solo se conserva si la búsqueda quedó incompleta
+                if journal.finished:
+                    journal.discard()
                 
-                print(f"✅ Búsqueda '{search_name}' completada: {len(businesses)} negocios")
+                print(f"✅ Búsqueda '{search_name}' completada: {search_total} negocios")
             else:
                 print(f"❌ No se obtuvieron resultados para '{search_name}'")
             
             # Preguntar si continuar
             print(f"\n📈 RESUMEN HASTA AHORA:")
             print(f"   • Búsquedas realizadas: {search_count}")
-            print(f"   • Total de negocios: {len(all_businesses)}")
+            print(f"   • Total de negocios: {total_businesses}")
             
-            if len(all_businesses) > 0:
+            if total_businesses > 0:
                 continuar = input(f"\n🔄 ¿Hacer otra búsqueda? (s/n): ").strip().lower()
                 if continuar not in ['s', 'si', 'sí', 'y', 'yes']:
                     break
             
-        # Guardar archivo consolidado si hay datos
-        if all_businesses:
-            print(f"\n💾 GUARDANDO ARCHIVO CONSOLIDADO...")
-            consolidated_filename = f'todos_los_negocios_consolidado.csv'
-            scraper.save_to_csv(all_businesses, consolidated_filename)
-            
+        if total_businesses:
             # Mostrar resumen final
             print(f"\n📊 RESUMEN FINAL:")
             print(f"   • Total de búsquedas: {search_count}")
-            print(f"   • Total de negocios: {len(all_businesses)}")
-            print(f"   • Archivo consolidado: {consolidated_filename}")
+            print(f"   • Total de negocios: {total_businesses} ({new_prospects} prospectos nuevos)")
+            print(f"   • Prospectos en la base: {len(store)} ({store.path})")
             
             # Resumen por búsqueda
-            from collections import Counter
-            busquedas_count = Counter([b['busqueda'] for b in all_businesses])
             print(f"\n📋 NEGOCIOS POR BÚSQUEDA:")
-            for busqueda, count in busquedas_count.items():
+            for busqueda, count in businesses_per_search.items():
                 print(f"   • {busqueda}: {count} negocios")
+            print(f"\n💡 Exportar a CSV: python prospect_store.py exportar prospectos.csv [--busqueda NOMBRE]")
                 
         else:
             print("\n❌ No se obtuvieron datos en ninguna búsqueda.")
             
     except KeyboardInterrupt:
         print("\nℹ️ Proceso interrumpido por el usuario")
-        if all_businesses:
-            scraper.save_to_csv(all_businesses, 'negocios_parcial.csv')
-            print("💾 Datos parciales guardados en 'negocios_parcial.csv'")
+        if total_businesses:
+            print(f"💾 Los {total_businesses} negocios extraídos ya están guardados en '{store.path}'")
     except Exception as e:
         print(f"\n❌ Error fatal: {e}")
+        if total_businesses:
+            print(f"💾 Los {total_businesses} negocios extraídos ya están guardados en '{store.path}'")
+        print("♻️ Las búsquedas incompletas pueden reanudarse desde la carpeta 'checkpoints'")
     
     finally:
+        if store:
+            store.close()
         if scraper:
             scraper.close()
+            # Selectores que ya no encuentran nada: candidatos a revisar en page_scripts.py
+            if scraper.selector_stats and scraper.selector_stats.dead_selectors():
+                scraper.selector_stats.print_report()
+        if metrics:
+            metrics.write_prometheus(os.path.join(metrics_dir, 'scraper.prom'))
+            metrics.close()
+            print(f"📈 Métricas guardadas en '{metrics_dir}'")
         print(f"\n✅ Proceso completado. ¡Hasta luego! 👋")
 
 if __name__ == "__main__":
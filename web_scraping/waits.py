@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from instrumentation import get_metrics
+
+log = logging.getLogger(__name__)
+
+# Intervalo de sondeo por defecto para todas las esperas adaptativas
+DEFAULT_POLL = 0.1
+
+# Cuenta de recursos de red cargados por la página (para detectar red inactiva)
+_RESOURCE_COUNT_JS = """
+    return [document.readyState, performance.getEntriesByType('resource').length];
+"""
+
+# Devuelve el primer selector presente en el DOM (o null)
+_FIRST_PRESENT_JS = """
+    var selectors = arguments[0];
+    for (var i = 0; i < selectors.length; i++) {
+        try {
+            if (document.querySelector(selectors[i])) return selectors[i];
+        } catch (e) {}
+    }
+    return null;
+"""
+
+_COUNT_JS = "return document.querySelectorAll(arguments[0]).length;"
+
+_VISIBLE_JS = """
+    var el = document.querySelector(arguments[0]);
+    return !!(el && el.getClientRects().length);
+"""
+
+
+class PhaseTimer:
+    """Acumula, por fase del scraping, el tiempo esperando frente al tiempo trabajando"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.phases = {}
+        self.samples = {}
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def phase(self, name):
+        """Mide una fase; las esperas registradas dentro se descuentan del trabajo"""
+        stack = self._stack()
+        entry = {'name': name, 'wait': 0.0}
+        stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            # Las fases anidadas cuentan dentro de la fase exterior
+            if stack:
+                stack[-1]['wait'] += entry['wait']
+            with self._lock:
+                stats = self.phases.setdefault(name, {'espera': 0.0, 'trabajo': 0.0, 'veces': 0})
+                stats['espera'] += entry['wait']
+                stats['trabajo'] += max(0.0, elapsed - entry['wait'])
+                stats['veces'] += 1
+                self.samples.setdefault(name, []).append(elapsed)
+
+    def add_wait(self, seconds):
+        """Registra tiempo de espera en la fase activa del hilo actual"""
+        stack = self._stack()
+        if stack:
+            stack[-1]['wait'] += seconds
+        else:
+            with self._lock:
+                stats = self.phases.setdefault('sin_fase', {'espera': 0.0, 'trabajo': 0.0, 'veces': 0})
+                stats['espera'] += seconds
+
+    def reset(self):
+        with self._lock:
+            self.phases = {}
+            self.samples = {}
+
+    def durations(self, name):
+        """Duración de cada ejecución individual de una fase (para percentiles)"""
+        with self._lock:
+            return list(self.samples.get(name, []))
+
+    def report(self):
+        """Copia de los tiempos acumulados por fase"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self.phases.items()}
+
+    def print_report(self):
+        phases = self.report()
+        if not phases:
+            return
+        log.info("\n⏱️ Tiempo por fase (espera / trabajo):")
+        for name, stats in phases.items():
+            total = stats['espera'] + stats['trabajo']
+            wait_pct = (stats['espera'] / total * 100) if total else 0
+            log.info(f"  {name}: {stats['espera']:.1f}s esperando / {stats['trabajo']:.1f}s trabajando "
+                  f"({wait_pct:.0f}% espera, {stats['veces']} veces)")
+
+
+class AdaptiveWaiter:
+    """Esperas basadas en condiciones: sondeo corto con un tiempo máximo
+
+    Sustituyen a las pausas fijas con time.sleep: devuelven en cuanto la página
+    está lista y solo agotan el máximo cuando la condición nunca se cumple.
+    """
+
+    def __init__(self, driver, timer=None, poll=DEFAULT_POLL, metrics=None):
+        self.driver = driver
+        self.timer = timer or PhaseTimer()
+        self.poll = poll
+        self.metrics = metrics or get_metrics()
+
+    def until(self, condition, timeout, poll=None, kind='condicion'):
+        """Espera hasta que condition() devuelva algo verdadero; None si se agota el tiempo
+
+        kind: etiqueta de la espera en las métricas (span 'wait' y contador 'wait_timeouts').
+        """
+        poll = poll or self.poll
+        start = time.perf_counter()
+        deadline = start + timeout
+        with self.metrics.span('wait', tipo=kind) as span:
+            try:
+                while True:
+                    try:
+                        result = condition()
+                    except Exception:
+                        result = None
+                    if result:
+                        return result
+                    if time.perf_counter() >= deadline:
+                        span.set(resultado='timeout')
+                        self.metrics.incr('wait_timeouts', tipo=kind)
+                        return None
+                    time.sleep(poll)
+            finally:
+                self.timer.add_wait(time.perf_counter() - start)
+
+    def for_any_selector(self, selectors, timeout=25):
+        """Espera a que exista alguno de los selectores; devuelve el que apareció"""
+        return self.until(lambda: self.driver.execute_script(_FIRST_PRESENT_JS, list(selectors)), timeout, kind='selector')
+
+    def count(self, selector):
+        try:
+            return self.driver.execute_script(_COUNT_JS, selector)
+        except Exception:
+            return 0
+
+    def for_count_change(self, selector, previous, timeout=3):
+        """Espera a que cambie el número de elementos que cumplen el selector"""
+        changed = self.until(lambda: self.count(selector) != previous, timeout, kind='conteo')
+        return self.count(selector) if changed else previous
+
+    def for_hidden(self, selector, timeout=3):
+        """Espera a que un elemento (p. ej. un popup cerrado) deje de estar visible"""
+        return bool(self.until(lambda: not self.driver.execute_script(_VISIBLE_JS, selector), timeout, kind='oculto'))
+
+    def for_network_idle(self, idle_time=0.5, timeout=5):
+        """Espera a que el documento esté completo y no se carguen recursos durante idle_time"""
+        state = {'count': None, 'since': time.perf_counter()}
+
+        def idle():
+            ready, count = self.driver.execute_script(_RESOURCE_COUNT_JS)
+            now = time.perf_counter()
+            if count != state['count']:
+                state['count'] = count
+                state['since'] = now
+                return False
+            return ready == 'complete' and now - state['since'] >= idle_time
+
+        return bool(self.until(idle, timeout, kind='red'))